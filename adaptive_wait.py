@@ -0,0 +1,134 @@
+import threading
+import time
+
+from selenium.common.exceptions import StaleElementReferenceException, WebDriverException
+from selenium.webdriver.common.by import By
+
+# The fixed delay the scrapers used to sleep after every results page, kept to report the time saved
+LEGACY_SLEEP_SECONDS = 5
+
+# Installs a MutationObserver once per document and reports the current row count and the
+# milliseconds since the DOM last changed. A navigation replaces the document and the observer with it.
+STABILITY_PROBE_JS = """
+var state = window.__atisWaitState;
+if (!state) {
+    state = window.__atisWaitState = {last: Date.now()};
+    new MutationObserver(function () { state.last = Date.now(); }).observe(
+        document.documentElement || document, {childList: true, subtree: true, characterData: true}
+    );
+}
+return [document.querySelectorAll(arguments[0]).length, Date.now() - state.last];
+"""
+
+_wait_stats = {}
+_wait_stats_lock = threading.Lock()
+
+
+def record_wait(label, seconds):
+    with _wait_stats_lock:
+        _wait_stats.setdefault(label, []).append(seconds)
+
+
+def get_wait_stats():
+    with _wait_stats_lock:
+        return {label: list(latencies) for label, latencies in _wait_stats.items()}
+
+
+def reset_wait_stats():
+    with _wait_stats_lock:
+        _wait_stats.clear()
+
+
+def report_wait_stats():
+    stats = get_wait_stats()
+    if not stats:
+        return
+    print("Adaptive wait latency per label:")
+    total_waited = 0
+    total_waits = 0
+    for label, latencies in sorted(stats.items()):
+        total_waited += sum(latencies)
+        total_waits += len(latencies)
+        print(f"  {label}: {len(latencies)} waits, mean {sum(latencies) / len(latencies):.2f}s, max {max(latencies):.2f}s")
+    saved = total_waits * LEGACY_SLEEP_SECONDS - total_waited
+    print(f"Waited {total_waited:.1f}s in total, about {saved:.1f}s less than fixed {LEGACY_SLEEP_SECONDS}s sleeps.")
+
+
+def find_optional_element(browser, selector):
+    # Returns the first element matching the CSS selector, or None if the page has none yet
+    elements = browser.find_elements(By.CSS_SELECTOR, selector)
+    return elements[0] if elements else None
+
+
+def wait_for_staleness(element, timeout):
+    """
+    Waits until `element` is detached from the DOM, i.e. the page it came from was replaced.
+    Returns False if it is still attached after `timeout` seconds.
+    """
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            element.is_enabled()
+        except StaleElementReferenceException:
+            return True
+        time.sleep(0.1)
+    return False
+
+
+def wait_until_stable(browser, selector, label, previous=None, quiet_period=0.5, ceiling=LEGACY_SLEEP_SECONDS, poll_interval=0.1):
+    """
+    Returns as soon as the number of elements matching `selector` has not changed and the DOM has
+    not mutated for `quiet_period` seconds, or after `ceiling` seconds at the latest.
+
+    Pass the old results element as `previous` when the wait follows a click that navigates, so a
+    stable *old* page is not mistaken for the new one. Returns the final row count (None if unknown).
+    """
+    start = time.perf_counter()
+    if previous is not None:
+        wait_for_staleness(previous, ceiling)
+    count = _wait_for_quiet_dom(browser, selector, label, quiet_period, start + ceiling, poll_interval)
+    record_wait(label, time.perf_counter() - start)
+    return count
+
+
+def _wait_for_quiet_dom(browser, selector, label, quiet_period, deadline, poll_interval):
+    last_count = None
+    stable_since = time.perf_counter()
+    count = None
+    while True:
+        now = time.perf_counter()
+        try:
+            count, quiet_ms = browser.execute_script(STABILITY_PROBE_JS, selector)
+        except WebDriverException:
+            # The document was swapped mid-probe, start measuring again on the new one
+            count, quiet_ms = None, 0
+        if count != last_count:
+            last_count = count
+            stable_since = now
+        if count is not None and now - stable_since >= quiet_period and quiet_ms >= quiet_period * 1000:
+            break
+        if now >= deadline:
+            print(f"Results for {label} did not settle before the wait ceiling, continuing anyway.")
+            break
+        time.sleep(poll_interval)
+    return count
+
+
+def wait_for_scroll_growth(browser, last_height, selector, label, quiet_period=0.5, ceiling=LEGACY_SLEEP_SECONDS, poll_interval=0.2):
+    """
+    Waits after an infinite-scroll step until the page grew and settled, or until `ceiling` passed
+    without growth. Returns the new document height.
+    """
+    start = time.perf_counter()
+    deadline = start + ceiling
+    height = last_height
+    while time.perf_counter() < deadline:
+        height = browser.execute_script("return document.body.scrollHeight")
+        if height != last_height:
+            # New content arrived, let the lazily loaded items finish rendering
+            _wait_for_quiet_dom(browser, selector, label, quiet_period, deadline, poll_interval)
+            height = browser.execute_script("return document.body.scrollHeight")
+            break
+        time.sleep(poll_interval)
+    record_wait(label, time.perf_counter() - start)
+    return height
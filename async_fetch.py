@@ -0,0 +1,138 @@
+import asyncio
+import time
+from urllib.parse import urljoin, urlparse
+
+import aiohttp
+from html_parsing import find_link, has_class_name, parse_html
+from vmp_http import HTTP_HEADERS
+
+# Status codes worth another attempt: rate limiting and transient server errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class AsyncFetcher:
+    """
+    Shared asyncio HTTP client for portals that serve plain HTML.
+
+    One aiohttp session keeps connections alive per host. At most `max_connections` requests run
+    at the same time, and at most `max_per_host` of them against the same host. Responses may be
+    gzip/deflate compressed, every request has a timeout and transient failures are retried with
+    exponential backoff. Use it as `async with AsyncFetcher() as fetcher: ...`.
+    """
+
+    def __init__(self, max_connections=20, max_per_host=4, timeout=20, retries=3, backoff=0.5, headers=None):
+        self.max_connections = max_connections
+        self.max_per_host = max_per_host
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.headers = dict(HTTP_HEADERS, **{'Accept-Encoding': "gzip, deflate"}, **(headers or {}))
+        self.session = None
+        self.latencies = {}
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(
+            limit=self.max_connections,
+            limit_per_host=self.max_per_host,
+            keepalive_timeout=30,
+            ttl_dns_cache=300,
+        )
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            headers=self.headers,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            auto_decompress=True,
+        )
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.session.close()
+
+    async def fetch(self, url, method='GET', **kwargs):
+        """
+        Returns the body of `url` as text. Raises the last error once all retries are used up.
+        """
+        for attempt in range(self.retries + 1):
+            start = time.perf_counter()
+            try:
+                async with self.session.request(method, url, **kwargs) as response:
+                    if response.status in RETRY_STATUSES and attempt < self.retries:
+                        raise aiohttp.ClientResponseError(
+                            response.request_info, response.history, status=response.status, message=response.reason
+                        )
+                    response.raise_for_status()
+                    text = await response.text()
+                self.latencies.setdefault(urlparse(url).netloc, []).append(time.perf_counter() - start)
+                return text
+            except aiohttp.ClientResponseError as e:
+                if e.status not in RETRY_STATUSES or attempt == self.retries:
+                    raise
+                error = e
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt == self.retries:
+                    raise
+                error = e
+            delay = self.backoff * 2 ** attempt
+            print(f"Fetching {url} failed ({error}), retrying in {delay:.1f}s...")
+            await asyncio.sleep(delay)
+
+    async def fetch_paginated(self, url, next_page=None, max_pages=50):
+        """
+        Follows a paginated listing from `url` via the link matching the `next_page` attributes
+        (e.g. {'title': 'Nächste Seite'}). Returns the HTML of every page in order.
+        """
+        pages = [await self.fetch(url)]
+        url = find_next_page_url(pages[0], url, next_page) if next_page else None
+        while url and len(pages) < max_pages:
+            try:
+                html = await self.fetch(url)
+            except Exception as e:
+                # Keep the pages fetched so far instead of losing the whole listing
+                print(f"Stopped paginating at {url}: {e!r}")
+                break
+            pages.append(html)
+            url = find_next_page_url(html, url, next_page)
+        return pages
+
+    def report(self):
+        for host, latencies in sorted(self.latencies.items()):
+            print(f"  {host}: {len(latencies)} requests, mean {sum(latencies) / len(latencies) * 1000:.0f} ms")
+
+
+def find_next_page_url(html, page_url, next_page):
+    link = find_link(parse_html(html), next_page)
+    if link is None or not link.get('href') or has_class_name(link, 'disabled'):
+        return None
+    next_url = urljoin(page_url, link.get('href'))
+    return next_url if next_url.startswith('http') else None
+
+
+async def _fetch_listings(listings, options):
+    async with AsyncFetcher(**options) as fetcher:
+        async def fetch_listing(url, next_page):
+            try:
+                return await fetcher.fetch_paginated(url, next_page)
+            except Exception as e:
+                print(f"An error occurred while fetching {url}: {e!r}")
+                return []
+
+        results = await asyncio.gather(*(fetch_listing(url, next_page) for url, next_page in listings.items()))
+        if fetcher.latencies:
+            print("Async fetch latency per host:")
+            fetcher.report()
+    return dict(zip(listings, results))
+
+
+def fetch_listings(listings, **options):
+    """
+    Synchronous entry point for the scrapers: fetches every listing in `listings`
+    ({url: next-page link attributes or None}) concurrently and returns {url: [html, ...]}.
+    """
+    if not listings:
+        return {}
+    return asyncio.run(_fetch_listings(listings, options))
+
+
+def fetch_page(url, **options):
+    pages = fetch_listings({url: None}, **options)[url]
+    return pages[0] if pages else None
@@ -0,0 +1,53 @@
+"""
+Loads the start page of every Selenium portal with the full and the lean browser profile
+(browser_pool.initialize_browser) and compares navigation time, bytes received and requests
+blocked per portal. Unlike the other benchmarks this one needs Chrome and network access.
+
+Usage: python benchmarks/bench_browser_profile.py [loads per portal]
+"""
+import sys
+
+import synthetic  # noqa: F401 (makes the project modules importable)
+from adaptive_wait import wait_until_stable
+from browser_pool import BrowserPool, get_page_load_stats, load_page, reset_page_load_stats
+from vmp_engine import VMP_PORTALS
+
+PORTALS = {
+    "https://www.myorder.rib.de": ("https://www.myorder.rib.de/public/publications", "div.item"),
+    "https://www.e-vergabe-sh.de": ("https://www.e-vergabe-sh.de/vergabeplattform/vergabeinformationen", "div"),
+    **{source_url: (portal['url'], "input") for source_url, portal in VMP_PORTALS.items()},
+}
+
+
+def measure(lean, loads):
+    reset_page_load_stats()
+    with BrowserPool(size=1, lean=lean, transfer_stats=True) as pool:
+        for source_url, (url, selector) in PORTALS.items():
+            # One checkout per portal, so its traffic is counted when the browser is reset
+            with pool.browser() as browser:
+                for _ in range(loads):
+                    try:
+                        load_page(browser, url, source_url)
+                        wait_until_stable(browser, selector, source_url)
+                    except Exception as e:
+                        print(f"Loading {url} failed: {e}")
+    return get_page_load_stats()
+
+
+def main(loads):
+    full = measure(False, loads)
+    lean = measure(True, loads)
+    print(f"Start page loads per portal ({loads} each), full -> lean profile:")
+    for source_url in PORTALS:
+        if source_url not in full or source_url not in lean:
+            continue
+        before, after = full[source_url], lean[source_url]
+        before_s = sum(before['seconds']) / len(before['seconds'])
+        after_s = sum(after['seconds']) / len(after['seconds'])
+        print(f"  {source_url:<45} {before_s:5.2f}s -> {after_s:5.2f}s   "
+              f"{before['bytes'] / loads / 1024:7.0f} -> {after['bytes'] / loads / 1024:6.0f} KiB per load   "
+              f"{after['blocked'] // loads} requests blocked")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 3)
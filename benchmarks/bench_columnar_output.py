@@ -0,0 +1,64 @@
+"""
+Compares loading the tenders for the dashboard from a CSV snapshot (dates parsed row by row,
+keywords split on every rerun) with loading the typed Parquet snapshot.
+
+Usage: python benchmarks/bench_columnar_output.py [rows]
+"""
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+import psutil
+
+from synthetic import make_tenders
+from tender_store import DATE_COLUMNS, read_typed_snapshot, write_typed_snapshot
+
+
+def convert_date(date):
+    # The dashboard's former per-value date conversion
+    if isinstance(date, pd.Timestamp):
+        return date
+    date = str(date).strip()
+    if date in ['not specified', '', 'nan']:
+        return pd.NaT
+    return pd.to_datetime(date, format="%d.%m.%y", errors='coerce')
+
+
+def load_csv(path):
+    df = pd.read_csv(path)
+    for column in DATE_COLUMNS:
+        df[column] = df[column].apply(convert_date)
+    df['found_keywords'] = df['found_keywords'].fillna('').str.split(', ')
+    return df
+
+
+def measure(label, load, path):
+    process = psutil.Process()
+    rss_before = process.memory_info().rss
+    start = time.perf_counter()
+    df = load(path)
+    elapsed = time.perf_counter() - start
+    rss_growth = process.memory_info().rss - rss_before
+    frame_size = df.memory_usage(deep=True).sum()
+    print(f"{label:<8} load {elapsed * 1000:8.0f} ms   RSS +{rss_growth / 2**20:6.1f} MiB   "
+          f"frame {frame_size / 2**20:7.1f} MiB   file {os.path.getsize(path) / 2**20:6.1f} MiB")
+
+
+def main(rows):
+    df = make_tenders(rows)
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path = os.path.join(directory, "tenders.csv")
+        parquet_path = os.path.join(directory, "tenders.parquet")
+        df.to_csv(csv_path, index=False)
+        write_typed_snapshot(df, parquet_path)
+
+        print(f"Loading {rows} tenders:")
+        # Parquet first so its RSS growth is not hidden by memory the CSV run already allocated
+        measure("Parquet", read_typed_snapshot, parquet_path)
+        measure("CSV", load_csv, csv_path)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
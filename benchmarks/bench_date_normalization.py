@@ -0,0 +1,60 @@
+"""
+Compares the former per-value date handling (dateutil in format_date, pd.to_datetime per value in
+the dashboard's convert_date) with date_utils.normalize_dates on a column of mixed date formats.
+
+Usage: python benchmarks/bench_date_normalization.py [rows]
+"""
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from dateutil import parser
+
+from synthetic import make_tenders
+from date_utils import normalize_dates
+
+
+def mixed_date_column(rows, seed=0):
+    # Mostly dd.mm.yy like the scrapers write, plus ISO (snapshots), four-digit years and free text
+    rng = np.random.default_rng(seed)
+    dates = pd.to_datetime(make_tenders(rows, seed)['date_published'], format="%d.%m.%y", errors='coerce')
+    styles = rng.choice(["%d.%m.%y", "%Y-%m-%d", "%d.%m.%Y", "%d. %B %Y"], rows, p=[0.55, 0.3, 0.1, 0.05])
+    values = [date.strftime(style) if pd.notna(date) else "not specified" for date, style in zip(dates, styles)]
+    return pd.Series(values)
+
+
+def format_date_per_value(value):
+    # format_date before it tried explicit formats and cached its results
+    try:
+        return parser.parse(value, dayfirst=True).strftime("%d.%m.%y")
+    except (parser.ParserError, ValueError):
+        return "not specified"
+
+
+def convert_date_per_value(value):
+    # The dashboard's former convert_date
+    value = str(value).strip()
+    if value in ['not specified', '', 'nan']:
+        return pd.NaT
+    return pd.to_datetime(value, format="%d.%m.%y", errors='coerce')
+
+
+def measure(label, function, series):
+    start = time.perf_counter()
+    result = function(series)
+    elapsed = time.perf_counter() - start
+    parsed = pd.to_datetime(result, format="%d.%m.%y", errors='coerce') if result.dtype == object else result
+    print(f"{label:<36} {elapsed * 1000:8.0f} ms   {parsed.notna().sum():>7} dates recognised")
+
+
+def main(rows):
+    series = mixed_date_column(rows)
+    print(f"Normalizing {rows} mixed-format dates:")
+    measure("per value: dateutil (format_date)", lambda s: s.map(format_date_per_value), series)
+    measure("per value: pd.to_datetime (dashboard)", lambda s: s.map(convert_date_per_value), series)
+    measure("vectorized: normalize_dates", normalize_dates, series)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
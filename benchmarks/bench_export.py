@@ -0,0 +1,65 @@
+"""
+Measures time and peak memory of the dashboard's export formats, against the former pandas
+to_excel export. Each export runs in a forked process so its peak RSS can be read on its own.
+
+Usage: python benchmarks/bench_export.py [rows]
+"""
+import multiprocessing
+import resource
+import sys
+import time
+import warnings
+from io import BytesIO
+
+import pandas as pd
+import psutil
+
+from synthetic import make_tenders
+from tender_export import flatten_for_export, to_csv, to_excel, to_parquet
+from tender_store import to_typed_frame
+
+
+def pandas_to_excel(df):
+    # display_overview's former to_excel: the whole workbook is built in memory. It also turned
+    # every source_url into a hyperlink until Excel's per-sheet limit, hence the silenced warning.
+    warnings.filterwarnings('ignore', message="Ignoring URL")
+    output = BytesIO()
+    writer = pd.ExcelWriter(output, engine='xlsxwriter')
+    flatten_for_export(df).to_excel(writer, index=False, sheet_name='Sheet1')
+    writer.close()
+    return output.getvalue()
+
+
+EXPORTS = {
+    "Excel (pandas, in memory)": pandas_to_excel,
+    "Excel (constant_memory)": to_excel,
+    "CSV": to_csv,
+    "Parquet": to_parquet,
+}
+
+
+def run_export(export, df, results):
+    rss_before = psutil.Process().memory_info().rss
+    start = time.perf_counter()
+    data = export(df)
+    elapsed = time.perf_counter() - start
+    # ru_maxrss is in KiB on Linux
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    results.put((elapsed, peak - rss_before, len(data)))
+
+
+def main(rows):
+    df = to_typed_frame(make_tenders(rows))
+    context = multiprocessing.get_context('fork')
+    print(f"Exporting {rows} tenders:")
+    for label, export in EXPORTS.items():
+        results = context.Queue()
+        process = context.Process(target=run_export, args=(export, df, results))
+        process.start()
+        elapsed, peak_growth, size = results.get()
+        process.join()
+        print(f"  {label:<26} {elapsed:7.2f} s   peak RSS +{peak_growth / 2**20:7.1f} MiB   file {size / 2**20:6.1f} MiB")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,60 @@
+"""
+Compares the Overview tab's former pandas filtering (keyword lambda per row, fresh date masks)
+with TenderFilterIndex on a typed tender frame.
+
+Usage: python benchmarks/bench_filter_index.py [rows]
+"""
+import datetime
+import sys
+import time
+
+import pandas as pd
+
+from synthetic import make_tenders
+from filter_index import TenderFilterIndex
+from tender_store import DATE_COLUMNS, to_typed_frame
+
+QUERIES = {
+    "one state": dict(states=["Bavaria"]),
+    "three keywords": dict(keywords=["Studie", "Museum", "Konzept"]),
+    "published in Q2": dict(date_ranges={'date_published': (datetime.date(2024, 4, 1), datetime.date(2024, 6, 30))}),
+    "state + keyword + 2 dates": dict(
+        states=["Bavaria", "Berlin"],
+        keywords=["Studie"],
+        date_ranges={'date_published': (datetime.date(2024, 3, 1), datetime.date(2024, 9, 30)),
+                     'tender_deadline': (datetime.date(2024, 4, 1), datetime.date(2024, 12, 31))},
+    ),
+}
+
+
+def pandas_filter(df, states=None, keywords=None, date_ranges=None):
+    # display_overview before the filter index
+    for column, (start, end) in (date_ranges or {}).items():
+        df = df[(df[column] >= pd.to_datetime(start)) & (df[column] <= pd.to_datetime(end))]
+    if states is not None:
+        df = df[df['state'].isin(states)]
+    if keywords is not None:
+        df = df[df['found_keywords'].apply(lambda x: any(kw in x for kw in keywords))]
+    return df
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main(rows):
+    df = to_typed_frame(make_tenders(rows))
+    index, build_ms = timed(lambda: TenderFilterIndex(df, DATE_COLUMNS))
+    print(f"{rows} tenders, index built once in {build_ms:.0f} ms "
+          f"({index.keyword_bits.nbytes / 2**20:.1f} MiB of keyword bitsets)")
+    for label, query in QUERIES.items():
+        expected, pandas_ms = timed(lambda: pandas_filter(df, **query))
+        mask, index_ms = timed(lambda: index.mask(**query))
+        assert df[mask].index.equals(expected.index)
+        print(f"  {label:<28} pandas {pandas_ms:8.1f} ms   index {index_ms:7.1f} ms   {len(expected):>7} rows")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,202 @@
+"""
+Compares the former BeautifulSoup (html.parser) result page parsers with the lxml ones in
+html_parsing, on synthetic fixture pages of each portal layout. Both must return the same tenders.
+
+Usage: python benchmarks/bench_html_parsing.py [rows per page]
+"""
+import contextlib
+import io
+import sys
+import time
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+
+from synthetic import make_bayern_page, make_e_vergabe_sh_page, make_muenchen_page, make_vmp_blocks_page, make_vmp_list_page
+from capstone_scraping_script import (extract_tender_code, parse_application_period, parse_bayern_page, parse_e_vergabe_sh_page,
+                                     scrape_muenchen)
+from html_parsing import parse_html
+from date_utils import format_date
+from keyword_matcher import match_keywords
+from location_resolver import get_state_from_location
+from vmp_engine import VMP_PORTALS, normalize_tender_dates, parse_results_page
+
+KEYWORDS = ["Erlebnis", "Freizeit", "Destination", "Tourismus", "Besucher", "Museum", "Konzept", "Studie"]
+
+
+# The parsers before html_parsing, condensed from vmp_engine and capstone_scraping_script
+
+def bs4_list_rows(soup, portal):
+    tenders = []
+    min_cells = max(index for index, _ in portal['columns'].values()) + 1
+    for row in soup.select(portal['row_selector']):
+        cells = row.find_all('td')
+        cell_texts = [cell.text.strip() for cell in cells]
+        if len(cells) < min_cells or any(text in cell_texts[0] for text in portal['no_results_texts']):
+            continue
+        tender = {}
+        for field, (index, tag) in portal['columns'].items():
+            if tag:
+                value_tag = cells[index].find(tag)
+                tender[field] = value_tag.text.strip() if value_tag else "not specified"
+            else:
+                tender[field] = cell_texts[index] or "not specified"
+        tenders.append(normalize_tender_dates(tender))
+    return tenders
+
+
+def bs4_block_rows(soup, portal):
+    tenders = []
+    for tbody in soup.select(portal['row_selector']):
+        tender = {}
+        for row in tbody.find_all('tr', class_='tableRowLeft'):
+            cells = row.find_all('td')
+            if len(cells) < 2:
+                continue
+            header_text = cells[0].get_text(strip=True)
+            data_text = cells[1].get_text(strip=True)
+            for label, field in portal['fields'].items():
+                if label in header_text:
+                    tender[field] = data_text or "not specified"
+                    break
+        if tender.get('tender_name', "not specified") != "not specified":
+            tenders.append(normalize_tender_dates(tender))
+    return tenders
+
+
+def bs4_results_page(html, portal):
+    soup = BeautifulSoup(html, 'html.parser')
+    tenders = {'list': bs4_list_rows, 'blocks': bs4_block_rows}[portal['layout']](soup, portal)
+    next_url = None
+    if portal['paginate']:
+        next_page = soup.find('a', portal['next_page'])
+        if next_page and next_page.get('href') and 'disabled' not in next_page.get('class', []):
+            next_url = urljoin(portal['url'], next_page['href'])
+    return tenders, next_url
+
+
+def bs4_muenchen(html, keywords, source_url):
+    tenders = []
+    for row in BeautifulSoup(html, 'html.parser').find_all('tr', class_='tableRow clickable-row publicationDetail'):
+        tender_name = row.find('td', class_='tender').text.strip()
+        found_keywords = match_keywords(tender_name, keywords)
+        if found_keywords:
+            tenders.append({
+                'date_published': format_date(row.find('td').text.strip()),
+                'tender_name': tender_name,
+                'tender_authority': row.find('td', class_='tenderAuthority').text.strip(),
+                'tender_type': row.find('td', class_='tenderType').text.strip(),
+                'tender_deadline': format_date(row.find('td', class_='tenderDeadline').text.strip().split(' ')[0]),
+                'source_url': source_url,
+                'found_keywords': ', '.join(found_keywords),
+            })
+    return tenders
+
+
+def bs4_e_vergabe_sh(html, keyword, source_url):
+    tenders = []
+    for block in BeautifulSoup(html, 'html.parser').select("div.bek_list_item_w_hover.js-list-detaillink"):
+        tenders.append({
+            'tender_name': block.find('div', class_='bek_list_item_headline').get_text(strip=True) or "not specified",
+            'tender_authority': block.find('div', class_='bek_list_item_info').get_text(strip=True).replace('Beauftragtes Unternehmen: ', '') or "not specified",
+            'tender_code': block.find('div', class_='bek_list_item_left').contents[0].strip() or "not specified",
+            'date_published': format_date(block.find('div', class_='bek-date').get_text(strip=True).replace('Datum: ', '') or "not specified"),
+            'source_url': source_url,
+            'found_keywords': keyword,
+        })
+    return tenders
+
+
+def bs4_bayern(html, keywords, source_url):
+    # One find(string=...) scan of the block per info label, plus the deadline labels
+    tenders = []
+    for block in BeautifulSoup(html, 'html.parser').find_all('div', class_='item'):
+        title_div = block.find('div', style=lambda value: value and 'overflow: hidden' in value)
+        title_tag = title_div.find('strong') if title_div else None
+        if not title_tag:
+            continue
+        title = title_tag.get_text(strip=True)
+        found_keywords = match_keywords(title, keywords)
+        if not found_keywords:
+            continue
+        description_tag = block.find('div', class_='text-muted')
+        description = description_tag.get_text(strip=True) if description_tag else "No Description"
+        tender_details = {
+            'tender_name': title,
+            'tender_authority': description.split(' by ')[-1],
+            'tender_code': extract_tender_code(title, source_url),
+            'source_url': source_url,
+            'found_keywords': ', '.join(found_keywords)
+        }
+        for info_label, info_key in {'Application period': 'application_period', 'Period': 'period',
+                                     'Execution place': 'tender_location'}.items():
+            info_tag = block.find('div', class_='info-label', string=lambda text: text and info_label in text)
+            if info_tag:
+                value = info_tag.find_next('div').text.strip() if info_tag.find_next('div') else "not specified"
+                if info_key == 'application_period':
+                    tender_details['application_start_date'], tender_details['application_deadline'] = parse_application_period(value)
+                else:
+                    tender_details[info_key] = value
+        tender_details['tender_deadline'] = "not specified"
+        for label in ["Application deadline", "Expiration time"]:
+            info_tag = block.find('div', class_='info-label', string=lambda text: text and label in text)
+            if info_tag:
+                tender_details['tender_deadline'] = format_date(info_tag.find_next('div').text.strip())
+                break
+        date_div = block.find('div', class_='item-right meta')
+        if date_div:
+            day = date_div.find('div', class_='date').text.strip()
+            month_year = date_div.find('div', class_='month').text.strip()
+            tender_details['date_published'] = format_date(f"{day} {month_year}")
+        else:
+            tender_details['date_published'] = "not specified"
+        tender_details['state'] = get_state_from_location(tender_details.get('tender_location', ''))
+        tenders.append(tender_details)
+    return tenders
+
+
+def muenchen_rows(tenders):
+    # scrape_muenchen reformats date_published with dateutil; compare the fields both parsers share
+    return [{key: value for key, value in tender.items() if key != 'date_published'} for tender in tenders]
+
+
+def timed(function, repeat):
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = function()
+        start = time.perf_counter()
+        for _ in range(repeat):
+            function()
+    return result, (time.perf_counter() - start) / repeat * 1000
+
+
+def main(rows):
+    list_portal = dict(VMP_PORTALS["https://vergabe.rlp.de"], source_url="https://vergabe.rlp.de")
+    blocks_portal = dict(VMP_PORTALS["https://vergabe.vmstart.de"], source_url="https://vergabe.vmstart.de")
+    cases = {
+        "VMP list (scoped)": (make_vmp_list_page(rows),
+                              lambda html: bs4_results_page(html, list_portal),
+                              lambda html: parse_results_page(html, list_portal)),
+        "VMP blocks": (make_vmp_blocks_page(rows),
+                       lambda html: bs4_results_page(html, blocks_portal),
+                       lambda html: parse_results_page(html, blocks_portal)),
+        "München table": (make_muenchen_page(rows),
+                          lambda html: muenchen_rows(bs4_muenchen(html, KEYWORDS, "https://vergabe.muenchen.de")),
+                          lambda html: muenchen_rows(scrape_muenchen(html, KEYWORDS, "https://vergabe.muenchen.de"))),
+        "e-vergabe-sh list": (make_e_vergabe_sh_page(rows),
+                              lambda html: bs4_e_vergabe_sh(html, "Museum", "https://www.e-vergabe-sh.de"),
+                              lambda html: parse_e_vergabe_sh_page(html, "Museum", "https://www.e-vergabe-sh.de")),
+        "myorder.rib.de items": (make_bayern_page(rows),
+                                 lambda html: bs4_bayern(html, KEYWORDS, "https://www.myorder.rib.de"),
+                                 lambda html: parse_bayern_page(parse_html(html), KEYWORDS, "https://www.myorder.rib.de")),
+    }
+    print(f"Parsing fixture pages with {rows} result rows:")
+    for label, (html, former, current) in cases.items():
+        expected, former_ms = timed(lambda: former(html), 10)
+        result, current_ms = timed(lambda: current(html), 10)
+        assert result == expected, label
+        print(f"  {label:<20} {len(html) / 1024:5.0f} KiB   html.parser {former_ms:7.1f} ms   "
+              f"lxml {current_ms:6.1f} ms   x{former_ms / current_ms:4.1f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50)
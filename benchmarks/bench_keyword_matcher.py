@@ -0,0 +1,71 @@
+"""
+Compares the former per-keyword substring scan with the Aho-Corasick KeywordMatcher on synthetic
+tender titles, for the scraper's keyword list size and for keyword lists in the hundreds.
+
+Usage: python benchmarks/bench_keyword_matcher.py [titles]
+"""
+import sys
+import time
+
+import numpy as np
+
+from synthetic import KEYWORDS
+from keyword_matcher import KeywordMatcher, fold_text
+
+WORDS = ["Neubau", "Sanierung", "Rahmenvertrag", "Leistungen", "für", "die", "Stadt", "Landkreis", "Planung",
+         "Durchführung", "Erstellung", "eines", "einer", "Gebäude", "Straße", "Lieferung", "Wartung", "Schule"]
+
+
+def make_keywords(count, seed=0):
+    # The real keywords plus German-looking compounds, so lists in the hundreds overlap like real ones
+    rng = np.random.default_rng(seed)
+    keywords = dict.fromkeys(KEYWORDS)
+    while len(keywords) < count:
+        first, second = rng.choice(KEYWORDS + WORDS, 2)
+        keywords[f"{first}{second.lower()}"] = None
+    return list(keywords)[:count]
+
+
+def make_titles(count, keywords, seed=0):
+    rng = np.random.default_rng(seed)
+    titles = []
+    for _ in range(count):
+        words = list(rng.choice(WORDS, rng.integers(6, 14)))
+        if rng.random() < 0.3:
+            words.insert(rng.integers(0, len(words)), rng.choice(keywords))
+        titles.append(" ".join(words))
+    return titles
+
+
+def substring_scan(titles, keywords):
+    # The scrapers' former matching: one lowercase + substring scan per keyword and title
+    return [[keyword for keyword in keywords if keyword.lower() in title.lower()] for title in titles]
+
+
+def folded_substring_scan(titles, keywords):
+    # Same semantics as KeywordMatcher, for checking its results
+    folded = [(keyword, fold_text(keyword)) for keyword in keywords]
+    return [[keyword for keyword, pattern in folded if pattern in fold_text(title)] for title in titles]
+
+
+def measure(label, function):
+    start = time.perf_counter()
+    result = function()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<28} {elapsed * 1000:8.0f} ms")
+    return result
+
+
+def main(title_count):
+    for keyword_count in (31, 250, 500):
+        keywords = make_keywords(keyword_count)
+        titles = make_titles(title_count, keywords)
+        print(f"{title_count} titles, {len(keywords)} keywords:")
+        measure("per-keyword substring scan", lambda: substring_scan(titles, keywords))
+        matcher = measure("build KeywordMatcher", lambda: KeywordMatcher(keywords))
+        found = measure("KeywordMatcher.find", lambda: [matcher.find(title) for title in titles])
+        assert found == folded_substring_scan(titles, keywords)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
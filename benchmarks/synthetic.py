@@ -0,0 +1,156 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Benchmarks run as scripts from the repository root: make the project modules importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+KEYWORDS = ["Erlebnis", "Freizeit", "Destination", "Tourismus", "Besucher", "Museum", "Markenwelt", "Ausstellung",
+            "Konzept", "Masterplan", "Machbarkeit", "Beratung", "Studie", "Analyse", "Gutachten", "Gartenschau"]
+
+STATES = ["Bavaria", "Berlin", "Brandenburg", "Lower Saxony", "North Rhine-Westphalia", "Rhineland-Palatinate",
+          "Saarland", "Schleswig-Holstein"]
+
+SOURCE_URLS = ["https://vergabe.muenchen.de", "https://www.myorder.rib.de", "https://www.dtvp.de",
+               "https://www.e-vergabe-sh.de", "https://www.vergabe.rlp.de", "https://www.evergabe.nrw.de",
+               "https://vergabeplattform.berlin.de", "https://vergabemarktplatz.brandenburg.de"]
+
+TENDER_TYPES = ["Öffentliche Ausschreibung", "VgV Vergebener Auftrag", "UVgO Ausschreibung", "VOB/A Vergebener Auftrag",
+                "Verhandlungsvergabe", "not specified"]
+
+LOCATIONS = ["10115 Berlin", "80331 München", "24103 Kiel", "50667 Köln", "14467 Potsdam", "55116 Mainz",
+             "66111 Saarbrücken", "30159 Hannover", "not specified"]
+
+
+def make_tenders(n, seed=0):
+    """
+    Returns `n` synthetic tenders in the format scrape_all produces: dates as dd.mm.yy strings,
+    "not specified" sentinels and comma separated found_keywords.
+    """
+    rng = np.random.default_rng(seed)
+    published = pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 365, n), unit='D')
+    deadline = published + pd.to_timedelta(rng.integers(7, 60, n), unit='D')
+
+    def as_text(dates, missing_share):
+        text = dates.strftime('%d.%m.%y').to_numpy(dtype=object)
+        text[rng.random(n) < missing_share] = "not specified"
+        return text
+
+    keyword_count = rng.integers(1, 4, n)
+    keyword_choice = rng.integers(0, len(KEYWORDS), (n, 3))
+    found_keywords = [', '.join(dict.fromkeys(KEYWORDS[k] for k in row[:count]))
+                      for row, count in zip(keyword_choice, keyword_count)]
+
+    return pd.DataFrame({
+        'tender_name': [f"Tender {i} {KEYWORDS[k]} Vorhaben" for i, k in enumerate(keyword_choice[:, 0])],
+        'tender_authority': [f"Vergabestelle {i % 500}" for i in range(n)],
+        'application_start_date': as_text(published, 0.05),
+        'tender_deadline': as_text(deadline, 0.1),
+        'period': "not specified",
+        'tender_location': rng.choice(LOCATIONS, n),
+        'date_published': as_text(published, 0.02),
+        'tender_type': rng.choice(TENDER_TYPES, n),
+        'source_url': rng.choice(SOURCE_URLS, n),
+        'found_keywords': found_keywords,
+        'state': rng.choice(STATES, n),
+    })
+
+
+def page_chrome(body, seed=0):
+    """
+    Wraps result markup in the bulk of a real portal page: a head full of scripts and styles,
+    a navigation menu before the results and a footer after them.
+    """
+    rng = np.random.default_rng(seed)
+    scripts = ''.join(f"<script>var config{i} = {{'key': '{rng.integers(1e9)}', 'items': [{', '.join(map(str, rng.integers(0, 100, 300)))}]}};</script>"
+                      for i in range(60))
+    styles = ''.join(f"<style>.c{i} {{ margin: {i}px; padding: {i % 7}px; color: #{i:06x}; }}</style>" for i in range(40))
+    subpages = lambda i: ''.join(f"<li><a href='/section/{i}/{j}'>Unterseite {j}</a></li>" for j in range(8))
+    navigation = ''.join(f"<li class='nav-item'><a class='nav-link' href='/section/{i}'>Bereich {i}</a><ul>{subpages(i)}</ul></li>"
+                         for i in range(30))
+    footer = ''.join(f"<div class='footer-col'><p>Impressum {i}</p><a href='/legal/{i}'>Datenschutz</a></div>" for i in range(20))
+    return (f"<!DOCTYPE html><html><head><title>Vergabeportal</title>{styles}{scripts}</head>"
+            f"<body><nav><ul>{navigation}</ul></nav><main>{body}</main><footer>{footer}</footer></body></html>")
+
+
+def next_page_link(has_next):
+    return "<a title='Nächste Seite' href='/results?page=2'>&gt;</a>" if has_next else ""
+
+
+def make_vmp_list_page(rows, seed=0, has_next=True):
+    # VMPCenter result table (vmp_engine.LIST_LAYOUT), pagination below the list
+    tenders = make_tenders(rows, seed)
+    table_rows = ''.join(
+        f"<tr><td><abbr title='{t.date_published}'>{t.date_published} 10:00</abbr></td>"
+        f"<td><abbr title='{t.tender_deadline}'>{t.tender_deadline} 12:00</abbr></td>"
+        f"<td>\n  {t.tender_name}\n</td><td>{t.tender_type}</td><td>{t.tender_authority}</td>"
+        f"<td><a href='/detail/{i}'>Details</a></td></tr>"
+        for i, t in enumerate(tenders.itertuples()))
+    return page_chrome(f"<div id='listTemplate'><table><thead><tr><th>Erschienen</th></tr></thead>"
+                       f"<tbody>{table_rows}</tbody></table></div>"
+                       f"<div class='browsePages'><a href='/results?page=1'>1</a>{next_page_link(has_next)}</div>", seed)
+
+
+def make_vmp_blocks_page(rows, seed=0, has_next=True):
+    # NetServer result blocks (vmp_engine.BLOCKS_LAYOUT): one tbody of header/value rows per tender
+    tenders = make_tenders(rows, seed)
+    labels = [('Ausschreibung', 'tender_name'), ('Vergabestelle', 'tender_authority'), ('Verfahrensart', 'tender_type'),
+              ('Abgabefrist', 'tender_deadline'), ('Erschienen am', 'date_published')]
+    blocks = ''.join(
+        "<tbody class='tableLeftHeaderBlock' tabindex='0'>"
+        + ''.join(f"<tr class='tableRowLeft'><td> {label}: </td><td> <span>{getattr(t, field)}</span> </td></tr>" for label, field in labels)
+        + "</tbody>"
+        for t in tenders.itertuples())
+    return page_chrome(f"<div class='border col-lg-12'><table>{blocks}</table>{next_page_link(has_next)}</div>", seed)
+
+
+def make_muenchen_page(rows, seed=0):
+    tenders = make_tenders(rows, seed)
+    table_rows = ''.join(
+        f"<tr class='tableRow clickable-row publicationDetail'><td>{t.date_published}</td><td class='tender'>{t.tender_name}</td>"
+        f"<td class='tenderAuthority'>{t.tender_authority}</td><td class='tenderType'>{t.tender_type}</td>"
+        f"<td class='tenderDeadline'>{t.tender_deadline} 10:00</td></tr>"
+        for t in tenders.itertuples())
+    return page_chrome(f"<table class='resultTable'>{table_rows}</table>", seed)
+
+
+def make_e_vergabe_sh_page(rows, seed=0):
+    tenders = make_tenders(rows, seed)
+    blocks = ''.join(
+        f"<div class='bek_list_item_w_hover js-list-detaillink'><div class='bek_list_item_left'>SH-{i:05d} <span>Los 1</span></div>"
+        f"<div class='bek_list_item_headline'> {t.tender_name} </div>"
+        f"<div class='bek_list_item_info'>Beauftragtes Unternehmen: {t.tender_authority}</div>"
+        f"<div class='bek-date'>Datum: {t.date_published}</div></div>"
+        for i, t in enumerate(tenders.itertuples()))
+    return page_chrome(f"<div class='bek_list_scroll'>{blocks}</div>", seed)
+
+
+def make_bayern_page(rows, seed=0, has_next=True):
+    # myorder.rib.de result items: title, publisher and info-label/value pairs, publication date on the right
+    tenders = make_tenders(rows, seed)
+
+    def published(date, part):
+        # The meta block shows the day above "Mon YYYY"
+        if date == "not specified":
+            return ""
+        return pd.Timestamp(f"20{date[6:]}-{date[3:5]}-{date[:2]}").strftime('%d' if part == 'date' else '%b %Y')
+
+    def info(label, value):
+        return f"<div class='col-md-4'><div class='info-label'>{label}</div><div class='info-value'>{value}</div></div>"
+
+    items = ''.join(
+        f"<div class='item'><div class='item-left'>"
+        f"<div style='overflow: hidden; text-overflow: ellipsis;'><strong> {t.tender_name} (BY-{i:05d}) </strong></div>"
+        f"<div class='text-muted'>Published by {t.tender_authority}</div><div class='row'>"
+        + info("Application period", f"{t.application_start_date} until {t.tender_deadline}")
+        + (info("Period", "01.03.25 - 31.12.25") if i % 3 else "")
+        + info("Execution place", t.tender_location)
+        + info("Expiration time" if i % 4 == 0 else "Application deadline", f"{t.tender_deadline} 12:00")
+        + f"</div></div><div class='item-right meta'><div class='date'>{published(t.date_published, 'date')}</div>"
+        f"<div class='month'>{published(t.date_published, 'month')}</div></div></div>"
+        for i, t in enumerate(tenders.itertuples()))
+    next_link = "<a class='page-link' aria-label='Next' href='?page=2'>&raquo;</a>" if has_next else \
+        "<a class='page-link disabled' aria-label='Next'>&raquo;</a>"
+    return page_chrome(f"<div class='items'>{items}</div><nav><ul class='pagination'><li>{next_link}</li></ul></nav>", seed)
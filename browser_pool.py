@@ -0,0 +1,355 @@
+import json
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+import psutil
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chrome.service import Service as ChromeService
+from selenium.webdriver.chrome.options import Options
+from webdriver_manager.chrome import ChromeDriverManager
+
+# Resolving the driver binary hits the network, so do it once per process
+_driver_path = None
+_driver_path_lock = threading.Lock()
+
+# How long a checkout waits on the idle queue before it tries to launch into a freed slot
+ACQUIRE_POLL_SECONDS = 1
+
+# Requests the lean profile never sends: images, web fonts, analytics and consent manager scripts.
+# Stylesheets still load, Selenium's visibility and clickability checks depend on the layout.
+BLOCKED_URL_PATTERNS = [
+    "*.png*", "*.jpg*", "*.jpeg*", "*.gif*", "*.webp*", "*.svg*", "*.ico*",
+    "*.woff*", "*.ttf*", "*.otf*", "*.eot*",
+    "*google-analytics.com/*", "*googletagmanager.com/*", "*doubleclick.net/*", "*matomo.js*", "*piwik.js*",
+    "*etracker.com/*", "*consent.cookiebot.com/*", "*usercentrics.eu/*", "*cookielaw.org/*", "*consentmanager.net/*",
+]
+
+_page_load_stats = {}
+_page_load_stats_lock = threading.Lock()
+# Session id -> label of the page a browser loaded last, which its network traffic is counted
+# towards. Only browsers started with transfer_stats are in here.
+_page_labels = {}
+
+
+def get_driver_path():
+    global _driver_path
+    with _driver_path_lock:
+        if _driver_path is None:
+            _driver_path = ChromeDriverManager().install()
+        return _driver_path
+
+
+# Function to download and initialize the ChromeDriver
+def initialize_browser(lean=False, transfer_stats=False):
+    """
+    Starts a headless Chrome. The `lean` profile does not load images, blocks the requests in
+    BLOCKED_URL_PATTERNS and returns from navigation at DOMContentLoaded ("eager" page load
+    strategy): the scrapers wait for the results they need themselves.
+    With `transfer_stats`, Chrome keeps a performance log that count_transfer reads the bytes
+    received per page from; buffering and parsing it costs time, so it is off for normal runs.
+    """
+    chrome_options = Options()
+    chrome_options.add_argument("--headless")  # Run in headless mode
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    if transfer_stats:
+        chrome_options.set_capability("goog:loggingPrefs", {'performance': 'ALL'})
+    if lean:
+        chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+        chrome_options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+        chrome_options.page_load_strategy = 'eager'
+    driver = webdriver.Chrome(service=ChromeService(get_driver_path()), options=chrome_options)
+    if lean:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {'urls': BLOCKED_URL_PATTERNS})
+    if transfer_stats:
+        with _page_load_stats_lock:
+            _page_labels[driver.session_id] = None
+    print(f"Browser initialized successfully{' (lean profile)' if lean else ''}.")
+    return driver
+
+
+def get_page_load_stats():
+    with _page_load_stats_lock:
+        return {label: dict(stats, seconds=list(stats['seconds'])) for label, stats in _page_load_stats.items()}
+
+
+def reset_page_load_stats():
+    with _page_load_stats_lock:
+        _page_load_stats.clear()
+
+
+def report_page_load_stats():
+    stats = get_page_load_stats()
+    if not stats:
+        return
+    print("Browser page loads per portal:")
+    for label, counts in sorted(stats.items()):
+        seconds = counts['seconds']
+        transfer = ""
+        if counts['bytes'] is not None:
+            transfer = f", {counts['bytes'] / (1024 * 1024):.1f} MB received, {counts['blocked']} requests blocked"
+        print(f"  {label}: {len(seconds)} loads, mean {sum(seconds) / len(seconds):.2f}s, max {max(seconds):.2f}s{transfer}")
+
+
+def _page_load_entry(label):
+    # Call with _page_load_stats_lock held
+    # bytes and blocked stay None unless the browsers were started with transfer_stats
+    return _page_load_stats.setdefault(label, {'seconds': [], 'bytes': None, 'blocked': None})
+
+
+def count_transfer(driver):
+    """
+    Adds the bytes received and requests blocked since the previous call to the label of the
+    page the browser loaded last (see load_page), from Chrome's performance log. Does nothing
+    for browsers started without transfer_stats.
+    """
+    session_id = getattr(driver, 'session_id', None)
+    with _page_load_stats_lock:
+        if session_id not in _page_labels:
+            return
+    try:
+        entries = driver.get_log('performance')
+    except WebDriverException:
+        return
+    received = 0
+    blocked = 0
+    for entry in entries:
+        message = json.loads(entry['message'])['message']
+        if message['method'] == 'Network.loadingFinished':
+            received += message['params'].get('encodedDataLength', 0)
+        elif message['method'] == 'Network.loadingFailed' and message['params'].get('blockedReason'):
+            blocked += 1
+    with _page_load_stats_lock:
+        label = _page_labels.get(session_id)
+        if label is not None:
+            counts = _page_load_entry(label)
+            counts['bytes'] = (counts['bytes'] or 0) + int(received)
+            counts['blocked'] = (counts['blocked'] or 0) + blocked
+
+
+def load_page(driver, url, label):
+    """
+    Navigates `driver` to `url` and records how long navigation took under `label` (usually the
+    portal's source_url). Traffic until the next page load is counted towards the same label.
+    """
+    count_transfer(driver)
+    start = time.perf_counter()
+    driver.get(url)
+    elapsed = time.perf_counter() - start
+    with _page_load_stats_lock:
+        _page_load_entry(label)['seconds'].append(elapsed)
+        if driver.session_id in _page_labels:
+            _page_labels[driver.session_id] = label
+
+
+def get_browser_rss(driver):
+    """
+    Returns the resident memory (bytes) of a driver's chromedriver process and all Chrome processes below it.
+    """
+    try:
+        process = psutil.Process(driver.service.process.pid)
+        processes = [process] + process.children(recursive=True)
+    except (AttributeError, psutil.Error):
+        return 0
+    rss = 0
+    for proc in processes:
+        try:
+            rss += proc.memory_info().rss
+        except psutil.Error:
+            continue  # Process exited between listing and sampling
+    return rss
+
+
+class BrowserPool:
+    """
+    A bounded pool of headless Chrome sessions shared by all scrapers of one run.
+
+    At most `size` browsers are ever alive. They are launched lazily (or up front with `prewarm`),
+    handed out with `browser()`, reset before they go back to the pool and quit in `close()`.
+    With `lean`, browsers are started with the lean profile, with `transfer_stats` they also count
+    the bytes every page load receives (see initialize_browser).
+    """
+
+    def __init__(self, size=3, prewarm=False, lean=False, transfer_stats=False):
+        self.size = size
+        self.lean = lean
+        self.transfer_stats = transfer_stats
+        self._idle = queue.Queue()
+        self._browsers = []
+        self._lock = threading.Lock()
+        self._closed = False
+        self.cold_start_times = []
+        self.checkouts = 0
+        self.peak_rss = 0
+        self.started_at = time.perf_counter()
+        if prewarm:
+            self.prewarm()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def prewarm(self):
+        # Launch the missing browsers in parallel so their cold starts overlap
+        with self._lock:
+            missing = self.size - len(self._browsers)
+        threads = [threading.Thread(target=self._launch_idle) for _ in range(missing)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def _launch_idle(self):
+        driver = self._launch()
+        if driver is not None:
+            self._idle.put(driver)
+
+    def _launch(self):
+        with self._lock:
+            if self._closed or len(self._browsers) >= self.size:
+                return None
+            # Reserve the slot before the slow launch so the pool never overshoots its size
+            self._browsers.append(None)
+        start = time.perf_counter()
+        try:
+            driver = initialize_browser(self.lean, self.transfer_stats)
+        except Exception:
+            with self._lock:
+                self._browsers.remove(None)
+            raise
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self._browsers[self._browsers.index(None)] = driver
+            self.cold_start_times.append(elapsed)
+        print(f"Browser cold start took {elapsed:.2f}s ({len(self.cold_start_times)} launched so far).")
+        return driver
+
+    def acquire(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            if self._closed:
+                raise RuntimeError("Browser pool is closed.")
+            try:
+                driver = self._idle.get_nowait()
+                break
+            except queue.Empty:
+                pass
+            driver = self._launch()
+            if driver is not None:
+                break
+            # Pool is at capacity, wait for another scraper to hand a browser back. The wait is
+            # short and the launch retried: a browser discarded in release frees its slot without
+            # anything being put back into the idle queue.
+            wait = ACQUIRE_POLL_SECONDS
+            if deadline is not None:
+                wait = min(wait, deadline - time.monotonic())
+                if wait <= 0:
+                    raise queue.Empty
+            try:
+                driver = self._idle.get(timeout=wait)
+                break
+            except queue.Empty:
+                continue
+        with self._lock:
+            self.checkouts += 1
+        self.sample_rss()
+        return driver
+
+    def release(self, driver):
+        self.sample_rss()
+        if self._closed:
+            self._quit(driver)
+            return
+        try:
+            self.reset(driver)
+        except Exception as e:
+            # A browser that cannot be reset is not safe to reuse, replace it lazily
+            print(f"Discarding browser that failed to reset: {e}")
+            self._quit(driver)
+            return
+        self._idle.put(driver)
+
+    @contextmanager
+    def browser(self, timeout=None):
+        driver = self.acquire(timeout=timeout)
+        try:
+            yield driver
+        finally:
+            self.release(driver)
+
+    @staticmethod
+    def reset(driver):
+        # Drop per-portal state (storage, cookies, open tabs) so the next checkout starts clean
+        count_transfer(driver)
+        with _page_load_stats_lock:
+            if driver.session_id in _page_labels:
+                _page_labels[driver.session_id] = None
+        handles = driver.window_handles
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(handles[0])
+        try:
+            driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+        except Exception:
+            pass  # Some pages deny storage access, cookies are cleared below anyway
+        driver.delete_all_cookies()
+        driver.get("about:blank")
+
+    def sample_rss(self):
+        with self._lock:
+            browsers = [driver for driver in self._browsers if driver is not None]
+        rss = sum(get_browser_rss(driver) for driver in browsers)
+        with self._lock:
+            self.peak_rss = max(self.peak_rss, rss)
+        return rss
+
+    def _quit(self, driver):
+        count_transfer(driver)
+        with _page_load_stats_lock:
+            _page_labels.pop(getattr(driver, 'session_id', None), None)
+        try:
+            driver.quit()
+        except Exception as e:
+            print(f"Failed to quit browser: {e}")
+        with self._lock:
+            if driver in self._browsers:
+                self._browsers.remove(driver)
+
+    def close(self):
+        if self._closed:
+            return
+        self.sample_rss()
+        self._closed = True
+        with self._lock:
+            browsers = [driver for driver in self._browsers if driver is not None]
+        for driver in browsers:
+            self._quit(driver)
+        self.report()
+
+    def stats(self):
+        return {
+            'pool_size': self.size,
+            'lean': self.lean,
+            'browsers_launched': len(self.cold_start_times),
+            'checkouts': self.checkouts,
+            'cold_start_total_s': round(sum(self.cold_start_times), 2),
+            'cold_start_max_s': round(max(self.cold_start_times, default=0), 2),
+            'peak_rss_mb': round(self.peak_rss / (1024 * 1024), 1),
+            'wall_time_s': round(time.perf_counter() - self.started_at, 2),
+        }
+
+    def report(self):
+        stats = self.stats()
+        print(
+            f"Browser pool ({'lean' if stats['lean'] else 'full'} profile): {stats['browsers_launched']} browser(s) launched for {stats['checkouts']} checkouts, "
+            f"cold start total {stats['cold_start_total_s']}s (max {stats['cold_start_max_s']}s), "
+            f"peak browser RSS {stats['peak_rss_mb']} MB."
+        )
@@ -1,115 +1,119 @@
+import numpy as np
 import pandas as pd
 import streamlit as st
 import pydeck as pdk
-from datetime import datetime
-from io import BytesIO
-from capstone_scraping_script import scrape_all  # Import the scrape_all function
-import glob
+import hashlib
+import time
+from capstone_scraping_script import JOBS_PATH, SNAPSHOT_PATH, open_tender_store
+from scrape_jobs import ScrapeJobRegistry
+from tender_store import read_typed_snapshot
+from location_resolver import STATE_COORDINATES, resolve_location
+from filter_index import TenderFilterIndex
+from tender_export import EXPORT_FORMATS
 import os
 os.environ["MAPBOX_API_KEY"] = "1234"
 
+# Scrapes run as background jobs; while one runs the page reruns itself this often to show progress
+scrape_poll_seconds = 3
+scrape_jobs = ScrapeJobRegistry(JOBS_PATH)
+
 def fetch_latest_data():
-    # Define the output directory
-    output_dir = "master/2_streamlit/Capstone_ATIS_Streamlit"
-
-    # Get a list of all CSV files in the directory
-    file_list = glob.glob(os.path.join(output_dir, "capstone_results_*.csv"))
-    
-    if file_list:
-        # Find the most recent file
-        latest_file = max(file_list, key=os.path.getmtime)
-        st.info(f"Loading data from the latest file")
-        return pd.read_csv(latest_file)
+    """
+    Makes sure the typed snapshot exists and returns its identity (path, mtime). A new scrape
+    replaces the file, which changes the mtime and with it the cache key of load_prepared_data.
+    Returns None while the very first scrape is still running.
+    """
+    if not os.path.exists(SNAPSHOT_PATH):
+        # All tenders live in the persistent tender store, legacy CSV snapshots are imported once
+        store = open_tender_store()
+        if store.count():
+            st.info(f"Loading data from the tender store")
+            store.export_typed_snapshot(SNAPSHOT_PATH)
+        else:
+            st.info("No stored tenders found. Scraping new data...")
+            scrape_jobs.start()
+            return None
+    return SNAPSHOT_PATH, os.stat(SNAPSHOT_PATH).st_mtime_ns
+
+def display_scrape_job(job):
+    if job is None:
+        return
+    portals = scrape_jobs.portal_progress(job['job_id'])
+    if job['status'] == 'running':
+        finished = int((portals['status'] != 'running').sum())
+        st.progress(finished / max(len(portals), 1), text=f"Scraping since {job['started_at']}: {finished} of {len(portals)} portals done")
+        st.dataframe(portals)
+    elif job['status'] == 'failed':
+        st.error(f"The last scrape (started {job['started_at']}) failed: {job['error']}")
     else:
-        st.info("No existing file found. Scraping new data...")
-        # Call your scraping function
-        df = scrape_all()
-        return df
-df = fetch_latest_data()
+        st.caption(f"Last scrape finished {job['finished_at']}, {job['tenders']} tenders stored.")
 
-if st.button("Refresh Data"):
-    st.info("Scraping new data. Please wait...")
-    df = scrape_all()
-
-
-def convert_date(date):
-    if isinstance(date, pd.Timestamp):  # If it's already a Timestamp, return it as is
-        return date
-    date = str(date).strip()  # Convert to string and remove leading/trailing whitespace
-    if date in ['not specified', '', 'nan']:  # Handle 'not specified' and empty strings
-        return pd.NaT
-    try:
-        return pd.to_datetime(date, format="%d.%m.%y", errors='coerce')
-    except ValueError:
-        st.error(f"Error converting date: {date}")
-        return pd.NaT
-
-# Apply the conversion
-df['tender_deadline'] = df['tender_deadline'].apply(convert_date)
-
-# Other data processing steps remain the same
-def load_and_fix_dataframe(df):
-    df['application_start_date'] = df['application_start_date'].apply(convert_date)
-    df['date_published'] = df['date_published'].apply(convert_date)
-
-    # Drop rows where the date conversion failed
-    df = df.dropna(subset=['application_start_date', 'tender_deadline', 'date_published'], how='all')
-    
-    return df
+def poll_scrape_job(job):
+    # The finished job's snapshot is picked up by the rerun through its new mtime
+    if job is not None and job['status'] == 'running':
+        time.sleep(scrape_poll_seconds)
+        st.experimental_rerun()
 
-# Load and clean DataFrame
-df = load_and_fix_dataframe(df)
+if st.button("Refresh Data"):
+    # Only fetch what changed since the last run; a refresh while a scrape runs joins it
+    _, started = scrape_jobs.start(incremental=True)
+    if not started:
+        st.info("A scrape is already running.")
 
-# Fill missing values for datetime columns with pd.NaT
-datetime_columns = ['application_start_date', 'tender_deadline', 'date_published']
-df[datetime_columns] = df[datetime_columns].fillna(pd.NaT)
+snapshot = fetch_latest_data()
+scrape_job = scrape_jobs.latest_job()
+display_scrape_job(scrape_job)
+if snapshot is None:
+    poll_scrape_job(scrape_job)
+    st.stop()
 
-# Fill missing values for non-datetime columns with "not specified"
-non_datetime_columns = df.columns.difference(datetime_columns)
-df[non_datetime_columns] = df[non_datetime_columns].fillna("not specified")
 
-# Convert date columns to datetime format
+# Date columns come from the typed snapshot as datetime64 and need no parsing
 date_columns = ['application_start_date', 'tender_deadline', 'date_published']
-for col in date_columns:
-    df[col] = pd.to_datetime(df[col], format="%d.%m.%y", errors='coerce')
-
-# Calculate application_period and published_period
-df['application_period'] = (df['tender_deadline'] - df['application_start_date']).dt.days
-df['published_period'] = (pd.Timestamp.now() - df['date_published']).dt.days
-
-# Add coordinates to the dataframe based on state
-state_coordinates = {
-    'Baden-Württemberg': {'latitude': 48.6616037, 'longitude': 9.3501336},
-    'Bavaria': {'latitude': 48.7904472, 'longitude': 11.4978898},
-    'Berlin': {'latitude': 52.5200066, 'longitude': 13.404954},
-    'Brandenburg': {'latitude': 52.4084186, 'longitude': 12.5316444},
-    'Bremen': {'latitude': 53.0792962, 'longitude': 8.8016937},
-    'Hamburg': {'latitude': 53.551086, 'longitude': 9.993682},
-    'Hesse': {'latitude': 50.6520516, 'longitude': 9.1624376},
-    'Mecklenburg-Vorpommern': {'latitude': 53.6126503, 'longitude': 12.4295953},
-    'Lower Saxony': {'latitude': 52.6367036, 'longitude': 9.8450824},
-    'North Rhine-Westphalia': {'latitude': 51.4332367, 'longitude': 7.6615938},
-    'Rhineland-Palatinate': {'latitude': 50.118182, 'longitude': 7.308953},
-    'Saarland': {'latitude': 49.3964237, 'longitude': 7.0229607},
-    'Saxony': {'latitude': 51.1045407, 'longitude': 13.2017384},
-    'Saxony-Anhalt': {'latitude': 51.9507459, 'longitude': 11.6922777},
-    'Schleswig-Holstein': {'latitude': 54.219367, 'longitude': 9.696957},
-    'Thuringia': {'latitude': 50.9013853, 'longitude': 11.0772807},
-}
+# Columns the Overview table can be sorted by and the text search looks into
+sort_columns = ['tender_name', 'tender_authority', 'tender_location', 'state', 'application_period', 'published_period']
+search_columns = ['tender_name', 'tender_authority', 'tender_location']
+page_sizes = [25, 50, 100, 250]
 
 def add_coordinates(df):
-    df['latitude'] = df['state'].apply(lambda x: state_coordinates.get(x, {}).get('latitude'))
-    df['longitude'] = df['state'].apply(lambda x: state_coordinates.get(x, {}).get('longitude'))
+    # Coordinates of the place named in tender_location, else the centre of the tender's state
+    locations = df['tender_location'].astype(object)
+    states = df['state'].astype(object)
+    resolved = {location: resolve_location(location) for location in locations.unique()}
+    for axis in ('latitude', 'longitude'):
+        df[axis] = locations.map({location: place[axis] for location, place in resolved.items()}).fillna(
+            states.map({state: coordinates[axis] for state, coordinates in STATE_COORDINATES.items()}))
     return df
 
-df = add_coordinates(df)
+@st.cache_resource(max_entries=2, show_spinner="Loading tenders...")
+def load_prepared_data(path, mtime, today):
+    """
+    Loads the snapshot, adds every derived column and builds the filter index once per snapshot
+    file (and day, for published_period). Widget interactions rerun the script but hit this cache, so only the
+    filtering runs again. The cached frame and index are shared, not copied per rerun (as
+    st.cache_data would by unpickling them), so they must not be modified.
+    """
+    df = read_typed_snapshot(path)
+
+    # Drop rows without any known date
+    df = df.dropna(subset=date_columns, how='all')
+
+    # Calculate application_period and published_period
+    df['application_period'] = (df['tender_deadline'] - df['application_start_date']).dt.days
+    df['published_period'] = (pd.Timestamp(today) - df['date_published']).dt.days
+
+    df = add_coordinates(df)
+
+    # Add 'ALL' option to unique states
+    unique_states = ['ALL'] + list(df['state'].dropna().unique())
 
-# Add 'ALL' option to unique states
-unique_states = ['ALL'] + list(df['state'].dropna().unique())
+    # Get unique keywords (found_keywords holds a list of keywords per tender)
+    all_keywords = df['found_keywords'].explode().dropna().unique()
 
-# Get unique keywords
-df['found_keywords'] = df['found_keywords'].fillna('').str.split(', ')
-all_keywords = df['found_keywords'].explode().dropna().unique()
+    filter_index = TenderFilterIndex(df, date_columns, sort_columns, search_columns)
+    return df, unique_states, all_keywords, filter_index
+
+df, unique_states, all_keywords, filter_index = load_prepared_data(*snapshot, pd.Timestamp.now().date())
 
 def display_overview(df):
     st.header("Company Overview")
@@ -131,49 +135,75 @@ def display_overview(df):
     selected_states = st.sidebar.multiselect("Filter by State", unique_states, default=['ALL'])
     selected_keywords = st.sidebar.multiselect("Filter by Keyword", options=['ALL'] + list(all_keywords), default=['ALL'])
 
+    date_ranges = {}
     for col in date_columns:
         date_range = st.sidebar.date_input(f"Filter by {col.replace('_', ' ').title()} Range", [])
         if len(date_range) == 2:
-            start_date, end_date = date_range
-            df = df[(df[col] >= pd.to_datetime(start_date)) & (df[col] <= pd.to_datetime(end_date))]
-
-    if 'ALL' not in selected_states:
-        df = df[df['state'].isin(selected_states)]
-    if 'ALL' not in selected_keywords:
-        df = df[df['found_keywords'].apply(lambda x: any(kw in x for kw in selected_keywords))]
-
-    st.dataframe(df)
-    st.write(f"Number of rows: {df.shape[0]}")
-
-    def to_excel(df):
-        output = BytesIO()
-        writer = pd.ExcelWriter(output, engine='xlsxwriter')
-        df.to_excel(writer, index=False, sheet_name='Sheet1')
-        writer.close()
-        processed_data = output.getvalue()
-        return processed_data
-
-    st.download_button(
-        label="Download filtered data as Excel",
-        data=to_excel(df),
-        file_name='filtered_tenders.xlsx',
-        mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+            date_ranges[col] = date_range
+
+    search = st.text_input("Search tender name, authority or location")
+    sort_options = date_columns + sort_columns
+    sort_by = st.selectbox("Sort by", sort_options, index=sort_options.index('date_published'),
+                           format_func=lambda column: column.replace('_', ' ').title())
+    descending = st.checkbox("Descending", value=True)
+
+    # Filters, search and sorting all resolve on the precomputed index; only the visible page of
+    # rows is sliced from the frame and sent to the browser
+    mask = filter_index.mask(
+        states=None if 'ALL' in selected_states else selected_states,
+        keywords=None if 'ALL' in selected_keywords else selected_keywords,
+        date_ranges=date_ranges,
+        search=search,
     )
+    rows = filter_index.ordered_rows(mask, sort_by, descending)
+
+    page_size = st.selectbox("Rows per page", page_sizes, index=1)
+    page_count = max(1, -(-len(rows) // page_size))
+    page = st.number_input(f"Page (of {page_count})", min_value=1, max_value=page_count, value=1)
+    first = (page - 1) * page_size
+    st.dataframe(df.iloc[rows[first:first + page_size]])
+    st.write(f"Number of rows: {len(rows)} (showing {min(first + 1, len(rows))}-{min(first + page_size, len(rows))})")
+
+    # Exports are built only when requested and cached per snapshot + filter state
+    filter_key = hashlib.sha1(repr((snapshot, sorted(selected_states), sorted(selected_keywords), sorted(date_ranges.items()),
+                                    search, sort_by, descending)).encode()).hexdigest()
+    export_format = st.selectbox("Export format", list(EXPORT_FORMATS))
+    if st.button("Prepare download"):
+        st.session_state['export_request'] = (filter_key, export_format)
+
+    if st.session_state.get('export_request') == (filter_key, export_format):
+        _, file_name, mime = EXPORT_FORMATS[export_format]
+        st.download_button(
+            label=f"Download filtered data as {export_format}",
+            data=export_filtered_data(filter_key, export_format, df, rows),
+            file_name=file_name,
+            mime=mime
+        )
 
-def display_statistics(df):
+@st.cache_data(max_entries=8, show_spinner="Preparing download...")
+def export_filtered_data(filter_key, export_format, _df, _rows):
+    # The rows are identified by filter_key, hashing them on every rerun would cost as much as exporting
+    serialize, _, _ = EXPORT_FORMATS[export_format]
+    return serialize(_df.iloc[_rows])
+
+@st.cache_data(max_entries=2, show_spinner="Loading statistics...")
+def load_statistics(path, mtime):
+    """
+    Reads the store's pre-aggregated statistics once per snapshot version. The store keeps them
+    up to date on every write, so no groupby runs over the tenders here.
+    """
+    return open_tender_store().load_statistics()
+
+def display_statistics(statistics):
     st.header("Statistics Summary")
 
-    df['application_period'] = (pd.to_datetime(df['tender_deadline'], format="%d.%m.%y") - pd.to_datetime(df['application_start_date'], format="%d.%m.%y")).dt.days
-    df['published_period'] = (datetime.now() - pd.to_datetime(df['date_published'], format="%d.%m.%y")).dt.days
-
-    stat_df = df.groupby('state').agg({
-        'application_period': 'mean',
-        'published_period': 'mean'
-    }).reset_index()
-
-    stat_df['application_period'] = stat_df['application_period'].round(2)
-    stat_df['published_period'] = stat_df['published_period'].round(2)
-    stat_df.columns = ['State', 'Average Application Period (days)', 'Average Published Period (days)']
+    states = statistics['states']
+    today = pd.Timestamp.now().normalize().to_julian_date()
+    stat_df = pd.DataFrame({
+        'State': states['state'],
+        'Average Application Period (days)': (states['application_days'] / states['application_tenders']).round(2),
+        'Average Published Period (days)': (today - states['published_julian_days'] / states['published_tenders']).round(2),
+    })
 
     st.write(stat_df)
 
@@ -181,47 +211,56 @@ def display_statistics(df):
     criteria = st.radio("Select criteria for bar chart", ['State', 'Keywords by State'])
 
     if criteria == 'State':
-        bar_data = df.groupby('state').size().reset_index(name='count')
-        st.bar_chart(bar_data.set_index('state')['count'])
+        st.bar_chart(states.set_index('state')['tenders'].rename('count'))
     else:
-        keyword_col = 'found_keywords'
-        bar_data = df[keyword_col].explode().groupby(df['state']).value_counts().reset_index(name='count')
-        bar_data.columns = ['state', 'Keyword', 'count']
-        bar_data_pivot = bar_data.pivot(index='Keyword', columns='state', values='count').fillna(0)
+        bar_data_pivot = statistics['keywords_by_state'].pivot(index='keyword', columns='state', values='tenders').fillna(0)
+        bar_data_pivot.index.name = 'Keyword'
         st.bar_chart(bar_data_pivot)
 
     st.header("Publication Dates")
-    pub_dates = df['date_published'].value_counts().reset_index(name='count')
-    pub_dates.columns = ['Date', 'Count']
-    pub_dates['Date'] = pd.to_datetime(pub_dates['Date'], format="%d.%m.%y")
-    pub_dates = pub_dates.sort_values(by='Date')
+    pub_dates = statistics['published_per_day'].rename(columns={'day': 'Date', 'tenders': 'Count'})
     min_date = pub_dates['Date'].min().to_pydatetime()
     max_date = pub_dates['Date'].max().to_pydatetime()
     selected_date_range = st.slider("Select Date Range", min_value=min_date, max_value=max_date, value=(min_date, max_date), format="YYYY-MM-DD")
     pub_dates_filtered = pub_dates[(pub_dates['Date'] >= selected_date_range[0]) & (pub_dates['Date'] <= selected_date_range[1])]
     st.line_chart(pub_dates_filtered.set_index('Date')['Count'])
 
+@st.cache_resource(max_entries=2, show_spinner="Aggregating locations...")
+def aggregate_locations(path, mtime, _df):
+    """
+    One record per coordinate pair with its tender count, once per snapshot version. The map's
+    payload then grows with the number of places, not the number of tenders.
+    A point is labelled with the place its tenders were resolved to and that place's state, or with
+    the state alone when it is the state centre standing in for tenders without a known place.
+    """
+    df_map = _df.dropna(subset=['latitude', 'longitude'])
+    locations = df_map['tender_location'].astype(object)
+    resolved = {location: resolve_location(location) for location in locations.unique()}
+    places = locations.map({location: place['place'] for location, place in resolved.items()})
+    place_states = locations.map({location: place['state'] for location, place in resolved.items() if place['place']})
+    df_map = df_map.assign(
+        location=places.fillna(df_map['state'].astype(object)),
+        state=place_states.fillna(df_map['state'].astype(object)),
+    )
+    return df_map.groupby(['latitude', 'longitude'], as_index=False, sort=False).agg(
+        state=('state', 'first'),
+        location=('location', 'first'),
+        count=('tender_name', 'size'),
+    ).astype({'state': object, 'location': object})
+
 def display_map(df):
     st.header("Tender Locations on Map")
 
-    # Ensure valid latitude and longitude
-    df_map = df.dropna(subset=['latitude', 'longitude']).copy()
-    df_map = df_map[(df_map['latitude'].notnull()) & (df_map['longitude'].notnull())]
-    # Fill NaN values based on the provided logic
-    df_map['application_start_date'] = df_map['application_start_date'].fillna(df_map['date_published'])
-    df_map['tender_deadline'] = df_map['tender_deadline'].fillna("not specified")
-    df_map['application_period'] = df_map['application_period'].fillna("not specified")
-
-    # Group by coordinates to get the count of tenders at each location
-    df_map['count'] = df_map.groupby(['latitude', 'longitude'])['tender_name'].transform('count')
+    df_map = aggregate_locations(*snapshot, df)
 
     # Create the map visualization
     st.pydeck_chart(
         pdk.Deck(
             map_style="mapbox://styles/mapbox/light-v9",
             initial_view_state=pdk.ViewState(
-                latitude=df_map["latitude"].mean(),
-                longitude=df_map["longitude"].mean(),
+                # Centred on the tenders, as when every tender was a point
+                latitude=np.average(df_map["latitude"], weights=df_map["count"]),
+                longitude=np.average(df_map["longitude"], weights=df_map["count"]),
                 zoom=6,
                 pitch=0,
             ),
@@ -245,7 +284,7 @@ def display_map(df):
                     get_alignment_baseline="'bottom'",
                 ),
             ],
-            tooltip={"text": "State: {state}\nNumber of Tenders: {count}"}
+            tooltip={"text": "Location: {location}\nState: {state}\nNumber of Tenders: {count}"}
         )
     )
 
@@ -260,9 +299,11 @@ def main():
     with tab_overview:
         display_overview(df)
     with tab_stats:
-        display_statistics(df)
+        display_statistics(load_statistics(*snapshot))
     with tab_map:
         display_map(df)
 
+    poll_scrape_job(scrape_job)
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,99 +1,86 @@
-import concurrent.futures
 from shutil import which
 import requests
 import platform
 import tempfile
 import zipfile
 import json
-from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service as ChromeService
-from selenium.webdriver.chrome.options import Options
 from selenium.common.exceptions import TimeoutException, NoSuchElementException, ElementNotInteractableException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys 
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
 from selenium.common.exceptions import StaleElementReferenceException
+from browser_pool import BrowserPool, load_page, report_page_load_stats, reset_page_load_stats
+from adaptive_wait import find_optional_element, report_wait_stats, reset_wait_stats, wait_for_scroll_growth, wait_until_stable
+from date_utils import format_date
+from vmp_engine import VMP_PORTALS, get_portal, reset_page_loads
+from query_planner import report_query_plans, reset_query_plans
+from vmp_http import report_http_stats, reset_http_stats, scrape_vmp_portal_http_first
+from async_fetch import fetch_listings, fetch_page
+from seen_index import SeenTenderIndex
+from keyword_matcher import match_keywords
+from location_resolver import get_state_from_location
+from tender_store import TenderStore, read_typed_snapshot
+from html_parsing import css, find_link, first, has_class_name, parse_html, stripped_text, text, xpath
+from page_cache import PageCache, parse_page, report_page_cache_stats, reset_page_cache_stats
+from tender_pipeline import TenderDeduplicator, merge_streams, normalize_tenders, throttle, write_to_store
 
 from dateutil import parser
 from urllib.parse import urljoin
-import time
 import re
-import pandas as pd
 import datetime
 import os
 import io
 
-# Mapping cities to states
-city_to_state = {
-    "Berlin": "Berlin",
-    "Hamburg": "Hamburg",
-    "Munich": "Bavaria",
-    "Cologne": "North Rhine-Westphalia",
-    "Frankfurt": "Hesse",
-    "Stuttgart": "Baden-Württemberg",
-    "Düsseldorf": "North Rhine-Westphalia",
-    "Dortmund": "North Rhine-Westphalia",
-    "Essen": "North Rhine-Westphalia",
-    "Nuremberg": "Bavaria",
-    "Duisburg": "North Rhine-Westphalia",
-    "Bonn": "North Rhine-Westphalia",
-    "Münster": "North Rhine-Westphalia",
-    "Karlsruhe": "Baden-Württemberg",
-    "Mönchengladbach": "North Rhine-Westphalia",
-    "Wiesbaden": "Hesse",
-    "Bielefeld": "North Rhine-Westphalia",
-    "Halle": "Saxony-Anhalt",
-    "Freiburg": "Baden-Württemberg",
-    "Krefeld": "North Rhine-Westphalia",
-    "Lübeck": "Schleswig-Holstein",
-    "Oberhausen": "North Rhine-Westphalia",
-    "Erfurt": "Thuringia",
-    "Mainz": "Rhineland-Palatinate",
-    "Rostock": "Mecklenburg-Vorpommern",
-    "Kassel": "Hesse",
-    "Hagen": "North Rhine-Westphalia",
-    "Saarbrücken": "Saarland",
-    "Mülheim": "North Rhine-Westphalia",
-    "Potsdam": "Brandenburg",
-    "Ludwigshafen": "Rhineland-Palatinate",
-    "Oldenburg": "Lower Saxony",
-    "Leverkusen": "North Rhine-Westphalia",
-    "Osnabrück": "Lower Saxony",
-    "Solingen": "North Rhine-Westphalia",
-    "Heidelberg": "Baden-Württemberg",
-    "Darmstadt": "Hesse",
-    "Paderborn": "North Rhine-Westphalia",
-    "Regensburg": "Bavaria",
-    "Ingolstadt": "Bavaria",
-    "Würzburg": "Bavaria",
-    "Fürth": "Bavaria",
-    "Wolfsburg": "Lower Saxony",
-    "Ulm": "Baden-Württemberg",
-    "Heilbronn": "Baden-Württemberg",
-    "Pforzheim": "Baden-Württemberg",
-    "Göttingen": "Lower Saxony",
-    "Bottrop": "North Rhine-Westphalia",
-    "Trier": "Rhineland-Palatinate",
-    "Recklinghausen": "North Rhine-Westphalia",
-    "Reutlingen": "Baden-Württemberg",
-    "Bremerhaven": "Bremen",
-    "Koblenz": "Rhineland-Palatinate",
-    "Jena": "Thuringia",
-    "Erlangen": "Bavaria",
-    "Moers": "North Rhine-Westphalia",
-    "Siegen": "North Rhine-Westphalia",
-    "Hildesheim": "Lower Saxony",
-    "Salzgitter": "Lower Saxony"
+# Directory the result snapshots are written to (and read from by the Streamlit app)
+OUTPUT_DIR = "master/2_streamlit/Capstone_ATIS_Streamlit"
+# Every scraped tender is upserted here instead of writing a new CSV snapshot per run
+STORE_PATH = os.path.join(OUTPUT_DIR, "tenders.sqlite")
+# Typed columnar copy of the store that the dashboard loads without parsing
+SNAPSHOT_PATH = os.path.join(OUTPUT_DIR, "tenders.parquet")
+# Registry of background scrape jobs started from the dashboard (see scrape_jobs)
+JOBS_PATH = os.path.join(OUTPUT_DIR, "scrape_jobs.sqlite")
+# Parsed result pages, reused while a page's HTML is unchanged (see page_cache)
+PAGE_CACHE_PATH = os.path.join(OUTPUT_DIR, "page_cache.sqlite")
+# How often the snapshot is re-exported while a scrape is still writing tenders to the store
+SNAPSHOT_REFRESH_SECONDS = 30
+
+# Maximum number of headless Chrome sessions alive at the same time during scrape_all
+BROWSER_POOL_SIZE = 4
+# Start the browsers without images, trackers and consent scripts (see browser_pool.initialize_browser)
+LEAN_BROWSER_PROFILE = True
+
+# Precompiled selectors of the München result table and the e-vergabe-sh.de result list
+MUENCHEN_ROWS = css("tr.tableRow.clickable-row.publicationDetail")
+MUENCHEN_CELLS = {name: css(f"td.{name}", relative=True) for name in ('tender', 'tenderAuthority', 'tenderType', 'tenderDeadline')}
+E_VERGABE_SH_NO_RESULTS = xpath(
+    "//div[@style='text-align:center; margin-top:50px;']"
+    "[.='Es wurden keine Vergabeinformationen zu Ihren Suchkriterien gefunden!']"
+)
+E_VERGABE_SH_BLOCKS = css("div.bek_list_item_w_hover.js-list-detaillink")
+E_VERGABE_SH_FIELDS = {name: css(f"div.{name}", relative=True) for name in ('bek_list_item_headline', 'bek_list_item_info', 'bek_list_item_left', 'bek-date')}
+
+# Info labels of a myorder.rib.de result item: label text -> tender field
+BAYERN_INFO_FIELDS = {
+    'Application period': 'application_period',
+    'Period': 'period',
+    'Execution place': 'tender_location',
+}
+# Labels the tender deadline is read from, in order of preference
+BAYERN_DEADLINE_LABELS = ["Application deadline", "Expiration time"]
+# Precompiled selectors of the myorder.rib.de result items
+BAYERN_ITEMS = css("div.item")
+BAYERN_TITLE = xpath("(.//div[contains(@style, 'overflow: hidden')])[1]//strong")
+BAYERN_DESCRIPTION = css("div.text-muted", relative=True)
+BAYERN_INFO_LABELS = css("div.info-label", relative=True)
+BAYERN_INFO_VALUE = xpath("following::div[1]")
+BAYERN_META = css("div.item-right.meta", relative=True)
+BAYERN_META_DATE = {name: css(f"div.{name}", relative=True) for name in ('date', 'month')}
+
+# Portals served as plain HTML, fetched by the async fetch layer: source_url -> next-page link attributes
+STATIC_LISTINGS = {
+    "https://vergabe.muenchen.de": {'title': 'Nächste Seite'},
 }
-
-def get_state_from_location(location):
-    for city, state in city_to_state.items():
-        if city in location:
-            return state
-    return "not specified"
 
 def get_latest_chromedriver_version(chrome_version):
     # Fetch the latest known good versions
@@ -124,30 +111,11 @@ def download_chromedriver(chrome_version):
         zip_file.extractall()  # Extracts to the current directory
     print("ChromeDriver downloaded and extracted successfully.")
 
-# Function to download and initialize the ChromeDriver
-def initialize_browser():
-    chrome_options = Options()
-    chrome_options.add_argument("--headless")  # Run in headless mode
-    chrome_options.add_argument("--disable-gpu")
-    chrome_options.add_argument("--no-sandbox")
-    chrome_options.add_argument("--disable-dev-shm-usage")
-    driver = webdriver.Chrome(service=ChromeService(ChromeDriverManager().install()), options=chrome_options)
-    print("Browser initialized successfully.")
-    return driver
-
 # Directory setup for saving results
 def ensure_output_directory(output_dir):
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
         
-def format_date(date_string):
-    try:
-        date_obj = parser.parse(date_string, dayfirst=True)
-        formatted_date = date_obj.strftime("%d.%m.%y")
-        return formatted_date
-    except (parser.ParserError, ValueError):
-        return "not specified"
-
 def parse_application_period(period_string):
     try:
         start_date_str, end_date_str = period_string.split(" until ")
@@ -165,194 +133,134 @@ def extract_tender_code(tender_name, source_url):
         tender_code = tender_name.split()[0]
     return tender_code
 
-def extract_tender_deadline(block):
-    deadline_labels = ["Application deadline", "Expiration time"]
-    for label in deadline_labels:
-        info_tag = block.find('div', class_='info-label', string=lambda text: text and label in text)
-        if info_tag:
-            value = info_tag.find_next('div').text.strip()
-            return format_date(value)
-    return "not specified"
+def read_info_labels(block, labels):
+    """
+    Reads the value after the first info-label containing each of `labels`, in one pass over
+    the block's info-labels. Returns {label: value} for the labels found.
+    """
+    values = {}
+    for info_tag in BAYERN_INFO_LABELS(block):
+        info_text = text(info_tag)
+        for label in labels:
+            if label in info_text and label not in values:
+                value_tag = first(BAYERN_INFO_VALUE(info_tag))
+                values[label] = text(value_tag) if value_tag is not None else "not specified"
+    return values
+
+def parse_bayern_block(block, keywords, source_url):
+    """
+    Returns the tender of one result item, or None if it has no title or none of the keywords.
+    """
+    title_tag = first(BAYERN_TITLE(block))
+    if title_tag is None:
+        return None
+    title = stripped_text(title_tag)
+    found_keywords = match_keywords(title, keywords)
+    if not found_keywords:
+        return None
+
+    description_tag = first(BAYERN_DESCRIPTION(block))
+    description = stripped_text(description_tag) if description_tag is not None else "No Description"
+
+    tender_details = {
+        'tender_name': title,
+        'tender_authority': description.split(' by ')[-1],
+        'tender_code': extract_tender_code(title, source_url),
+        'source_url': source_url,
+        'found_keywords': ', '.join(found_keywords)
+    }
+
+    info = read_info_labels(block, [*BAYERN_INFO_FIELDS, *BAYERN_DEADLINE_LABELS])
+    for info_label, info_key in BAYERN_INFO_FIELDS.items():
+        if info_label not in info:
+            continue
+        if info_key == 'application_period':
+            start_date, end_date = parse_application_period(info[info_label])
+            tender_details['application_start_date'] = start_date
+            tender_details['application_deadline'] = end_date
+        else:
+            tender_details[info_key] = info[info_label]
+
+    deadline_label = next((label for label in BAYERN_DEADLINE_LABELS if label in info), None)
+    tender_details['tender_deadline'] = format_date(info[deadline_label]) if deadline_label else "not specified"
+
+    # Extract publication date
+    date_div = first(BAYERN_META(block))
+    if date_div is not None:
+        day = text(BAYERN_META_DATE['date'](date_div)[0])
+        month_year = text(BAYERN_META_DATE['month'](date_div)[0])
+        tender_details['date_published'] = format_date(f"{day} {month_year}")
+    else:
+        tender_details['date_published'] = "not specified"
+
+    # Add the state column
+    tender_details['state'] = get_state_from_location(tender_details.get('tender_location', ''))
+    return tender_details
+
+def parse_bayern_page(document, keywords, source_url):
+    tender_blocks = BAYERN_ITEMS(document)
+    print(f"Found {len(tender_blocks)} tender blocks on the current page.")
+    tenders = (parse_bayern_block(block, keywords, source_url) for block in tender_blocks)
+    return [tender for tender in tenders if tender is not None]
+
+def bayern_result_pages(browser, url, source_url):
+    """
+    Yields each results page as a parsed document: first the start page, scrolled until no more
+    items load, then the pages behind its Next link, until the link is missing or disabled.
+    """
+    load_page(browser, url, source_url)
 
-def scrape_bayern_selenium(browser, url, keywords, source_url):
-    print(f"Scraping dynamic content from {url}...")
-    tenders = []
-    browser.get(url)
-    
     # Scroll to the bottom of the page to ensure all dynamic content is loaded
+    wait_until_stable(browser, "div.item", source_url)
     last_height = browser.execute_script("return document.body.scrollHeight")
     while True:
         # Scroll down to the bottom of the page
-        time.sleep(3)
         browser.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        
-        # Wait for new content to load
-        time.sleep(2)
-        
-        # Calculate new scroll height and compare with last scroll height
-        new_height = browser.execute_script("return document.body.scrollHeight")
+
+        # Wait until new content was appended and rendered, or give up once nothing arrives
+        new_height = wait_for_scroll_growth(browser, last_height, "div.item", source_url)
         if new_height == last_height:
             break
         last_height = new_height
 
-    # Now that the page is fully loaded, proceed with scraping
-    html = browser.page_source
-    soup = BeautifulSoup(html, 'html.parser')
-    
-    tender_blocks = soup.find_all('div', class_='item')
-    print(f"Found {len(tender_blocks)} tender blocks on the current page.")
-
-    for block in tender_blocks:
-        title_div = block.find('div', style=lambda value: value and 'overflow: hidden' in value)
-        title_tag = title_div.find('strong') if title_div else None
-
-        if title_tag:
-            title = title_tag.get_text(strip=True)
-            found_keywords = [keyword for keyword in keywords if keyword.lower() in title.lower()]
-            if not found_keywords:
-                continue  # Skip this tender if no keywords are found in the title
-
-            description_tag = block.find('div', class_='text-muted')
-            description = description_tag.get_text(strip=True) if description_tag else "No Description"
-            
-            tender_authority = description.split(' by ')[-1]
-            tender_code = extract_tender_code(title, source_url)
-            
-            tender_details = {
-                'tender_name': title,
-                'tender_authority': tender_authority,
-                'tender_code': tender_code,
-                'source_url': source_url,
-                'found_keywords': ', '.join(found_keywords)
-            }
-
-            info_dict = {
-                'Application period': 'application_period',
-                'Period': 'period',
-                'Execution place': 'tender_location'
-            }
-
-            for info_label, info_key in info_dict.items():
-                info_tag = block.find('div', class_='info-label', string=lambda text: text and info_label in text)
-                if info_tag:
-                    value = info_tag.find_next('div').text.strip() if info_tag.find_next('div') else "not specified"
-                    if info_key == 'application_period':
-                        start_date, end_date = parse_application_period(value)
-                        tender_details['application_start_date'] = start_date
-                        tender_details['application_deadline'] = end_date
-                    else:
-                        tender_details[info_key] = value
-
-            tender_details['tender_deadline'] = extract_tender_deadline(block)
-            
-            # Extract publication date
-            date_div = block.find('div', class_='item-right meta')
-            if date_div:
-                day = date_div.find('div', class_='date').text.strip()
-                month_year = date_div.find('div', class_='month').text.strip()
-                publication_date_str = f"{day} {month_year}"
-                publication_date = format_date(publication_date_str)
-                tender_details['date_published'] = publication_date
-            else:
-                tender_details['date_published'] = "not specified"
-            
-            # Add the state column
-            tender_details['state'] = get_state_from_location(tender_details.get('tender_location', ''))
-
-            tenders.append(tender_details)
-
-    # Handling pagination
     while True:
-        next_page = soup.find('a', {'aria-label': 'Next'})
-        if next_page and 'disabled' not in next_page.get('class', []):
-            next_url = urljoin(url, next_page['href'])
-            print(f"Navigating to the next page: {next_url}")
-            browser.get(next_url)
-            time.sleep(2)
-            
-            html = browser.page_source
-            soup = BeautifulSoup(html, 'html.parser')
-            tender_blocks = soup.find_all('div', class_='item')
-            print(f"Found {len(tender_blocks)} tender blocks on the next page.")
-
-            for block in tender_blocks:
-                title_div = block.find('div', style=lambda value: value and 'overflow: hidden' in value)
-                title_tag = title_div.find('strong') if title_div else None
-
-                if title_tag:
-                    title = title_tag.get_text(strip=True)
-                    found_keywords = [keyword for keyword in keywords if keyword.lower() in title.lower()]
-                    if not found_keywords:
-                        continue  # Skip this tender if no keywords are found in the title
-
-                    description_tag = block.find('div', class_='text-muted')
-                    description = description_tag.get_text(strip=True) if description_tag else "No Description"
-                    
-                    tender_authority = description.split(' by ')[-1]
-                    tender_code = extract_tender_code(title, source_url)
-                    
-                    tender_details = {
-                        'tender_name': title,
-                        'tender_authority': tender_authority,
-                        'tender_code': tender_code,
-                        'source_url': source_url,
-                        'found_keywords': ', '.join(found_keywords)
-                    }
-
-                    info_dict = {
-                        'Application period': 'application_period',
-                        'Period': 'period',
-                        'Execution place': 'tender_location'
-                    }
-
-                    for info_label, info_key in info_dict.items():
-                        info_tag = block.find('div', class_='info-label', string=lambda text: text and info_label in text)
-                        if info_tag:
-                            value = info_tag.find_next('div').text.strip() if info_tag.find_next('div') else "not specified"
-                            if info_key == 'application_period':
-                                start_date, end_date = parse_application_period(value)
-                                tender_details['application_start_date'] = start_date
-                                tender_details['application_deadline'] = end_date
-                            else:
-                                tender_details[info_key] = value
-
-                    tender_details['tender_deadline'] = extract_tender_deadline(block)
-                    
-                    # Extract publication date
-                    date_div = block.find('div', class_='item-right meta')
-                    if date_div:
-                        day = date_div.find('div', class_='date').text.strip()
-                        month_year = date_div.find('div', class_='month').text.strip()
-                        publication_date_str = f"{day} {month_year}"
-                        publication_date = format_date(publication_date_str)
-                        tender_details['date_published'] = publication_date
-                    else:
-                        tender_details['date_published'] = "not specified"
-                    
-                    # Add the state column
-                    tender_details['state'] = get_state_from_location(tender_details.get('tender_location', ''))
-
-                    tenders.append(tender_details)
-        else:
+        document = parse_html(browser.page_source)
+        yield document
+
+        next_page = find_link(document, {'aria-label': 'Next'})
+        if next_page is None or not next_page.get('href') or has_class_name(next_page, 'disabled'):
+            return
+        next_url = urljoin(url, next_page.get('href'))
+        print(f"Navigating to the next page: {next_url}")
+        load_page(browser, next_url, source_url)
+        wait_until_stable(browser, "div.item", source_url)
+
+def scrape_bayern_selenium(browser, url, keywords, source_url, seen_index=None):
+    print(f"Scraping dynamic content from {url}...")
+    total_tenders = 0
+    for document in bayern_result_pages(browser, url, source_url):
+        tenders = parse_bayern_page(document, keywords, source_url)
+        # Each page's tenders are passed on as soon as the page is parsed
+        yield from tenders
+        total_tenders += len(tenders)
+        if seen_index is not None and seen_index.should_stop(tenders, source_url, url):
             break
-    
-    print(f"Total tenders found: {len(tenders)}")
-    return tenders
+
+    print(f"Total tenders found: {total_tenders}")
 
 def scrape_muenchen(html, keywords, source_url):
     print(f"Scraping static content from {source_url}...")
-    tenders = []
-    soup = BeautifulSoup(html, 'html.parser')
+    document = parse_html(html)
 
-    tender_rows = soup.find_all('tr', class_='tableRow clickable-row publicationDetail')
+    tender_rows = MUENCHEN_ROWS(document)
     print(f"Found {len(tender_rows)} tender rows.")
 
     for row in tender_rows:
-        date_published = row.find('td').text.strip()
-        tender_name = row.find('td', class_='tender').text.strip()
-        tender_authority = row.find('td', class_='tenderAuthority').text.strip()
-        tender_type = row.find('td', class_='tenderType').text.strip()
-        tender_deadline = row.find('td', class_='tenderDeadline').text.strip()
+        date_published = text(row.find('.//td'))
+        tender_name = text(MUENCHEN_CELLS['tender'](row)[0])
+        tender_authority = text(MUENCHEN_CELLS['tenderAuthority'](row)[0])
+        tender_type = text(MUENCHEN_CELLS['tenderType'](row)[0])
+        tender_deadline = text(MUENCHEN_CELLS['tenderDeadline'](row)[0])
 
         # Remove the hour from the tender deadline
         tender_deadline_date = tender_deadline.split(' ')[0]  # This assumes the format is "date time"
@@ -365,9 +273,9 @@ def scrape_muenchen(html, keywords, source_url):
         except (parser.ParserError, ValueError):
             formatted_date_published = "not specified"
 
-        found_keywords = [keyword for keyword in keywords if keyword.lower() in tender_name.lower()]
+        found_keywords = match_keywords(tender_name, keywords)
         if found_keywords:
-            tenders.append({
+            yield {
                 'date_published': formatted_date_published,  # Use the formatted date
                 'tender_name': tender_name,
                 'tender_authority': tender_authority,
@@ -375,448 +283,8 @@ def scrape_muenchen(html, keywords, source_url):
                 'tender_deadline': formatted_deadline,  # Use the formatted deadline
                 'source_url': source_url,
                 'found_keywords': ', '.join(found_keywords)
-            })
-        
-    return tenders
-
-
-def scrape_vmstart(browser, url, keywords, source_url):
-    print(f"Scraping dynamic content from {url}...")
-    all_tenders = {}
-    browser.get(url)
-
-    for keyword in keywords:
-        try:
-            print(f"Searching for keyword: {keyword}")
-            
-            # Check if we are on the initial page or subsequent searches
-            if "searchVisible" in browser.page_source:
-                search_input = WebDriverWait(browser, 30).until(
-                    EC.presence_of_element_located((By.ID, "searchVisible"))
-                )
-            else:
-                search_input = WebDriverWait(browser, 30).until(
-                    EC.presence_of_element_located((By.ID, "inputSearchKey"))
-                )
-
-            search_input.clear()
-            search_input.send_keys(keyword)
-            
-            if "searchVisible" in browser.page_source:
-                search_submit = WebDriverWait(browser, 10).until(
-                    EC.element_to_be_clickable((By.CSS_SELECTOR, "button.btn-mainSearch"))
-                )
-            else:
-                search_submit = WebDriverWait(browser, 5).until(
-                    EC.element_to_be_clickable((By.ID, "btnSearchSubmit"))
-                )
-            browser.execute_script("arguments[0].click();", search_submit)
-
-            # Wait for results to load
-            try:
-                WebDriverWait(browser, 30).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, "div.border.col-lg-12"))
-                )
-                time.sleep(5)  # Adjust the sleep duration as needed
-            except TimeoutException:
-                print(f"Timeout while waiting for search results for keyword: {keyword}")
-                continue
-
-            # Parse results
-            html = browser.page_source
-            soup = BeautifulSoup(html, 'html.parser')
-
-            # Check if no results were found
-            no_results_text = soup.find('h3', class_='color-main')
-            if no_results_text and "0 gefundene Ausschreibung" in no_results_text.text:
-                print(f"No tenders found for keyword: {keyword}")
-                continue
-
-            # Check if results were found
-            results_text = soup.find('h3', class_='color-main')
-            if results_text and "gefundene Ausschreibung" in results_text.text:
-                num_results = int(results_text.text.split()[0])
-                print(f"{num_results} tenders found for keyword: {keyword}")
-
-            # Find all tender rows
-            tender_blocks = soup.select("tbody.tableLeftHeaderBlock[tabindex='0']")
-
-            for tbody in tender_blocks:
-                rows = tbody.find_all('tr', class_='tableRowLeft')
-                tender_details = {
-                    'tender_name': 'not specified',
-                    'tender_authority': 'not specified',
-                    'tender_type': 'not specified',
-                    'tender_law': 'not specified',
-                    'tender_deadline': 'not specified'
-                }
-                for row in rows:
-                    try:
-                        cells = row.find_all('td')
-                        if len(cells) < 2:
-                            continue  # Skip rows with insufficient data
-
-                        header_text = cells[0].get_text(strip=True)
-                        data_text = cells[1].get_text(strip=True) if cells[1].get_text(strip=True) else "not specified"
-
-                        if 'Ausschreibung' in header_text:
-                            tender_details['tender_name'] = data_text
-                        elif 'Vergabestelle' in header_text:
-                            tender_details['tender_authority'] = data_text
-                        elif 'Verfahrensart' in header_text:
-                            tender_details['tender_type'] = data_text
-                        elif 'Rechtsrahmen' in header_text:
-                            tender_details['tender_law'] = data_text
-                        elif 'Abgabefrist' in header_text:
-                            tender_details['tender_deadline'] = format_date(data_text.split()[0]) if data_text != "not specified" else "not specified"
-
-                    except IndexError:
-                        print(f"IndexError: Skipping a row due to insufficient columns: {[cell.get_text(strip=True) for cell in cells]}")
-                    except Exception as e:
-                        print(f"An error occurred while parsing row: {e}")
-
-                if tender_details['tender_name'] != 'not specified':
-                    tender_name = tender_details['tender_name']
-                    tender_details['source_url'] = source_url
-                    tender_details['found_keywords'] = keyword
-
-                    if tender_name in all_tenders:
-                        if keyword not in all_tenders[tender_name]['found_keywords']:
-                            all_tenders[tender_name]['found_keywords'] += f", {keyword}"
-                    else:
-                        all_tenders[tender_name] = tender_details
-
-        except TimeoutException:
-            print(f"Timeout while searching for keyword: {keyword}")
-        except NoSuchElementException:
-            print(f"No element found for keyword: {keyword}")
-        except ElementNotInteractableException:
-            print(f"Element not interactable for keyword: {keyword}")
-        except Exception as e:
-            print(f"An error occurred while searching for keyword: {keyword} - {str(e)}")
-
-    tenders = list(all_tenders.values())
-    total_tenders = len(tenders)
-    print(f"Total tenders found: {total_tenders}")
-    return tenders
-
-
-def Rheinland(browser, url, keywords, source_url):
-    print(f"Scraping dynamic content from {url}...")
-    all_tenders = {}
-    browser.get(url)
-
-    for keyword in keywords:
-        try:
-            print(f"Searching for keyword: {keyword}")
-            # Perform search
-            search_input = WebDriverWait(browser, 20).until(
-                EC.presence_of_element_located((By.ID, "searchText"))
-            )
-            search_input.clear()
-            search_input.send_keys(keyword)
-            
-            # Click the search button
-            search_button = browser.find_element(By.ID, "searchStart")
-            search_button.click()
-
-            while True:
-                # Wait for results to load
-                try:
-                    WebDriverWait(browser, 20).until(
-                        EC.presence_of_element_located((By.XPATH, "//div[@id='listTemplate']"))
-                    )
-                    print("Search processed, results loaded")
-                    # Adding delay to ensure the page is fully loaded
-                    time.sleep(5)  # Adjust the sleep duration as needed
-                except TimeoutException:
-                    print("Timeout while waiting for search results")
-                    break
-
-                # Parse results
-                html = browser.page_source
-                soup = BeautifulSoup(html, 'html.parser')
-
-                # Find all tender rows
-                tender_rows = soup.select("div#listTemplate tbody tr")
-
-                if len(tender_rows) == 0:
-                    print(f"No tenders found for keyword: {keyword}")
-                    break
-
-                for row in tender_rows:
-                    try:
-                        # Extract and strip text from each relevant cell
-                        cells = row.find_all('td')
-                        cell_texts = [cell.text.strip() for cell in cells]
-                        if len(cells) < 5:
-                            print(f"No tender found for keyword: {keyword}")
-                            continue  # Skip rows without sufficient data
-
-                        date_published = cells[0].find('abbr').text.strip() if cells[0].find('abbr') else "not specified"
-                        tender_deadline = cells[1].find('abbr').text.strip() if cells[1].find('abbr') else "not specified"
-                        tender_name = cells[2].text.strip() if cells[2] else "not specified"
-                        tender_type = cells[3].text.strip() if cells[3] else "not specified"
-                        tender_authority = cells[4].text.strip() if cells[4] else "not specified"
-
-                        # Format dates
-                        formatted_deadline = format_date(tender_deadline) if tender_deadline != "nv" else "not specified"
-                        formatted_date_published = format_date(date_published)
-
-                        # Create or update tender details
-                        if tender_name in all_tenders:
-                            if keyword not in all_tenders[tender_name]['found_keywords']:
-                                all_tenders[tender_name]['found_keywords'] += f", {keyword}"
-                        else:
-                            tender_details = {
-                                'date_published': formatted_date_published,
-                                'tender_name': tender_name,
-                                'tender_authority': tender_authority,
-                                'tender_type': tender_type,
-                                'tender_deadline': formatted_deadline,
-                                'source_url': source_url,
-                                'found_keywords': keyword  # Initialize with the searched keyword
-                            }
-                            all_tenders[tender_name] = tender_details
-                    except Exception as e:
-                        print(f"An error occurred while parsing row: {e}")
-
-                # Check for next page
-                next_page = soup.find('a', {'title': 'Nächste Seite'})
-                if next_page and 'disabled' not in next_page.get('class', []):
-                    next_url = urljoin(url, next_page['href'])
-                    print(f"Navigating to the next page: {next_url}")
-                    browser.get(next_url)
-                else:
-                    break
-        except TimeoutException:
-            print(f"Timeout while searching for keyword: {keyword}")
-        except NoSuchElementException:
-            print(f"No element found for keyword: {keyword}")
-        except ElementNotInteractableException:
-            print(f"Element not interactable for keyword: {keyword}")
-        except Exception as e:
-            print(f"An error occurred while searching for keyword: {keyword} - {str(e)}")
-
-    tenders = list(all_tenders.values())
-    total_tenders = len(tenders)
-    print(f"Total tenders found for Rheinland: {total_tenders}")
-    return all_tenders
-
-def scrape_nrw(browser, url, keywords, source_url):
-    print(f"Scraping dynamic content from {url}...")
-    all_tenders = {}
-    browser.get(url)
-
-    for keyword in keywords:
-        try:
-            print(f"Searching for keyword: {keyword}")
-            # Perform search
-            search_input = WebDriverWait(browser, 20).until(
-                EC.presence_of_element_located((By.ID, "searchText"))
-            )
-            search_input.clear()
-            search_input.send_keys(keyword)
-            
-            # Click the search button
-            search_button = browser.find_element(By.ID, "searchStart")
-            search_button.click()
-
-            while True:
-                # Wait for results to load
-                try:
-                    WebDriverWait(browser, 20).until(
-                        EC.presence_of_element_located((By.XPATH, "//div[@id='listTemplate']"))
-                    )
-                    # Adding delay to ensure the page is fully loaded
-                    time.sleep(5)  # Adjust the sleep duration as needed
-                except TimeoutException:
-                    print("Timeout while waiting for search results")
-                    break
-
-                # Parse results
-                html = browser.page_source
-                soup = BeautifulSoup(html, 'html.parser')
-
-                # Find all tender rows
-                tender_rows = soup.select("div#listTemplate tbody tr")
-                print(f"Found {len(tender_rows)} tender rows for keyword: {keyword}")
-
-                for row in tender_rows:
-                    try:
-                        # Extract and strip text from each relevant cell
-                        cells = row.find_all('td')
-                        cell_texts = [cell.text.strip() for cell in cells]
-
-                        if len(cells) < 5 or "Es wurden keine passenden Bekanntmachungen gefunden." in cell_texts[0]:
-                            continue  # Skip rows without sufficient data or with no matching tenders
-
-                        date_published = cells[0].find('abbr').text.strip() if cells[0].find('abbr') else "not specified"
-                        tender_deadline = cells[1].find('abbr').text.strip() if cells[1].find('abbr') else "not specified"
-                        tender_name = cells[2].text.strip() if cells[2] else "not specified"
-                        tender_type = cells[3].text.strip() if cells[3] else "not specified"
-                        tender_authority = cells[4].text.strip() if cells[4] else "not specified"
-
-                        # Format dates
-                        formatted_deadline = format_date(tender_deadline) if tender_deadline != "nv" else "not specified"
-                        formatted_date_published = format_date(date_published)
-
-                        # Create or update tender details
-                        if tender_name in all_tenders:
-                            if keyword not in all_tenders[tender_name]['found_keywords']:
-                                all_tenders[tender_name]['found_keywords'] += f", {keyword}"
-                        else:
-                            tender_details = {
-                                'date_published': formatted_date_published,
-                                'tender_name': tender_name,
-                                'tender_authority': tender_authority,
-                                'tender_type': tender_type,
-                                'tender_deadline': formatted_deadline,
-                                'source_url': source_url,
-                                'found_keywords': keyword  # Initialize with the searched keyword
-                            }
-                            all_tenders[tender_name] = tender_details
-
-                    except Exception as e:
-                        print(f"An error occurred while parsing row: {e}")
-
-                # Check for next page
-                next_page = soup.find('a', {'title': 'Nächste Seite'})
-                if next_page and 'disabled' not in next_page.get('class', []):
-                    next_url = urljoin(url, next_page['href'])
-                    print(f"Navigating to the next page: {next_url}")
-                    browser.get(next_url)
-                else:
-                    break
-        except TimeoutException:
-            print(f"Timeout while searching for keyword: {keyword}")
-        except NoSuchElementException:
-            print(f"No element found for keyword: {keyword}")
-        except ElementNotInteractableException:
-            print(f"Element not interactable for keyword: {keyword}")
-        except Exception as e:
-            print(f"An error occurred while searching for keyword: {keyword} - {str(e)}")
-
-    tenders = list(all_tenders.values())
-    total_tenders = len(tenders)
-    print(f"Total tenders found for NRW: {total_tenders}")
-    return all_tenders
-
-def scrape_brandenburg(browser, url, keywords, source_url):
-    print(f"Scraping dynamic content from {url}...")
-    all_tenders = {}
-    try:
-        browser.get(url)
-        # Handle cookie pop-ups if present
-        try:
-            accept_cookies = WebDriverWait(browser, 10).until(
-                EC.element_to_be_clickable((By.XPATH, "//button[contains(text(), 'Accept')]"))
-            )
-            accept_cookies.click()
-        except Exception as e:
-            print("No cookies banner found:", e)
-
-    except Exception as e:
-        print(f"Failed to access {url}: {e}")
-        return []
-
-    for keyword in keywords:
-        try:
-            print(f"Searching for keyword: {keyword}")
-            # Perform search
-            search_input = WebDriverWait(browser, 20).until(
-                EC.presence_of_element_located((By.ID, "searchText"))
-            )
-            search_input.clear()
-            search_input.send_keys(keyword)
-            
-            # Click the search button
-            search_button = browser.find_element(By.ID, "searchStart")
-            search_button.click()
-
-            while True:
-                # Wait for results to load
-                try:
-                    WebDriverWait(browser, 20).until(
-                        EC.presence_of_element_located((By.XPATH, "//div[@id='listTemplate']"))
-                    )
-                    print("Search processed, results loaded")
-                    # Adding delay to ensure the page is fully loaded
-                    time.sleep(5)  # Adjust the sleep duration as needed
-                except TimeoutException:
-                    print("Timeout while waiting for search results")
-                    break
-
-                # Parse results
-                html = browser.page_source
-                soup = BeautifulSoup(html, 'html.parser')
-
-                # Find all tender rows
-                tender_rows = soup.select("div#listTemplate tbody tr")
-                if len(tender_rows) == 0:
-                    print(f"No tenders found for keyword: {keyword}")
-                    break
-
-                for row in tender_rows:
-                    try:
-                        # Extract and strip text from each relevant cell
-                        cells = row.find_all('td')
-                        cell_texts = [cell.text.strip() for cell in cells]
-
-                        if len(cells) < 5 or "Es wurden keine passenden Bekanntmachungen gefunden." in cell_texts[0]:
-                            print(f"No tender found for keyword: {keyword}")
-                            continue  # Skip rows without sufficient data or with no matching tenders
-
-                        date_published = cells[0].find('abbr').text.strip() if cells[0].find('abbr') else "not specified"
-                        tender_deadline = cells[1].find('abbr').text.strip() if cells[1].find('abbr') else "not specified"
-                        tender_name = cells[2].text.strip() if cells[2] else "not specified"
-                        tender_type = cells[3].text.strip() if cells[3] else "not specified"
-                        tender_authority = cells[4].text.strip() if cells[4] else "not specified"
-
-                        # Format dates
-                        formatted_deadline = format_date(tender_deadline) if tender_deadline != "nv" else "not specified"
-                        formatted_date_published = format_date(date_published)
-
-                        # Create or update tender details
-                        if tender_name in all_tenders:
-                            if keyword not in all_tenders[tender_name]['found_keywords']:
-                                all_tenders[tender_name]['found_keywords'] += f", {keyword}"
-                        else:
-                            tender_details = {
-                                'date_published': formatted_date_published,
-                                'tender_name': tender_name,
-                                'tender_authority': tender_authority,
-                                'tender_type': tender_type,
-                                'tender_deadline': formatted_deadline,
-                                'source_url': source_url,
-                                'found_keywords': keyword  # Initialize with the searched keyword
-                            }
-                            all_tenders[tender_name] = tender_details
-
-                    except Exception as e:
-                        print(f"An error occurred while parsing row: {e}")
-
-                # Check for next page
-                next_page = soup.find('a', {'title': 'Nächste Seite'})
-                if next_page and 'disabled' not in next_page.get('class', []):
-                    next_url = urljoin(url, next_page['href'])
-                    print(f"Navigating to the next page: {next_url}")
-                    browser.get(next_url)
-                else:
-                    break
-        except TimeoutException:
-            print(f"Timeout while searching for keyword: {keyword}")
-        except NoSuchElementException:
-            print(f"No element found for keyword: {keyword}")
-        except ElementNotInteractableException:
-            print(f"Element not interactable for keyword: {keyword}")
-        except Exception as e:
-            print(f"An error occurred while searching for keyword: {keyword} - {str(e)}")
+            }
 
-    tenders = list(all_tenders.values())
-    total_tenders = len(tenders)
-    print(f"Total tenders found for Brandenburg: {total_tenders}")
-    return all_tenders
 
 def handle_cookie_banner(browser):
     try:
@@ -942,342 +410,41 @@ def scrape_dtvp(browser, url, keywords):
         for result in results:
             print(result)
 
-def scrape_niedersachsen(browser, url, keywords, source_url):
-    print(f"Scraping dynamic content from {url}...")
-    all_tenders = {}
-    browser.get(url)
-
-    for keyword in keywords:
-        try:
-            print(f"Searching for keyword: {keyword}")
-            # Perform search
-            search_input = WebDriverWait(browser, 20).until(
-                EC.presence_of_element_located((By.ID, "searchText"))
-            )
-            search_input.clear()
-            search_input.send_keys(keyword)
-            
-            # Click the search button
-            search_button = browser.find_element(By.ID, "searchStart")
-            search_button.click()
-
-            while True:
-                # Wait for results to load
-                try:
-                    WebDriverWait(browser, 20).until(
-                        EC.presence_of_element_located((By.XPATH, "//div[@id='listTemplate']"))
-                    )
-                    print("Search processed, results loaded")
-                    # Adding delay to ensure the page is fully loaded
-                    time.sleep(5)  # Adjust the sleep duration as needed
-                except TimeoutException:
-                    print("Timeout while waiting for search results")
-                    break
-
-                # Parse results
-                html = browser.page_source
-                soup = BeautifulSoup(html, 'html.parser')
-
-                # Find all tender rows
-                tender_rows = soup.select("div#listTemplate tbody tr")
-                if len(tender_rows) == 0:
-                    print(f"No tenders found for keyword: {keyword}")
-                    break
-
-                for row in tender_rows:
-                    try:
-                        # Extract and strip text from each relevant cell
-                        cells = row.find_all('td')
-                        cell_texts = [cell.text.strip() for cell in cells]
-
-                        if len(cells) < 5 or "Es wurden keine passenden Bekanntmachungen gefunden." in cell_texts[0]:
-                            continue  # Skip rows without sufficient data or with no matching tenders
-
-                        date_published = cells[0].find('abbr').text.strip() if cells[0].find('abbr') else "not specified"
-                        tender_deadline = cells[1].find('abbr').text.strip() if cells[1].find('abbr') else "not specified"
-                        tender_name = cells[2].text.strip() if cells[2] else "not specified"
-                        tender_type = cells[3].text.strip() if cells[3] else "not specified"
-                        tender_authority = cells[4].text.strip() if cells[4] else "not specified"
-
-                        # Format dates
-                        formatted_deadline = format_date(tender_deadline) if tender_deadline != "nv" else "not specified"
-                        formatted_date_published = format_date(date_published)
-
-                        # Create or update tender details
-                        if tender_name in all_tenders:
-                            if keyword not in all_tenders[tender_name]['found_keywords']:
-                                all_tenders[tender_name]['found_keywords'] += f", {keyword}"
-                        else:
-                            tender_details = {
-                                'date_published': formatted_date_published,
-                                'tender_name': tender_name,
-                                'tender_authority': tender_authority,
-                                'tender_type': tender_type,
-                                'tender_deadline': formatted_deadline,
-                                'source_url': source_url,
-                                'found_keywords': keyword  # Initialize with the searched keyword
-                            }
-                            all_tenders[tender_name] = tender_details
-
-                    except Exception as e:
-                        print(f"An error occurred while parsing row: {e}")
-
-                # Check for next page
-                next_page = soup.find('a', {'title': 'Nächste Seite'})
-                if next_page and 'disabled' not in next_page.get('class', []):
-                    next_url = urljoin(url, next_page['href'])
-                    print(f"Navigating to the next page: {next_url}")
-                    browser.get(next_url)
-                else:
-                    break
-        except TimeoutException:
-            print(f"Timeout while searching for keyword: {keyword}")
-        except NoSuchElementException:
-            print(f"No element found for keyword: {keyword}")
-        except ElementNotInteractableException:
-            print(f"Element not interactable for keyword: {keyword}")
-        except Exception as e:
-            print(f"An error occurred while searching for keyword: {keyword} - {str(e)}")
-
-    tenders = list(all_tenders.values())
-    total_tenders = len(tenders)
-    print(f"Total tenders found for Niedersachsen: {total_tenders}")
-    return all_tenders
-
-def scrape_metropoleruhr(browser, url, keywords, source_url):
-    print(f"Scraping dynamic content from {url}...")
-    all_tenders = {}
-    browser.get(url)
-
-    for keyword in keywords:
-        try:
-            print(f"Searching for keyword: {keyword}")
-            # Perform search
-            search_input = WebDriverWait(browser, 20).until(
-                EC.presence_of_element_located((By.ID, "searchText"))
-            )
-            search_input.clear()
-            search_input.send_keys(keyword)
-            
-            # Click the search button
-            search_button = browser.find_element(By.ID, "searchStart")
-            search_button.click()
-
-            while True:
-                # Wait for results to load
-                try:
-                    WebDriverWait(browser, 20).until(
-                        EC.presence_of_element_located((By.XPATH, "//div[@id='listTemplate']"))
-                    )
-                    print("Search processed, results loaded")
-                    # Adding delay to ensure the page is fully loaded
-                    time.sleep(5)  # Adjust the sleep duration as needed
-                except TimeoutException:
-                    print("Timeout while waiting for search results")
-                    break
-
-                # Parse results
-                html = browser.page_source
-                soup = BeautifulSoup(html, 'html.parser')
-
-                # Find all tender rows
-                tender_rows = soup.select("div#listTemplate tbody tr")
-                if len(tender_rows) == 0:
-                    print(f"No tenders found for keyword: {keyword}")
-                    break
-
-                for row in tender_rows:
-                    try:
-                        # Extract and strip text from each relevant cell
-                        cells = row.find_all('td')
-                        cell_texts = [cell.text.strip() for cell in cells]
-
-                        if len(cells) < 5 or "Es wurden keine passenden Bekanntmachungen gefunden." in cell_texts[0]:
-                            print(f"No tender found for keyword: {keyword}")
-                            continue  # Skip rows without sufficient data or with no matching tenders
-
-                        date_published = cells[0].find('abbr').text.strip() if cells[0].find('abbr') else "not specified"
-                        tender_deadline = cells[1].find('abbr').text.strip() if cells[1].find('abbr') else "not specified"
-                        tender_name = cells[2].text.strip() if cells[2] else "not specified"
-                        tender_type = cells[3].text.strip() if cells[3] else "not specified"
-                        tender_authority = cells[4].text.strip() if cells[4] else "not specified"
-
-                        # Format dates
-                        formatted_deadline = format_date(tender_deadline) if tender_deadline != "nv" else "not specified"
-                        formatted_date_published = format_date(date_published)
-
-                        # Create or update tender details
-                        if tender_name in all_tenders:
-                            if keyword not in all_tenders[tender_name]['found_keywords']:
-                                all_tenders[tender_name]['found_keywords'] += f", {keyword}"
-                        else:
-                            tender_details = {
-                                'date_published': formatted_date_published,
-                                'tender_name': tender_name,
-                                'tender_authority': tender_authority,
-                                'tender_type': tender_type,
-                                'tender_deadline': formatted_deadline,
-                                'source_url': source_url,
-                                'found_keywords': keyword  # Initialize with the searched keyword
-                            }
-                            all_tenders[tender_name] = tender_details
-
-                    except Exception as e:
-                        print(f"An error occurred while parsing row: {e}")
-
-                # Check for next page
-                next_page = soup.find('a', {'title': 'Nächste Seite'})
-                if next_page and 'disabled' not in next_page.get('class', []):
-                    next_url = urljoin(url, next_page['href'])
-                    print(f"Navigating to the next page: {next_url}")
-                    browser.get(next_url)
-                else:
-                    break
-        except TimeoutException:
-            print(f"Timeout while searching for keyword: {keyword}")
-        except NoSuchElementException:
-            print(f"No element found for keyword: {keyword}")
-        except ElementNotInteractableException:
-            print(f"Element not interactable for keyword: {keyword}")
-        except Exception as e:
-            print(f"An error occurred while searching for keyword: {keyword} - {str(e)}")
-
-    tenders = list(all_tenders.values())
-    total_tenders = len(tenders)
-    print(f"Total tenders found for Metropoleruhr: {total_tenders}")
-    return all_tenders
-
+def parse_e_vergabe_sh_page(html, keyword, source_url):
+    """
+    Parses the result list of one keyword search on e-vergabe-sh.de.
+    """
+    document = parse_html(html)
 
-def scrape_saarvpsl(browser, url, keywords, source_url):
-    print(f"Scraping dynamic content from {url}...")
-    all_tenders = {}
-    browser.get(url)
+    # Check if no results were found
+    if E_VERGABE_SH_NO_RESULTS(document):
+        return []
 
-    for keyword in keywords:
+    tenders = []
+    for block in E_VERGABE_SH_BLOCKS(document):
         try:
-            print(f"Searching for keyword: {keyword}")
-            
-            # Check if we are on the initial page or subsequent searches
-            if "searchVisible" in browser.page_source:
-                search_input = WebDriverWait(browser, 20).until(
-                    EC.presence_of_element_located((By.ID, "searchVisible"))
-                )
-            else:
-                search_input = WebDriverWait(browser, 20).until(
-                    EC.presence_of_element_located((By.ID, "inputSearchKey"))
-                )
-
-            search_input.clear()
-            search_input.send_keys(keyword)
-            
-            if "searchVisible" in browser.page_source:
-                search_submit = WebDriverWait(browser, 10).until(
-                    EC.element_to_be_clickable((By.CSS_SELECTOR, "button.btn-mainSearch"))
-                )
-            else:
-                search_submit = WebDriverWait(browser, 10).until(
-                    EC.element_to_be_clickable((By.ID, "btnSearchSubmit"))
-                )
-
-            browser.execute_script("arguments[0].click();", search_submit)
-
-            while True:
-                # Wait for results to load
-                try:
-                    WebDriverWait(browser, 20).until(
-                        EC.presence_of_element_located((By.CSS_SELECTOR, "div.border.col-lg-12"))
-                    )
-                    time.sleep(5)  # Adjust the sleep duration as needed
-                except TimeoutException:
-                    print(f"Timeout while waiting for search results for keyword: {keyword}")
-                    break
-
-                # Parse results
-                html = browser.page_source
-                soup = BeautifulSoup(html, 'html.parser')
-
-                # Check if no results were found
-                no_results_tag = soup.find('td', colspan="6", string="There were no matching notices found.")
-                if no_results_tag:
-                    print(f"No tenders found for keyword: {keyword}")
-                    break
-
-                # Check if results were found
-                results_text = soup.find('h3', class_='color-main')
-                if results_text and "gefundene Ausschreibung" in results_text.text:
-                    num_results = int(results_text.text.split()[0])
-
-                # Find all tender rows
-                tender_blocks = soup.select("tbody.tableLeftHeaderBlock[tabindex='0']")
-                print(f"Found {len(tender_blocks)} tender blocks for keyword: {keyword}")
-
-                for tbody in tender_blocks:
-                    rows = tbody.find_all('tr', class_='tableRowLeft')
-                    tender_details = {}
-                    for row in rows:
-                        try:
-                            cells = row.find_all('td')
-                            if len(cells) < 2:
-                                continue  # Skip rows with insufficient data
-
-                            header_text = cells[0].get_text(strip=True)
-                            data_text = cells[1].get_text(strip=True)
-
-                            if 'Ausschreibung' in header_text:
-                                tender_details['tender_name'] = data_text or "not specified"
-                            elif 'Vergabestelle' in header_text:
-                                tender_details['tender_authority'] = data_text or "not specified"
-                            elif 'Verfahrensart' in header_text:
-                                tender_details['tender_type'] = data_text or "not specified"
-                            elif 'Rechtsrahmen' in header_text:
-                                tender_details['tender_law'] = data_text or "not specified"
-                            elif 'Abgabefrist' in header_text:
-                                tender_details['tender_deadline'] = format_date(data_text.split()[0]) if data_text else "not specified"
-                            elif 'Erschienen am' in header_text:
-                                tender_details['date_published'] = format_date(data_text) if data_text else "not specified"
-
-                        except Exception as e:
-                            print(f"An error occurred while parsing row: {e}")
-
-                    if tender_details:
-                        tender_name = tender_details.get('tender_name', 'unknown')
-                        tender_details['source_url'] = source_url
-                        tender_details['found_keywords'] = keyword
-
-                        if tender_name in all_tenders:
-                            if keyword not in all_tenders[tender_name]['found_keywords']:
-                                all_tenders[tender_name]['found_keywords'] += f", {keyword}"
-                        else:
-                            all_tenders[tender_name] = tender_details
-
-                # Check for next page
-                next_page = soup.find('a', {'title': 'Nächste Seite'})
-                if next_page and 'disabled' not in next_page.get('class', []):
-                    next_url = urljoin(url, next_page['href'])
-                    print(f"Navigating to the next page: {next_url}")
-                    browser.get(next_url)
-                else:
-                    break
+            tender_name = stripped_text(E_VERGABE_SH_FIELDS['bek_list_item_headline'](block)[0]) or "not specified"
+            tender_authority = stripped_text(E_VERGABE_SH_FIELDS['bek_list_item_info'](block)[0]).replace('Beauftragtes Unternehmen: ', '') or "not specified"
+            tender_code = E_VERGABE_SH_FIELDS['bek_list_item_left'](block)[0].text.strip() or "not specified"
+            tender_date = stripped_text(E_VERGABE_SH_FIELDS['bek-date'](block)[0]).replace('Datum: ', '') or "not specified"
+            tender_date = format_date(tender_date)
 
-        except TimeoutException:
-            print(f"Timeout while searching for keyword: {keyword}")
-        except NoSuchElementException:
-            print(f"No element found for keyword: {keyword}")
-        except ElementNotInteractableException:
-            print(f"Element not interactable for keyword: {keyword}")
+            tenders.append({
+                'tender_name': tender_name,
+                'tender_authority': tender_authority,
+                'tender_code': tender_code,
+                'date_published': tender_date,
+                'source_url': source_url,
+                'found_keywords': keyword
+            })
         except Exception as e:
-            print(f"An error occurred while searching for keyword: {keyword} - {str(e)}")
-
-    tenders = list(all_tenders.values())
-    total_tenders = len(tenders)
-    print(f"Total tenders found for Saarvpsl: {total_tenders}")
+            print(f"An error occurred while parsing block: {e}")
     return tenders
 
-
-def scrape_e_vergabe_sh(browser, url, keywords, source_url):
+def scrape_e_vergabe_sh(browser, url, keywords, source_url, page_cache=None):
     print(f"Scraping dynamic content from {url}...")
-    all_tenders = {}
-    browser.get(url)
+    tender_names = set()
+    load_page(browser, url, source_url)
 
     for keyword in keywords:
         try:
@@ -1291,6 +458,7 @@ def scrape_e_vergabe_sh(browser, url, keywords, source_url):
             search_input.send_keys(keyword)
 
             # Click the search button
+            previous_results = find_optional_element(browser, "div.bek_list_scroll")
             search_button = browser.find_element(By.CSS_SELECTOR, "input.btn[type='submit'][value='Suchen']")
             browser.execute_script("arguments[0].click();", search_button)
 
@@ -1298,47 +466,20 @@ def scrape_e_vergabe_sh(browser, url, keywords, source_url):
             WebDriverWait(browser, 20).until(
                 EC.presence_of_element_located((By.CSS_SELECTOR, "div.bek_list_scroll"))
             )
-            time.sleep(5)  # Adjust the sleep duration as needed
-
-            # Parse results
-            html = browser.page_source
-            soup = BeautifulSoup(html, 'html.parser')
+            wait_until_stable(browser, "div.bek_list_item_w_hover", source_url, previous=previous_results)
 
-            # Check if no results were found
-            no_results_tag = soup.find('div', style="text-align:center; margin-top:50px;", string="Es wurden keine Vergabeinformationen zu Ihren Suchkriterien gefunden!")
-            if no_results_tag:
+            # Parse results, unless the page is unchanged since it was last parsed
+            tenders = parse_page(page_cache, source_url, keyword, 1, browser.page_source,
+                                 lambda html: parse_e_vergabe_sh_page(html, keyword, source_url))
+            if not tenders:
                 print(f"No tenders found for keyword: {keyword}")
                 continue
+            print(f"Found {len(tenders)} tenders for keyword: {keyword}")
 
-            # Find all tender rows
-            tender_blocks = soup.select("div.bek_list_item_w_hover.js-list-detaillink")
-            print(f"Found {len(tender_blocks)} tender blocks for keyword: {keyword}")
-
-            for block in tender_blocks:
-                try:
-                    tender_name = block.find('div', class_='bek_list_item_headline').get_text(strip=True) or "not specified"
-                    tender_authority = block.find('div', class_='bek_list_item_info').get_text(strip=True).replace('Beauftragtes Unternehmen: ', '') or "not specified"
-                    tender_code = block.find('div', class_='bek_list_item_left').contents[0].strip() or "not specified"
-                    tender_date = block.find('div', class_='bek-date').get_text(strip=True).replace('Datum: ', '') or "not specified"
-                    tender_date = format_date(tender_date)
-
-                    tender_details = {
-                        'tender_name': tender_name,
-                        'tender_authority': tender_authority,
-                        'tender_code': tender_code,
-                        'date_published': tender_date,
-                        'source_url': source_url,
-                        'found_keywords': keyword
-                    }
-
-                    if tender_name in all_tenders:
-                        if keyword not in all_tenders[tender_name]['found_keywords']:
-                            all_tenders[tender_name]['found_keywords'] += f", {keyword}"
-                    else:
-                        all_tenders[tender_name] = tender_details
-
-                except Exception as e:
-                    print(f"An error occurred while parsing block: {e}")
+            for tender in tenders:
+                # Tenders found again for another keyword are consolidated downstream (tender_pipeline)
+                tender_names.add(tender['tender_name'])
+                yield tender
 
         except TimeoutException:
             print(f"Timeout while searching for keyword: {keyword}")
@@ -1349,26 +490,26 @@ def scrape_e_vergabe_sh(browser, url, keywords, source_url):
         except Exception as e:
             print(f"An error occurred while searching for keyword: {keyword} - {str(e)}")
 
-    tenders = list(all_tenders.values())
-    total_tenders = len(tenders)
-    print(f"Total tenders found for Schleswig-Holstein: {total_tenders}")
-    return tenders
+    print(f"Total tenders found for Schleswig-Holstein: {len(tender_names)}")
 
 
 def scrape_website(url):
     print(f"Fetching content from {url}...")
-    try:
-        response = requests.get(url)
-        response.raise_for_status()  # Raises an HTTPError if the HTTP request returned an unsuccessful status code
-        return response.text
-    except requests.HTTPError as http_err:
-        print(f"HTTP error occurred: {http_err}")
-    except Exception as err:
-        print(f"An error occurred: {err}")
-    return None
-
-def scrape_site(site_info):
+    # Goes through the shared fetch layer for timeouts, retries and compression
+    return fetch_page(url)
+
+def scrape_site(site_info, pool=None, static_pages=None, seen_index=None, page_cache=None):
+    """
+    Yields the tenders of one portal as they are parsed. Result pages that are unchanged since
+    the previous run are taken from `page_cache` (a page_cache.PageCache) instead of being parsed.
+    """
     url, scrape_func, source_url = site_info
+    if pool is None:
+        # Called on its own (outside scrape_all), use a private single-browser pool
+        with BrowserPool(size=1, lean=LEAN_BROWSER_PROFILE) as own_pool:
+            yield from scrape_site(site_info, own_pool, static_pages, seen_index, page_cache)
+        return
+
     keywords = ["Erlebnis", "Freizeit", "Destination", "Tourismus", "Tourismusförderung", "Tourismuskonzept",
                 "Tourismuskonzeption", "Tourismusservice", "Besucher", "Museum", "Markenwelt", "Ausstellung",
                 "Ideenskizze", "Konzept", "Nutzungsidee", "Masterplan", "Machbarkeit", "Beratung", "Studie",
@@ -1377,133 +518,114 @@ def scrape_site(site_info):
                 "Besucherinformationszentrum", "Gutachten"]
     
     if "myorder.rib.de" in source_url:
-        tenders = scrape_bayern_selenium(initialize_browser(), url, keywords, source_url)
-    elif "vmstart" in source_url or "saarvpsl.vmstart.de" in source_url:
-        tenders = globals()[scrape_func](initialize_browser(), url, keywords, source_url)
-    elif "vergabe.rlp.de" in source_url or "evergabe.nrw.de" in source_url or "vergabe.metropoleruhr.de" in source_url or "vergabe.niedersachsen.de" in source_url or "vergabemarktplatz.brandenburg.de" in source_url or "e-vergabe-sh.de" in source_url:
-        tenders_dict = globals()[scrape_func](initialize_browser(), url, keywords, source_url)
-        tenders = [tender for tender in tenders_dict.values()]
+        with pool.browser() as browser:
+            yield from scrape_bayern_selenium(browser, url, keywords, source_url, seen_index)
+    elif source_url in VMP_PORTALS:
+        # Tenders found again for another keyword are consolidated downstream (tender_pipeline)
+        yield from scrape_vmp_portal_http_first(pool, get_portal(source_url, seen_index, page_cache), keywords)
+    elif "e-vergabe-sh.de" in source_url:
+        with pool.browser() as browser:
+            yield from scrape_e_vergabe_sh(browser, url, keywords, source_url, page_cache)
     else:
-        html = scrape_website(url)
-        if html:
-            tenders = globals()[scrape_func](html, keywords, source_url)
-    return tenders
-def load_and_fix_dataframe(df):
-    # Check and convert 'application_start_date' to a consistent datetime format
-    def convert_date(date):
-        try:
-            return pd.to_datetime(date, format="%d.%m.%y", errors='coerce')  # Use 'coerce' to handle invalid parsing
-        except Exception as e:
-            print(f"Error converting date: {e}")
-            return None
+        # Static portals are normally prefetched (all pages, concurrently) by scrape_all
+        pages = (static_pages or {}).get(url) or [scrape_website(url)]
+        for page, html in enumerate(pages, start=1):
+            if html:
+                # The parsers only return tenders matching the keywords, so these are part of the key
+                yield from parse_page(page_cache, source_url, "", page, html,
+                                      lambda html: list(globals()[scrape_func](html, keywords, source_url)), keywords)
+def open_tender_store():
+    """
+    Opens the tender store, importing any legacy CSV snapshots that are not in it yet.
+    """
+    store = TenderStore(STORE_PATH)
+    store.import_csv_snapshots(OUTPUT_DIR)
+    return store
 
-    df['application_start_date'] = df['application_start_date'].apply(convert_date)
-    
-    # Drop rows where the date conversion failed
-    df = df.dropna(subset=['application_start_date'])
+def load_typed_snapshot(store=None):
+    """
+    Loads the typed Parquet snapshot, exporting it from the tender store first if it is missing.
+    """
+    if not os.path.exists(SNAPSHOT_PATH):
+        (store or open_tender_store()).export_typed_snapshot(SNAPSHOT_PATH)
+    return read_typed_snapshot(SNAPSHOT_PATH)
 
-    return df
+def scrape_all(incremental=False, progress=None):
+    """
+    Scrapes all portals, streams the results into the tender store as they are parsed and returns
+    all stored tenders as a typed frame (see tender_store.to_typed_frame).
+    With `incremental`, searches stop paginating once a page only lists tenders already in the store.
+    `progress(portal, status, tenders=0)` is called when each portal starts ('running') and ends
+    ('done' or 'failed'), see scrape_jobs.
+    """
+    store = open_tender_store()
+    seen_index = SeenTenderIndex.from_store(store) if incremental else None
 
-def scrape_all():
-    results = []
-    browser = initialize_browser()
-    
     websites = {
         "https://vergabe.muenchen.de/NetServer/PublicationSearchControllerServlet?function=SearchPublications&Gesetzesgrundlage=All&Category=InvitationToTender&thContext=publications": ("scrape_muenchen", "https://vergabe.muenchen.de"),
-        "https://vergabe.vmstart.de/NetServer/PublicationSearchControllerServlet?function=SearchPublications&Gesetzesgrundlage=All&Category=InvitationToTender&thContext=publications": ("scrape_vmstart", "https://vergabe.vmstart.de"),
         "https://www.myorder.rib.de/public/publications": ("scrape_bayern_selenium", "https://www.myorder.rib.de"),
-        "https://vergabe.rlp.de/VMPCenter/company/announcements/categoryOverview.do?method=show": ("Rheinland", "https://vergabe.rlp.de"),
-        "https://www.evergabe.nrw.de/VMPCenter/company/announcements/categoryOverview.do?method=show": ("scrape_nrw", "https://www.evergabe.nrw.de"),
-        "https://www.vergabe.metropoleruhr.de/VMPSatellite/company/announcements/categoryOverview.do?method=show": ("scrape_metropoleruhr", "https://www.vergabe.metropoleruhr.de"),
-        "https://vergabe.niedersachsen.de/Satellite/company/announcements/categoryOverview.do?method=show": ("scrape_niedersachsen", "https://vergabe.niedersachsen.de"),
-        "https://vergabemarktplatz.brandenburg.de/VMPCenter/company/announcements/categoryOverview.do?method=show": ("scrape_brandenburg", "https://vergabemarktplatz.brandenburg.de"),
-        "https://saarvpsl.vmstart.de/NetServer/PublicationSearchControllerServlet?function=SearchPublications&Gesetzesgrundlage=All&Category=InvitationToTender&thContext=publications": ("scrape_saarvpsl", "https://saarvpsl.vmstart.de"),
         "https://www.dtvp.de/Center/company/announcements/categoryOverview.do?method=showCategoryOverview": ("scrape_dtvp", "https://www.dtvp.de"),
         "https://www.e-vergabe-sh.de/vergabeplattform/vergabeinformationen": ("scrape_e_vergabe_sh", "https://www.e-vergabe-sh.de")
     }
 
     location_defaults = {
         "https://vergabe.muenchen.de": "Bavaria",
-        "https://vergabe.vmstart.de": "Rhineland-Palatinate",
         "https://www.myorder.rib.de": "Bavaria",
-        "https://vergabe.rlp.de": "Rhineland-Palatinate",
-        "https://www.evergabe.nrw.de": "North Rhine-Westphalia",
-        "https://www.vergabe.metropoleruhr.de": "North Rhine-Westphalia",
-        "https://vergabe.niedersachsen.de": "Lower Saxony",
-        "https://vergabemarktplatz.brandenburg.de": "Brandenburg",
-        "https://saarvpsl.vmstart.de": "Saarland",
         "https://www.dtvp.de": "Lower Saxony",
         "https://www.e-vergabe-sh.de": "Schleswig-Holstein"  
     }
 
-
-    with concurrent.futures.ThreadPoolExecutor() as executor:
-        future_to_url = {executor.submit(scrape_site, (url, scrape_func, source_url)): url for url, (scrape_func, source_url) in websites.items()}
-        for future in concurrent.futures.as_completed(future_to_url):
-            try:
-                tenders = future.result()
-                results.extend(tenders)
-            except Exception as exc:
-                print(f"An error occurred: {exc}")
-
-    # Consolidate keywords for the same tender
-    unique_tenders = {}
-    for tender in results:
-        tender_name = tender['tender_name']
-        if tender_name in unique_tenders:
-            existing_keywords = unique_tenders[tender_name]['found_keywords'].split(', ')
-            new_keywords = tender['found_keywords'].split(', ')
-            all_keywords = list(set(existing_keywords + new_keywords))
-            unique_tenders[tender_name]['found_keywords'] = ', '.join(all_keywords)
-        else:
-            # Assign default state if not identified
-            if 'state' not in tender or tender['state'] == "not specified":
-                tender['state'] = location_defaults.get(tender['source_url'], "not specified")
-
-            # Assign date_published to application_start_date if not defined
-            if 'application_start_date' not in tender or tender['application_start_date'] == "not specified":
-                tender['application_start_date'] = tender.get('date_published', "not specified")
-
-            unique_tenders[tender_name] = tender
-
-    print(f"Total unique tenders: {len(unique_tenders)}")
-
-    if not unique_tenders:
-        return pd.DataFrame()  # Return an empty DataFrame if no results
-
-    # Write the results to a CSV file
-    fieldnames = [
-        'tender_name',
-        'tender_authority',  # Authority part of description
-        'application_start_date',  # Start date of application
-        'tender_deadline',  # Harmonized key for deadlines
-        'period',  # Unique to scrape_bayern
-        'tender_location',  # Harmonized key for location/execution place
-        'date_published',  # From scrape_bayern and scrape_muenchen
-        'tender_type',  # Unique to scrape_muenchen
-        'source_url',  # Common across all functions
-        'found_keywords',
-        'state'  # Add the state column
-    ]
-    df = pd.DataFrame(unique_tenders.values(), columns=fieldnames)
-
-    # Handle NaN values before saving
-    df.fillna("not specified", inplace=True)
-
-    # Convert and fix the 'application_start_date' column
-    df = load_and_fix_dataframe(df)
-
-    # Get the current date and time
-    now = datetime.datetime.now()
-    formatted_date = now.strftime("%Y-%m-%d_%H-%M-%S")
-
-    # Ensure the directory exists
-    output_dir = "master/2_streamlit/Capstone_ATIS_Streamlit"
-    os.makedirs(output_dir, exist_ok=True)
-
-    # Save the DataFrame to a CSV file with the date and time in the filename
-    filename = os.path.join(output_dir, f'capstone_results_{formatted_date}.csv')
-    df.to_csv(filename, index=False)
-    print(f"Scraping completed. Data saved to {filename}")
-
-    return df
+    # VMP portals are described in vmp_engine and scraped by the shared engine
+    for source_url, portal in VMP_PORTALS.items():
+        websites[portal['url']] = ("scrape_vmp_portal", source_url)
+        location_defaults[source_url] = portal['state']
+
+    reset_wait_stats()
+    reset_page_load_stats()
+    reset_page_loads()
+    reset_query_plans()
+    reset_http_stats()
+    reset_page_cache_stats()
+    page_cache = PageCache(PAGE_CACHE_PATH)
+
+    # Fetch the plain-HTML portals and their follow-up pages concurrently in one go
+    static_pages = fetch_listings({url: STATIC_LISTINGS[source_url] for url, (scrape_func, source_url) in websites.items() if source_url in STATIC_LISTINGS})
+
+    progress = progress or (lambda portal, status, tenders=0: None)
+
+    def portal_done(source_url, tenders, error):
+        if error is not None:
+            print(f"An error occurred: {error}")
+        progress(source_url, 'failed' if error is not None else 'done', tenders)
+
+    # While tenders are coming in, the dashboard's snapshot is refreshed every so often
+    refresh_snapshot = throttle(lambda written: store.export_typed_snapshot(SNAPSHOT_PATH), SNAPSHOT_REFRESH_SECONDS)
+    deduplicate = TenderDeduplicator()
+
+    # All Selenium portals share a small set of warm browsers that are always torn down. Every
+    # portal streams its tenders as they are parsed, through normalization and consolidation by
+    # name, into the store in small transactions: what was scraped before a failure is kept.
+    with BrowserPool(size=BROWSER_POOL_SIZE, lean=LEAN_BROWSER_PROFILE) as pool:
+        streams = {source_url: scrape_site((url, scrape_func, source_url), pool, static_pages, seen_index, page_cache) for url, (scrape_func, source_url) in websites.items()}
+        for source_url in streams:
+            progress(source_url, 'running')
+        tenders = (tender for _, tender in merge_streams(streams, on_done=portal_done))
+        written = write_to_store(deduplicate(normalize_tenders(tenders, location_defaults)), store, on_batch=refresh_snapshot)
+
+    report_wait_stats()
+    report_page_load_stats()
+    report_query_plans()
+    report_http_stats()
+    report_page_cache_stats()
+    print(f"Total unique tenders: {len(deduplicate)}")
+    if seen_index is not None:
+        print(f"Incremental mode: skipped the remaining pages of {seen_index.pages_skipped} searches.")
+
+    if not written:
+        return load_typed_snapshot(store)
+
+    # Tenders seen before are updated in place, so the store only grows with new tenders
+    print(f"Scraping completed. {written} tenders saved to {STORE_PATH} ({store.count()} stored in total)")
+
+    store.export_typed_snapshot(SNAPSHOT_PATH)
+    return read_typed_snapshot(SNAPSHOT_PATH)
@@ -0,0 +1,66 @@
+import datetime
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+from dateutil import parser
+
+# Formats seen on the portals and in the stored snapshots, most common first
+KNOWN_FORMATS = ["%d.%m.%y", "%d.%m.%Y", "%Y-%m-%d", "%Y-%m-%d %H:%M:%S", "%d.%m.%Y %H:%M", "%d.%m.%y %H:%M", "%d/%m/%Y"]
+
+# Sentinels that mean "no date" in scraped values and CSV snapshots
+MISSING_VALUES = ["not specified", "", "nan", "NaN", "NaT", "None"]
+
+
+def parse_date(date_string):
+    """
+    Parses a single date with the known formats first and dateutil (day first) for anything else.
+    Returns a datetime, or None if the value is not a date.
+    """
+    date_string = date_string.strip()
+    for date_format in KNOWN_FORMATS:
+        try:
+            return datetime.datetime.strptime(date_string, date_format)
+        except ValueError:
+            pass
+    try:
+        return parser.parse(date_string, dayfirst=True)
+    except (parser.ParserError, ValueError, OverflowError):
+        return None
+
+
+@lru_cache(maxsize=4096)
+def format_date(date_string):
+    # Portals list the same few dates over and over, so results are cached
+    date_obj = parse_date(date_string)
+    return date_obj.strftime("%d.%m.%y") if date_obj else "not specified"
+
+
+def normalize_dates(series):
+    """
+    Converts a Series of mixed date values (dd.mm.yy, ISO, Timestamps, "not specified") to datetime64.
+
+    Each known format is applied to the whole column at once, only to the values no earlier format
+    matched. Values matching none of them are parsed one by one, once per distinct value.
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+    # Work on positions, the index may have duplicate labels
+    text = series.astype(str).str.strip().to_numpy()
+    result = np.full(len(text), np.datetime64('NaT'), dtype='datetime64[ns]')
+    remaining = ~pd.isna(series).to_numpy() & ~np.isin(text, MISSING_VALUES)
+
+    for date_format in KNOWN_FORMATS:
+        if not remaining.any():
+            break
+        positions = np.flatnonzero(remaining)
+        parsed = pd.to_datetime(pd.Series(text[positions]), format=date_format, errors='coerce').to_numpy()
+        matched = ~np.isnat(parsed)
+        result[positions[matched]] = parsed[matched]
+        remaining[positions[matched]] = False
+
+    if remaining.any():
+        positions = np.flatnonzero(remaining)
+        parsed_values = {value: parse_date(value) for value in set(text[positions])}
+        result[positions] = pd.to_datetime(pd.Series([parsed_values[value] for value in text[positions]]), errors='coerce').to_numpy()
+    return pd.Series(result, index=series.index, name=series.name)
@@ -0,0 +1,120 @@
+import numpy as np
+import pandas as pd
+
+from keyword_matcher import fold_text
+
+
+class TenderFilterIndex:
+    """
+    Precomputed index over a tender DataFrame for the Overview filters.
+
+    - state: categorical codes, a filter is one lookup-table gather
+    - found_keywords: one bitset (np.packbits) per keyword, a filter ORs the selected bitsets
+    - date columns: row order sorted by date, a range is two binary searches
+    - search columns: folded distinct values plus per-row codes, a search scans the distinct values only
+    - sort columns (and date columns): row order sorted by value, a sorted page is one gather
+
+    `mask` combines any of the filters into a boolean array aligned with the rows of the indexed frame,
+    `ordered_rows` turns a mask into row positions in display order.
+    """
+
+    def __init__(self, df, date_columns, sort_columns=(), search_columns=()):
+        self.size = len(df)
+
+        states = df['state'].astype('category')
+        self.state_categories = {state: code for code, state in enumerate(states.cat.categories)}
+        self.state_codes = states.cat.codes.to_numpy()
+
+        # Keyword x tender membership, one packed bit per tender
+        keywords = df['found_keywords'].reset_index(drop=True).explode().dropna()
+        keyword_codes, keyword_values = pd.factorize(keywords)
+        membership = np.zeros((len(keyword_values), self.size), dtype=bool)
+        membership[keyword_codes, keywords.index.to_numpy(dtype=np.int64)] = True
+        self.keyword_codes = {keyword: code for code, keyword in enumerate(keyword_values)}
+        self.keyword_bits = np.packbits(membership, axis=1)
+
+        # Row positions ordered by date; NaT sorts last and is excluded from every range
+        self.date_order = {}
+        self.sorted_dates = {}
+        # Full row order and number of non-missing values per sortable column, missing values last
+        self.sort_orders = {}
+        for column in date_columns:
+            values = df[column].to_numpy(dtype='datetime64[ns]')
+            order = np.argsort(values, kind='stable')
+            known = np.count_nonzero(~np.isnat(values))
+            self.date_order[column] = order[:known]
+            self.sorted_dates[column] = values[order[:known]]
+            self.sort_orders[column] = (order, known)
+
+        for column in sort_columns:
+            values = df[column].reset_index(drop=True)
+            order = values.sort_values(kind='stable', na_position='last').index.to_numpy()
+            self.sort_orders[column] = (order, values.count())
+
+        # Distinct folded values per search column, rows point at them by code (-1 when missing)
+        self.search_values = {}
+        self.search_codes = {}
+        for column in search_columns:
+            codes, values = pd.factorize(df[column].astype(object))
+            self.search_values[column] = [fold_text(str(value)) for value in values]
+            self.search_codes[column] = codes
+
+    def state_mask(self, states):
+        allowed = np.zeros(len(self.state_categories) + 1, dtype=bool)
+        for state in states:
+            if state in self.state_categories:
+                allowed[self.state_categories[state]] = True
+        # Code -1 (missing state) indexes the extra, always False slot
+        return allowed[self.state_codes]
+
+    def keyword_mask(self, keywords):
+        bits = np.zeros(self.keyword_bits.shape[1], dtype=np.uint8)
+        for keyword in keywords:
+            if keyword in self.keyword_codes:
+                bits |= self.keyword_bits[self.keyword_codes[keyword]]
+        return np.unpackbits(bits, count=self.size).astype(bool)
+
+    def date_mask(self, column, start, end):
+        sorted_dates = self.sorted_dates[column]
+        low = np.searchsorted(sorted_dates, np.datetime64(pd.Timestamp(start), 'ns'), side='left')
+        high = np.searchsorted(sorted_dates, np.datetime64(pd.Timestamp(end), 'ns'), side='right')
+        mask = np.zeros(self.size, dtype=bool)
+        mask[self.date_order[column][low:high]] = True
+        return mask
+
+    def search_mask(self, query):
+        # Case/umlaut insensitive substring search over all search columns
+        query = fold_text(query)
+        mask = np.zeros(self.size, dtype=bool)
+        for column, values in self.search_values.items():
+            # The extra, always False slot is indexed by code -1 (missing value)
+            hits = np.fromiter((query in value for value in values), dtype=bool, count=len(values))
+            mask |= np.append(hits, False)[self.search_codes[column]]
+        return mask
+
+    def ordered_rows(self, mask, sort_by, descending=False):
+        """
+        Positions of the rows selected by `mask`, ordered by `sort_by`. Missing values come last in
+        either direction.
+        """
+        order, known = self.sort_orders[sort_by]
+        if descending:
+            order = np.concatenate([order[:known][::-1], order[known:]])
+        return order[mask[order]]
+
+    def mask(self, states=None, keywords=None, date_ranges=None, search=None):
+        """
+        Rows matching all given filters: any of `states`, any of `keywords` and, for every
+        {column: (start, end)} in `date_ranges`, a date within the inclusive range, and `search`
+        in any of the search columns.
+        """
+        mask = np.ones(self.size, dtype=bool)
+        if states is not None:
+            mask &= self.state_mask(states)
+        if keywords is not None:
+            mask &= self.keyword_mask(keywords)
+        for column, (start, end) in (date_ranges or {}).items():
+            mask &= self.date_mask(column, start, end)
+        if search:
+            mask &= self.search_mask(search)
+        return mask
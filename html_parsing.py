@@ -0,0 +1,102 @@
+import re
+from functools import lru_cache
+
+from lxml import etree, html
+
+# Simple selector: optional tag, then any of #id, .class and [attribute='value']
+_SIMPLE_SELECTOR = re.compile(r"^([a-zA-Z][\w-]*)?((?:#[\w-]+|\.[\w-]+|\[[\w-]+=['\"][^'\"]*['\"]\])*)$")
+_SELECTOR_PART = re.compile(r"#([\w-]+)|\.([\w-]+)|\[([\w-]+)=['\"]([^'\"]*)['\"]\]")
+
+
+def has_class(name):
+    # XPath predicate matching one class in a space separated class attribute, like CSS .name
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+def literal(value):
+    if "'" not in value:
+        return f"'{value}'"
+    return 'concat(' + ", \"'\", ".join(f"'{part}'" for part in value.split("'")) + ')'
+
+
+def css_to_xpath_expression(selector, relative=False):
+    """
+    Translates the CSS subset used by the portal descriptors (tags, #id, .class,
+    [attribute='value'] and the descendant combinator) to XPath.
+    """
+    steps = []
+    for part in selector.split():
+        match = _SIMPLE_SELECTOR.match(part)
+        if not match:
+            raise ValueError(f"Unsupported CSS selector: {selector!r}")
+        predicates = []
+        for element_id, class_name, attribute, value in _SELECTOR_PART.findall(match.group(2)):
+            if element_id:
+                predicates.append(f"@id={literal(element_id)}")
+            elif class_name:
+                predicates.append(has_class(class_name))
+            else:
+                predicates.append(f"@{attribute}={literal(value)}")
+        steps.append((match.group(1) or '*') + ''.join(f"[{predicate}]" for predicate in predicates))
+    return ('.//' if relative else '//') + '//'.join(steps)
+
+
+@lru_cache(maxsize=None)
+def xpath(expression):
+    # Compiled once per expression and reused for every page
+    return etree.XPath(expression)
+
+
+@lru_cache(maxsize=None)
+def css(selector, relative=False):
+    return xpath(css_to_xpath_expression(selector, relative))
+
+
+@lru_cache(maxsize=None)
+def find_by_attributes(tag, attributes):
+    # XPath for BeautifulSoup style find(tag, {attribute: value}), `attributes` as sorted items
+    return xpath(f"//{tag}" + ''.join(f"[@{name}={literal(value)}]" for name, value in attributes))
+
+
+def parse_html(markup, scope=None, required=()):
+    """
+    Parses a page with lxml. With `scope`, a marker such as 'id="listTemplate"', only the markup
+    from the tag containing the first occurrence of the marker on is parsed, skipping the page
+    head and navigation. The whole page is parsed if the marker does not occur, or if any of the
+    `required` strings (say, the next-page link's title) only occurs before it.
+    Scripts and styles are dropped, so text matches what BeautifulSoup's get_text returns.
+    """
+    if scope is not None:
+        index = markup.find(scope)
+        if index != -1:
+            start = markup.rfind('<', 0, index)
+            if all(markup.find(value, start) != -1 or markup.find(value) == -1 for value in required):
+                markup = markup[start:]
+    if not markup.strip():
+        markup = "<html></html>"
+    document = html.document_fromstring(markup)
+    etree.strip_elements(document, 'script', 'style', with_tail=False)
+    return document
+
+
+def find_link(document, attributes):
+    # First <a> with all the given attribute values, like BeautifulSoup's find('a', attributes)
+    return first(find_by_attributes('a', tuple(sorted(attributes.items())))(document))
+
+
+def has_class_name(node, name):
+    return name in (node.get('class') or '').split()
+
+
+def text(node):
+    # BeautifulSoup's element.text.strip()
+    return node.text_content().strip()
+
+
+def stripped_text(node):
+    # BeautifulSoup's element.get_text(strip=True)
+    return ''.join(part.strip() for part in node.itertext())
+
+
+def first(nodes):
+    return nodes[0] if nodes else None
@@ -0,0 +1,89 @@
+import unicodedata
+from collections import deque
+from functools import lru_cache
+
+# German spellings that portals use interchangeably ("Grünanlage" / "Gruenanlage", "Maß" / "Mass")
+UMLAUT_FOLDING = str.maketrans({'ä': "ae", 'ö': "oe", 'ü': "ue"})
+
+
+def fold_text(text):
+    """
+    Normalizes text for keyword matching: NFC-composes umlauts written with combining marks,
+    casefolds (which also maps ß to ss) and spells umlauts out.
+    """
+    return unicodedata.normalize('NFC', text).casefold().translate(UMLAUT_FOLDING)
+
+
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton over a keyword list.
+
+    The automaton is built once per keyword list; `find` then walks the folded text a single time
+    and reports every keyword occurring in it, including keywords nested in longer ones
+    (Tourismus in Tourismuskonzept). Matching is substring based and case/umlaut insensitive.
+    """
+
+    def __init__(self, keywords):
+        self.keywords = list(dict.fromkeys(keywords))
+        # State 0 is the root. goto[state] maps a character to the next state, fail[state] is the
+        # longest proper suffix state, outputs[state] the keyword indexes recognised in that state.
+        self.goto = [{}]
+        self.fail = [0]
+        self.outputs = [()]
+        for index, keyword in enumerate(self.keywords):
+            self._add(fold_text(keyword), index)
+        self._build_failure_links()
+
+    def _add(self, pattern, index):
+        state = 0
+        for character in pattern:
+            next_state = self.goto[state].get(character)
+            if next_state is None:
+                next_state = len(self.goto)
+                self.goto[state][character] = next_state
+                self.goto.append({})
+                self.fail.append(0)
+                self.outputs.append(())
+            state = next_state
+        self.outputs[state] += (index,)
+
+    def _build_failure_links(self):
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for character, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and character not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[next_state] = self.goto[fallback].get(character, 0)
+                # A state also recognises everything its failure state recognises
+                self.outputs[next_state] += self.outputs[self.fail[next_state]]
+
+    def find(self, text):
+        """
+        Returns the keywords found in `text`, in keyword list order.
+        """
+        goto, fail, outputs = self.goto, self.fail, self.outputs
+        found = set()
+        state = 0
+        for character in fold_text(text):
+            while state and character not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(character, 0)
+            if outputs[state]:
+                found.update(outputs[state])
+        return [self.keywords[index] for index in sorted(found)]
+
+
+@lru_cache(maxsize=16)
+def get_matcher(keywords):
+    # Scrapers call match_keywords per tender with the same list: build the automaton once per list
+    return KeywordMatcher(keywords)
+
+
+def match_keywords(text, keywords):
+    """
+    Returns the keywords from `keywords` that occur in `text`.
+    """
+    return get_matcher(tuple(keywords)).find(text)
@@ -0,0 +1,315 @@
+import csv
+import os
+import re
+from functools import lru_cache
+
+from keyword_matcher import fold_text
+
+# Offline gazetteer of German places (GeoNames cities500 extract, CC BY 4.0), see build_gazetteer
+GAZETTEER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "de_places.csv")
+
+# GeoNames admin1 codes of the German states
+ADMIN1_STATES = {
+    '01': "Baden-Württemberg",
+    '02': "Bavaria",
+    '03': "Bremen",
+    '04': "Hamburg",
+    '05': "Hesse",
+    '06': "Lower Saxony",
+    '07': "North Rhine-Westphalia",
+    '08': "Rhineland-Palatinate",
+    '09': "Saarland",
+    '10': "Schleswig-Holstein",
+    '11': "Brandenburg",
+    '12': "Mecklenburg-Vorpommern",
+    '13': "Saxony",
+    '14': "Saxony-Anhalt",
+    '15': "Thuringia",
+    '16': "Berlin",
+}
+
+# State of each postal region (first two digits of the postal code), with three-digit exceptions
+# where a region reaches into a neighbouring state
+POSTAL_PREFIX_STATES = {
+    '01': "Saxony", '02': "Saxony", '03': "Brandenburg", '04': "Saxony", '06': "Saxony-Anhalt",
+    '07': "Thuringia", '08': "Saxony", '09': "Saxony",
+    '10': "Berlin", '12': "Berlin", '13': "Berlin", '14': "Brandenburg", '15': "Brandenburg",
+    '16': "Brandenburg", '17': "Mecklenburg-Vorpommern", '18': "Mecklenburg-Vorpommern",
+    '19': "Mecklenburg-Vorpommern",
+    '20': "Hamburg", '21': "Lower Saxony", '22': "Hamburg", '23': "Schleswig-Holstein",
+    '24': "Schleswig-Holstein", '25': "Schleswig-Holstein", '26': "Lower Saxony", '27': "Lower Saxony",
+    '28': "Lower Saxony", '29': "Lower Saxony",
+    '30': "Lower Saxony", '31': "Lower Saxony", '32': "North Rhine-Westphalia", '33': "North Rhine-Westphalia",
+    '34': "Hesse", '35': "Hesse", '36': "Hesse", '37': "Lower Saxony", '38': "Lower Saxony",
+    '39': "Saxony-Anhalt",
+    '40': "North Rhine-Westphalia", '41': "North Rhine-Westphalia", '42': "North Rhine-Westphalia",
+    '44': "North Rhine-Westphalia", '45': "North Rhine-Westphalia", '46': "North Rhine-Westphalia",
+    '47': "North Rhine-Westphalia", '48': "North Rhine-Westphalia", '49': "Lower Saxony",
+    '50': "North Rhine-Westphalia", '51': "North Rhine-Westphalia", '52': "North Rhine-Westphalia",
+    '53': "North Rhine-Westphalia", '54': "Rhineland-Palatinate", '55': "Rhineland-Palatinate",
+    '56': "Rhineland-Palatinate", '57': "North Rhine-Westphalia", '58': "North Rhine-Westphalia",
+    '59': "North Rhine-Westphalia",
+    '60': "Hesse", '61': "Hesse", '63': "Hesse", '64': "Hesse", '65': "Hesse", '66': "Saarland",
+    '67': "Rhineland-Palatinate", '68': "Baden-Württemberg", '69': "Baden-Württemberg",
+    '70': "Baden-Württemberg", '71': "Baden-Württemberg", '72': "Baden-Württemberg", '73': "Baden-Württemberg",
+    '74': "Baden-Württemberg", '75': "Baden-Württemberg", '76': "Baden-Württemberg", '77': "Baden-Württemberg",
+    '78': "Baden-Württemberg", '79': "Baden-Württemberg",
+    '80': "Bavaria", '81': "Bavaria", '82': "Bavaria", '83': "Bavaria", '84': "Bavaria", '85': "Bavaria",
+    '86': "Bavaria", '87': "Bavaria", '88': "Baden-Württemberg", '89': "Baden-Württemberg",
+    '90': "Bavaria", '91': "Bavaria", '92': "Bavaria", '93': "Bavaria", '94': "Bavaria", '95': "Bavaria",
+    '96': "Bavaria", '97': "Bavaria", '98': "Thuringia", '99': "Thuringia",
+    # Three-digit exceptions
+    '046': "Thuringia", '140': "Berlin", '141': "Berlin", '172': "Brandenburg", '193': "Brandenburg",
+    '210': "Hamburg", '211': "Hamburg", '228': "Schleswig-Holstein", '229': "Schleswig-Holstein",
+    '275': "Bremen", '281': "Bremen", '282': "Bremen", '283': "Bremen", '284': "Bremen", '285': "Bremen",
+    '286': "Bremen", '287': "Bremen", '344': "North Rhine-Westphalia", '364': "Thuringia", '372': "Hesse",
+    '373': "Thuringia", '485': "Lower Saxony", '494': "North Rhine-Westphalia", '534': "Rhineland-Palatinate",
+    '535': "Rhineland-Palatinate", '575': "Rhineland-Palatinate", '576': "Rhineland-Palatinate",
+    '637': "Bavaria", '638': "Bavaria", '639': "Bavaria", '668': "Rhineland-Palatinate",
+    '669': "Rhineland-Palatinate", '685': "Hesse", '686': "Hesse", '881': "Bavaria", '892': "Bavaria",
+    '893': "Bavaria", '894': "Bavaria", '979': "Baden-Württemberg",
+}
+
+# Geographic centres of the states, used when only the state of a location is known
+STATE_COORDINATES = {
+    'Baden-Württemberg': {'latitude': 48.6616037, 'longitude': 9.3501336},
+    'Bavaria': {'latitude': 48.7904472, 'longitude': 11.4978898},
+    'Berlin': {'latitude': 52.5200066, 'longitude': 13.404954},
+    'Brandenburg': {'latitude': 52.4084186, 'longitude': 12.5316444},
+    'Bremen': {'latitude': 53.0792962, 'longitude': 8.8016937},
+    'Hamburg': {'latitude': 53.551086, 'longitude': 9.993682},
+    'Hesse': {'latitude': 50.6520516, 'longitude': 9.1624376},
+    'Mecklenburg-Vorpommern': {'latitude': 53.6126503, 'longitude': 12.4295953},
+    'Lower Saxony': {'latitude': 52.6367036, 'longitude': 9.8450824},
+    'North Rhine-Westphalia': {'latitude': 51.4332367, 'longitude': 7.6615938},
+    'Rhineland-Palatinate': {'latitude': 50.118182, 'longitude': 7.308953},
+    'Saarland': {'latitude': 49.3964237, 'longitude': 7.0229607},
+    'Saxony': {'latitude': 51.1045407, 'longitude': 13.2017384},
+    'Saxony-Anhalt': {'latitude': 51.9507459, 'longitude': 11.6922777},
+    'Schleswig-Holstein': {'latitude': 54.219367, 'longitude': 9.696957},
+    'Thuringia': {'latitude': 50.9013853, 'longitude': 11.0772807},
+}
+
+# German and English names of the states, matched as state-level entries
+STATE_NAMES = {
+    'Baden-Württemberg': ["Baden-Württemberg"],
+    'Bavaria': ["Bayern", "Freistaat Bayern", "Bavaria"],
+    'Berlin': ["Berlin"],
+    'Brandenburg': ["Brandenburg"],
+    'Bremen': ["Bremen", "Freie Hansestadt Bremen"],
+    'Hamburg': ["Hamburg", "Freie und Hansestadt Hamburg"],
+    'Hesse': ["Hessen", "Hesse"],
+    'Mecklenburg-Vorpommern': ["Mecklenburg-Vorpommern", "Mecklenburg-Western Pomerania"],
+    'Lower Saxony': ["Niedersachsen", "Lower Saxony"],
+    'North Rhine-Westphalia': ["Nordrhein-Westfalen", "North Rhine-Westphalia", "NRW"],
+    'Rhineland-Palatinate': ["Rheinland-Pfalz", "Rhineland-Palatinate"],
+    'Saarland': ["Saarland"],
+    'Saxony': ["Sachsen", "Freistaat Sachsen", "Saxony"],
+    'Saxony-Anhalt': ["Sachsen-Anhalt", "Saxony-Anhalt"],
+    'Schleswig-Holstein': ["Schleswig-Holstein"],
+    'Thuringia': ["Thüringen", "Freistaat Thüringen", "Thuringia"],
+}
+
+POSTAL_CODE_PATTERN = re.compile(r"(?<!\d)(\d{5})(?!\d)")
+TOKEN_PATTERN = re.compile(r"\w+")
+GERMAN_LETTERS = set("äöüßÄÖÜ")
+UNRESOLVED = {'state': "not specified", 'latitude': None, 'longitude': None, 'place': None}
+
+
+def tokenize(text):
+    return tuple(TOKEN_PATTERN.findall(fold_text(text)))
+
+
+def postal_code_state(postal_code):
+    return POSTAL_PREFIX_STATES.get(postal_code[:3]) or POSTAL_PREFIX_STATES.get(postal_code[:2])
+
+
+def place_names(name, alternate_names):
+    """
+    The spellings of a GeoNames place worth matching in tender locations: its name, the name
+    without qualifier ("Halle" for "Halle (Saale)", "Frankfurt" for "Frankfurt am Main") and German
+    alternate names ("München" for "Munich"). Other exonyms, codes and transliterations are dropped.
+    """
+    names = {re.sub(r"\s*\(.*\)$", "", name)}
+    for alternate_name in alternate_names:
+        if len(alternate_name) < 4 or not re.fullmatch(r"[^\W\d_]+(?:[ -][^\W\d_]+)*", alternate_name):
+            continue
+        if name.startswith(alternate_name + " ") or name.startswith(alternate_name + "-"):
+            names.add(alternate_name)
+        elif GERMAN_LETTERS & set(alternate_name) and alternate_name[0] == name[0]:
+            names.add(alternate_name)
+    # The GeoNames name comes first, it is the one reported as `place`
+    return [name] + sorted(names - {name})
+
+
+def build_gazetteer(geonames_rows, output_path=GAZETTEER_PATH):
+    """
+    Writes the gazetteer CSV from GeoNames rows (dicts with name, alternatenames, latitude,
+    longitude, countrycode, admin1code and population, as in the GeoNames cities500 dump).
+    """
+    rows = []
+    for row in geonames_rows:
+        state = ADMIN1_STATES.get(row['admin1code'])
+        if row['countrycode'] != 'DE' or state is None:
+            continue
+        rows.append({
+            'names': "|".join(place_names(row['name'], row['alternatenames'])),
+            'state': state,
+            'latitude': round(float(row['latitude']), 5),
+            'longitude': round(float(row['longitude']), 5),
+            'population': int(row['population']),
+        })
+    rows.sort(key=lambda row: -row['population'])
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with open(output_path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.DictWriter(file, fieldnames=['names', 'state', 'latitude', 'longitude', 'population'])
+        writer.writeheader()
+        writer.writerows(rows)
+    return len(rows)
+
+
+class LocationResolver:
+    """
+    Resolves free-text tender locations ("24103 Kiel", "Berlin - Köpenick") to a state and coordinates.
+
+    Place and state names are kept in tries over folded name tokens, so a location is scanned once,
+    token by token. The longest name wins, a state name over a place name of the same length
+    ("Sachsen" is the state, not Sachsen bei Ansbach). Names shared by several places (Neustadt,
+    Roth) resolve to the place in the state of the location's postal code, else of a state named in
+    it, else to the most populous one. Without a known place that state decides and the state
+    centre is used as coordinates.
+    """
+
+    def __init__(self, gazetteer_path=GAZETTEER_PATH):
+        self.trie = {}
+        self.state_trie = {}
+        with open(gazetteer_path, newline="", encoding="utf-8") as file:
+            for row in csv.DictReader(file):
+                place = {
+                    'place': row['names'].split("|")[0],
+                    'state': row['state'],
+                    'latitude': float(row['latitude']),
+                    'longitude': float(row['longitude']),
+                    'population': int(row['population']),
+                }
+                for name in row['names'].split("|"):
+                    self._add(self.trie, tokenize(name), place)
+
+        for state, names in STATE_NAMES.items():
+            state_entry = dict(STATE_COORDINATES[state], state=state, place=None)
+            for name in names:
+                # The city states' own place (Berlin, Hamburg, Bremen) is the more specific match
+                city = self._lookup(self.trie, tokenize(name))
+                if not any(place['place'] == name and place['state'] == state for place in city):
+                    self._add(self.state_trie, tokenize(name), state_entry)
+
+    @staticmethod
+    def _lookup(trie, tokens):
+        node = trie
+        for token in tokens:
+            node = node.get(token)
+            if node is None:
+                return []
+        return node.get(None, [])
+
+    @staticmethod
+    def _add(trie, tokens, place):
+        if not tokens:
+            return
+        node = trie
+        for token in tokens:
+            node = node.setdefault(token, {})
+        # The gazetteer is sorted by population, so the first candidate is the most populous
+        candidates = node.setdefault(None, [])
+        if all(candidate['state'] != place['state'] for candidate in candidates):
+            candidates.append(place)
+
+    @staticmethod
+    def _longest_matches(trie, tokens):
+        # Longest name starting at each token, as (start, end, candidates); names have few tokens
+        for start in range(len(tokens)):
+            node = trie
+            longest = None
+            for end in range(start, len(tokens)):
+                node = node.get(tokens[end])
+                if node is None:
+                    break
+                if None in node:
+                    longest = (start, end + 1, node[None])
+            if longest:
+                yield longest
+
+    def find_places(self, tokens):
+        """
+        Returns the place and state names found in `tokens` as (candidates, is_state) pairs, best
+        first: longest name, then state before place, then position. Names overlapping a better one
+        are dropped, so "Sachsen-Anhalt" does not also yield Sachsen nor "Baden-Württemberg" Baden.
+        """
+        matches = [
+            (start - end, not is_state, start, end, candidates, is_state)
+            for trie, is_state in ((self.state_trie, True), (self.trie, False))
+            for start, end, candidates in self._longest_matches(trie, tokens)
+        ]
+        matches.sort(key=lambda match: match[:3])
+        taken = set()
+        found = []
+        for _, _, start, end, candidates, is_state in matches:
+            span = set(range(start, end))
+            if span & taken:
+                continue
+            taken |= span
+            found.append((candidates, is_state))
+        return found
+
+    def resolve(self, location):
+        """
+        Returns {'state', 'latitude', 'longitude', 'place'} for a location string.
+        """
+        if not isinstance(location, str) or location in ("", "not specified"):
+            return UNRESOLVED
+        postal_code = POSTAL_CODE_PATTERN.search(location)
+        postal_state = postal_code_state(postal_code.group(1)) if postal_code else None
+
+        matches = self.find_places(tokenize(location))
+        state = postal_state or next((candidates[0]['state'] for candidates, is_state in matches if is_state), None)
+
+        for candidates, is_state in matches:
+            if is_state:
+                continue
+            place = next((candidate for candidate in candidates if candidate['state'] == state), None)
+            if place is None and state is None:
+                place = candidates[0]
+            if place is not None:
+                return {key: place[key] for key in ('state', 'latitude', 'longitude', 'place')}
+
+        if state:
+            return dict(STATE_COORDINATES[state], state=state, place=None)
+        return UNRESOLVED
+
+
+@lru_cache(maxsize=1)
+def get_resolver():
+    return LocationResolver()
+
+
+@lru_cache(maxsize=65536)
+def resolve_location(location):
+    # Portals repeat the same few locations, so whole strings are cached
+    return get_resolver().resolve(location)
+
+
+def get_state_from_location(location):
+    return resolve_location(location)['state']
+
+
+if __name__ == "__main__":
+    # python location_resolver.py cities500.txt rebuilds data/de_places.csv from a GeoNames dump
+    import sys
+
+    columns = ['geonameid', 'name', 'asciiname', 'alternatenames', 'latitude', 'longitude', 'feature_class',
+               'feature_code', 'countrycode', 'cc2', 'admin1code', 'admin2code', 'admin3code', 'admin4code',
+               'population']
+    with open(sys.argv[1], encoding="utf-8") as dump:
+        rows = (dict(zip(columns, line.rstrip("\n").split("\t"))) for line in dump)
+        rows = (dict(row, alternatenames=row['alternatenames'].split(",") if row['alternatenames'] else []) for row in rows)
+        print(f"Wrote {build_gazetteer(rows)} places to {GAZETTEER_PATH}")
@@ -0,0 +1,112 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+from sqlite_utils import open_database
+
+# Parsed pages kept on disk; the least recently used beyond this are evicted
+MAX_PAGES = 5000
+
+# Part of every page key: bump it when a result page parser changes what it returns, so pages
+# parsed by the previous version are parsed again
+PARSER_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    page_key TEXT PRIMARY KEY,
+    html_hash TEXT NOT NULL,
+    parsed TEXT NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_pages_last_used ON pages (last_used);
+"""
+
+_cache_stats = {}
+_cache_stats_lock = threading.Lock()
+
+
+def reset_page_cache_stats():
+    with _cache_stats_lock:
+        _cache_stats.clear()
+
+
+def report_page_cache_stats():
+    with _cache_stats_lock:
+        stats = {name: dict(counts) for name, counts in _cache_stats.items()}
+    if not stats:
+        return
+    print("Page cache per portal:")
+    for name, counts in sorted(stats.items()):
+        print(f"  {name}: {counts['hits']} hits, {counts['misses']} misses")
+
+
+def count_lookup(name, hit):
+    with _cache_stats_lock:
+        counts = _cache_stats.setdefault(name, {'hits': 0, 'misses': 0})
+        counts['hits' if hit else 'misses'] += 1
+
+
+class PageCache:
+    """
+    On-disk cache of parsed result pages, keyed by portal + query + page number, the parser
+    version and a hash of the other inputs the parser filters by (such as the keyword list).
+
+    Each entry holds the SHA-1 of the page's HTML and what the parser returned for it (anything
+    JSON serializable). When a page comes back byte-identical, the stored result is returned and
+    the page is not parsed again. Entries beyond `max_pages` are evicted least recently used first.
+    """
+
+    def __init__(self, path, max_pages=MAX_PAGES):
+        self.path = path
+        self.max_pages = max_pages
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self.connect() as connection:
+            connection.executescript(SCHEMA)
+
+    def connect(self):
+        return open_database(self.path)
+
+    def parse(self, portal, query, page, html, parse, inputs=None):
+        """
+        Returns `parse(html)` for the given page, from the cache if the page's HTML is unchanged.
+        `inputs` (JSON serializable) is whatever else the result depends on, e.g. the keywords
+        `parse` filters by. Cached results come back as decoded JSON: fresh objects, with tuples
+        turned into lists.
+        """
+        inputs_hash = hashlib.sha1(json.dumps(inputs).encode('utf-8')).hexdigest()
+        page_key = json.dumps([PARSER_VERSION, portal, query, page, inputs_hash])
+        html_hash = hashlib.sha1(html.encode('utf-8')).hexdigest()
+        with self.connect() as connection:
+            row = connection.execute("SELECT html_hash, parsed FROM pages WHERE page_key = ?", (page_key,)).fetchone()
+            if row is not None and row[0] == html_hash:
+                connection.execute("UPDATE pages SET last_used = ? WHERE page_key = ?", (time.time(), page_key))
+                count_lookup(portal, hit=True)
+                return json.loads(row[1])
+
+        count_lookup(portal, hit=False)
+        result = parse(html)
+        # Serialized before the caller gets to modify the parsed objects
+        parsed = json.dumps(result)
+        with self.connect() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO pages (page_key, html_hash, parsed, last_used) VALUES (?, ?, ?, ?)",
+                (page_key, html_hash, parsed, time.time()),
+            )
+            connection.execute(
+                "DELETE FROM pages WHERE page_key IN (SELECT page_key FROM pages ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_pages,),
+            )
+        return result
+
+    def __len__(self):
+        with self.connect() as connection:
+            return connection.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+
+
+def parse_page(page_cache, portal, query, page, html, parse, inputs=None):
+    # Parses without caching when no page cache is configured
+    if page_cache is None:
+        return parse(html)
+    return page_cache.parse(portal, query, page, html, parse, inputs)
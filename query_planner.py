@@ -0,0 +1,153 @@
+import math
+import re
+import threading
+
+from selenium.common.exceptions import TimeoutException
+
+from html_parsing import parse_html
+from vmp_engine import (
+    get_page_loads, host_session_slot, open_portal, parse_results_document,
+    scrape_vmp_portal, scrape_vmp_portal_parallel, submit_search, wait_for_results,
+)
+
+_query_plans = {}
+_query_plans_lock = threading.Lock()
+
+
+def build_or_queries(keywords, or_operator, max_query_length):
+    """
+    Joins the keywords into as few OR queries as fit into the portal's search box.
+    """
+    queries = []
+    current = []
+    for keyword in keywords:
+        candidate = or_operator.join(current + [keyword])
+        if current and len(candidate) > max_query_length:
+            queries.append(or_operator.join(current))
+            current = [keyword]
+        else:
+            current.append(keyword)
+    if current:
+        queries.append(or_operator.join(current))
+    return queries
+
+
+def estimate_page_count(html, portal):
+    """
+    Estimates how many result pages the current search has from the portal's result count text.
+    Returns None if that can't be told: on portals without pagination (only the first page of a
+    search is read, so a broad search would lose tenders), when the search found nothing (an
+    empty list-all search must not look like the cheapest plan), and for result lists of several
+    pages without a result count. Page links are not used: paginators only show a window of page
+    numbers, which would underestimate long result lists.
+    """
+    if not portal['paginate']:
+        return None
+    # The count text and page links may lie outside the results subtree, so parse the whole page
+    document = parse_html(html)
+    tenders, next_url = parse_results_document(document, portal)
+    if not tenders:
+        return None
+
+    if portal['result_count_pattern']:
+        match = re.search(portal['result_count_pattern'], " ".join(document.itertext()))
+        if match:
+            return max(math.ceil(int(match.group(1)) / len(tenders)), 1)
+    if next_url is None:
+        return 1
+    return None
+
+
+def probe_query(browser, portal, query):
+    # Runs the query once and reads the size of its result list from the first page
+    try:
+        previous_results = submit_search(browser, portal, query)
+        wait_for_results(browser, portal, previous_results)
+    except TimeoutException:
+        return None
+    return estimate_page_count(browser.page_source, portal)
+
+
+def plan_portal_queries(browser, portal, keywords):
+    """
+    Picks the search strategy with the fewest page loads for a portal that is already open:
+
+    - per_keyword: one search per keyword, at least one page load each
+    - or_query: the keywords combined into OR queries (only if the portal has an `or_operator`)
+    - list_all: an empty search listing every tender, filtered locally
+
+    The alternatives are probed with one search each. Their result pages are counted and compared
+    with the per-keyword lower bound. A strategy whose size can't be read is never picked.
+    """
+    per_keyword_loads = len(keywords)
+    candidates = {}
+
+    if portal['or_operator']:
+        queries = build_or_queries(keywords, portal['or_operator'], portal['max_query_length'])
+        pages = [probe_query(browser, portal, query) for query in queries]
+        if None not in pages:
+            candidates['or_query'] = (queries, sum(pages))
+
+    pages = probe_query(browser, portal, "")
+    if pages is not None:
+        candidates['list_all'] = ([""], pages)
+
+    plan = {'strategy': 'per_keyword', 'queries': None, 'estimated_loads': per_keyword_loads,
+            'per_keyword_loads': per_keyword_loads}
+    for strategy, (queries, loads) in candidates.items():
+        if loads < plan['estimated_loads']:
+            plan.update(strategy=strategy, queries=queries, estimated_loads=loads)
+
+    print(f"Query plan for {portal['name']}: {plan['strategy']} (about {plan['estimated_loads']} page loads, "
+          f"per-keyword search needs at least {per_keyword_loads}).")
+    return plan
+
+
+def scrape_vmp_portal_planned(pool, portal, keywords):
+    """
+    Plans the cheapest search strategy for a portal and runs it, yielding the tenders as they are
+    parsed. Per-keyword plans are sharded across browser sessions as configured, combined queries
+    run in the planning session.
+    """
+    if not portal['query_planning']:
+        yield from scrape_vmp_portal_parallel(pool, portal, keywords)
+        return
+
+    loads_before = get_page_loads(portal['source_url'])
+    with host_session_slot(portal):
+        with pool.browser() as browser:
+            try:
+                open_portal(browser, portal)
+                plan = plan_portal_queries(browser, portal, keywords)
+            except Exception as e:
+                print(f"Query planning failed for {portal['name']}, searching per keyword: {e}")
+                plan = {'strategy': 'per_keyword', 'queries': None, 'estimated_loads': len(keywords),
+                        'per_keyword_loads': len(keywords)}
+            if plan['strategy'] != 'per_keyword':
+                yield from scrape_vmp_portal(browser, portal, keywords, queries=plan['queries'])
+    if plan['strategy'] == 'per_keyword':
+        yield from scrape_vmp_portal_parallel(pool, portal, keywords)
+
+    plan['actual_loads'] = get_page_loads(portal['source_url']) - loads_before
+    with _query_plans_lock:
+        _query_plans[portal['source_url']] = dict(plan, name=portal['name'])
+
+
+def reset_query_plans():
+    with _query_plans_lock:
+        _query_plans.clear()
+
+
+def report_query_plans():
+    with _query_plans_lock:
+        plans = list(_query_plans.values())
+    if not plans:
+        return
+    print("Query plans per portal:")
+    total_saved = 0
+    for plan in plans:
+        # Per-keyword search needs at least one page load per keyword plus opening the portal
+        saved = max(plan['per_keyword_loads'] + 1 - plan['actual_loads'], 0) if plan['strategy'] != 'per_keyword' else 0
+        total_saved += saved
+        print(f"  {plan['name']}: {plan['strategy']}, {plan['actual_loads']} page loads, at least {saved} saved")
+    print(f"Page loads saved by query planning this run: at least {total_saved}")
@@ -0,0 +1,180 @@
+import datetime
+import os
+import sqlite3
+import subprocess
+import sys
+import traceback
+
+import pandas as pd
+import psutil
+
+from sqlite_utils import open_database
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scrape_jobs (
+    job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    status TEXT NOT NULL,
+    incremental INTEGER NOT NULL,
+    pid INTEGER,
+    started_at TEXT NOT NULL,
+    finished_at TEXT,
+    tenders INTEGER,
+    error TEXT
+);
+
+CREATE TABLE IF NOT EXISTS scrape_job_portals (
+    job_id INTEGER NOT NULL REFERENCES scrape_jobs (job_id),
+    portal TEXT NOT NULL,
+    status TEXT NOT NULL,
+    tenders INTEGER NOT NULL DEFAULT 0,
+    seconds REAL,
+    PRIMARY KEY (job_id, portal)
+);
+"""
+
+
+def now():
+    return datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def worker_alive(pid):
+    # A worker that died is a zombie until its parent (the dashboard process) reaps it
+    try:
+        return psutil.Process(pid).status() != psutil.STATUS_ZOMBIE
+    except psutil.NoSuchProcess:
+        return False
+
+
+class ScrapeJobRegistry:
+    """
+    Registry of background scrape jobs, shared by every dashboard session and process through SQLite.
+
+    `start` launches scrape_all in a separate worker process unless a job is already running, so
+    concurrent refreshes join the running job instead of starting a second full scrape. The worker
+    reports per-portal progress here while the dashboard keeps serving the current snapshot; the
+    new snapshot replaces the old one atomically when the job completes.
+    Jobs are 'running', 'done' or 'failed'; a running job whose worker process died is marked failed.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self.connect() as connection:
+            connection.executescript(SCHEMA)
+
+    def connect(self):
+        return open_database(self.path)
+
+    def _running_job(self, connection):
+        row = connection.execute("SELECT job_id, pid FROM scrape_jobs WHERE status = 'running'").fetchone()
+        if row is None:
+            return None
+        job_id, pid = row
+        # No pid yet means the worker is being launched
+        if pid is not None and not worker_alive(pid):
+            connection.execute(
+                "UPDATE scrape_jobs SET status = 'failed', finished_at = ?, error = ? WHERE job_id = ?",
+                (now(), "The scrape worker exited unexpectedly", job_id),
+            )
+            return None
+        return job_id
+
+    def start(self, incremental=False):
+        """
+        Starts a scrape job in a background process, unless one is already running.
+        Returns (job_id, started), where job_id is the running job's id when started is False.
+        """
+        with self.connect() as connection:
+            # Takes the write lock, so two sessions cannot both find no running job and start one
+            connection.execute("BEGIN IMMEDIATE")
+            job_id = self._running_job(connection)
+            if job_id is not None:
+                return job_id, False
+            job_id = connection.execute(
+                "INSERT INTO scrape_jobs (status, incremental, started_at) VALUES ('running', ?, ?)",
+                (int(incremental), now()),
+            ).lastrowid
+
+        log_path = os.path.join(os.path.dirname(self.path) or ".", f"scrape_job_{job_id}.log")
+        try:
+            with open(log_path, "w") as log:
+                # Own session, so the scrape outlives the dashboard script run that started it
+                process = subprocess.Popen(
+                    [sys.executable, os.path.abspath(__file__), self.path, str(job_id)],
+                    stdout=log, stderr=subprocess.STDOUT, start_new_session=True,
+                )
+        except OSError as exc:
+            self.finish(job_id, 'failed', error=str(exc))
+            raise
+        with self.connect() as connection:
+            connection.execute("UPDATE scrape_jobs SET pid = ? WHERE job_id = ?", (process.pid, job_id))
+        return job_id, True
+
+    def latest_job(self):
+        """
+        Returns the most recent job as a dict (None if there never was one).
+        """
+        with self.connect() as connection:
+            self._running_job(connection)
+            connection.row_factory = sqlite3.Row
+            row = connection.execute("SELECT * FROM scrape_jobs ORDER BY job_id DESC LIMIT 1").fetchone()
+        return dict(row) if row else None
+
+    def portal_progress(self, job_id):
+        """
+        Returns one row per portal of a job with its status, tenders found, seconds since the job
+        started when the portal finished, and throughput in tenders per second.
+        """
+        with self.connect() as connection:
+            df = pd.read_sql_query(
+                "SELECT portal, status, tenders, seconds FROM scrape_job_portals WHERE job_id = ? ORDER BY portal",
+                connection, params=(job_id,),
+            )
+        df['tenders_per_second'] = (df['tenders'] / df['seconds']).round(2)
+        return df
+
+    def report_progress(self, job_id, portal, status, tenders=0):
+        # Called by the worker through scrape_all's progress callback
+        with self.connect() as connection:
+            started_at = connection.execute("SELECT started_at FROM scrape_jobs WHERE job_id = ?", (job_id,)).fetchone()[0]
+            seconds = None
+            if status != 'running':
+                seconds = (datetime.datetime.now() - datetime.datetime.strptime(started_at, "%Y-%m-%d %H:%M:%S")).total_seconds()
+            connection.execute(
+                """
+                INSERT INTO scrape_job_portals (job_id, portal, status, tenders, seconds) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (job_id, portal) DO UPDATE SET
+                    status = excluded.status, tenders = excluded.tenders, seconds = excluded.seconds
+                """,
+                (job_id, portal, status, tenders, seconds),
+            )
+
+    def finish(self, job_id, status, tenders=None, error=None):
+        with self.connect() as connection:
+            connection.execute(
+                "UPDATE scrape_jobs SET status = ?, finished_at = ?, tenders = ?, error = ? WHERE job_id = ?",
+                (status, now(), tenders, error, job_id),
+            )
+
+    def run(self, job_id):
+        """
+        Runs a job in the current process: the body of the worker started by `start`.
+        """
+        from capstone_scraping_script import scrape_all
+
+        with self.connect() as connection:
+            incremental = bool(connection.execute("SELECT incremental FROM scrape_jobs WHERE job_id = ?", (job_id,)).fetchone()[0])
+        try:
+            df = scrape_all(
+                incremental=incremental,
+                progress=lambda portal, status, tenders=0: self.report_progress(job_id, portal, status, tenders),
+            )
+        except BaseException:
+            self.finish(job_id, 'failed', error=traceback.format_exc(limit=5))
+            raise
+        self.finish(job_id, 'done', tenders=len(df))
+
+
+if __name__ == "__main__":
+    # Worker entry point: python scrape_jobs.py <registry path> <job id>
+    ScrapeJobRegistry(sys.argv[1]).run(int(sys.argv[2]))
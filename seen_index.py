@@ -0,0 +1,69 @@
+import threading
+
+
+def tender_keys(tender, source_url=None):
+    # A tender is identified by its portal plus its code where the portal has one, else its name
+    source_url = source_url or tender.get('source_url')
+    keys = []
+    if tender.get('tender_code') and tender['tender_code'] != "not specified":
+        keys.append((source_url, 'code', tender['tender_code']))
+    if tender.get('tender_name'):
+        keys.append((source_url, 'name', tender['tender_name']))
+    return keys
+
+
+class SeenTenderIndex:
+    """
+    Tenders seen in earlier runs, mapped to the date_published they had then.
+
+    Used by incremental scraping: once a full result page consists of known tenders with an
+    unchanged date_published, the remaining (older) pages of that search are skipped.
+    """
+
+    def __init__(self):
+        self.entries = {}
+        self.pages_skipped = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add(self, tender, source_url=None):
+        for key in tender_keys(tender, source_url):
+            self.entries[key] = tender.get('date_published', "not specified")
+
+    def is_known(self, tender, source_url=None):
+        date_published = tender.get('date_published', "not specified")
+        return any(self.entries.get(key) == date_published for key in tender_keys(tender, source_url))
+
+    def page_is_known(self, tenders, source_url=None):
+        return bool(tenders) and all(self.is_known(tender, source_url) for tender in tenders)
+
+    def should_stop(self, tenders, source_url, label):
+        # Called once per result page, returns True when paginating further only yields known tenders
+        if not self.page_is_known(tenders, source_url):
+            return False
+        with self._lock:
+            self.pages_skipped += 1
+        print(f"Page for {label} only lists known tenders, skipping the remaining pages.")
+        return True
+
+    @classmethod
+    def from_frame(cls, df):
+        index = cls()
+        columns = [column for column in ('source_url', 'tender_code', 'tender_name', 'date_published') if column in df.columns]
+        for tender in df[columns].astype(str).to_dict('records'):
+            index.add(tender)
+        return index
+
+    @classmethod
+    def from_store(cls, store):
+        """
+        Builds the index from every tender in the tender store.
+        """
+        df = store.load_tenders()
+        # The scrapers report date_published as dd.mm.yy, the store returns Timestamps
+        df['date_published'] = df['date_published'].dt.strftime('%d.%m.%y').fillna("not specified")
+        index = cls.from_frame(df)
+        print(f"Incremental mode: {len(index)} known tender keys loaded from {store.path}")
+        return index
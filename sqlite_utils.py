@@ -0,0 +1,17 @@
+import sqlite3
+from contextlib import contextmanager
+
+
+@contextmanager
+def open_database(path):
+    """
+    Opens the SQLite database at `path` in WAL mode, which lets readers (the dashboard) run while
+    a scrape is writing. Commits on success, rolls back on error and always closes the connection.
+    """
+    connection = sqlite3.connect(path, timeout=30)
+    try:
+        connection.execute("PRAGMA journal_mode=WAL")
+        with connection:
+            yield connection
+    finally:
+        connection.close()
@@ -0,0 +1,57 @@
+from io import BytesIO
+
+import xlsxwriter
+
+
+def flatten_for_export(df):
+    # Keyword lists and categoricals become plain text columns, as in the former CSV snapshots
+    df = df.copy()
+    if 'found_keywords' in df.columns:
+        df['found_keywords'] = df['found_keywords'].map(lambda keywords: ', '.join(keywords) if len(keywords) else "")
+    for column in df.select_dtypes('category').columns:
+        df[column] = df[column].astype(object)
+    return df
+
+
+def to_excel(df):
+    """
+    Serializes the tenders to XLSX. xlsxwriter's constant_memory mode flushes every row to a temp
+    file once it is complete, so memory stays flat however many rows are exported. Rows must then
+    be written strictly in order, which pandas' to_excel (column by column) does not do.
+    """
+    df = flatten_for_export(df)
+    output = BytesIO()
+    workbook = xlsxwriter.Workbook(output, {
+        'constant_memory': True,
+        'default_date_format': 'dd.mm.yy',
+        # Scraped text is data: no hyperlinks (Excel allows 65,530 per sheet) and no formulas
+        'strings_to_urls': False,
+        'strings_to_formulas': False,
+    })
+    worksheet = workbook.add_worksheet('Sheet1')
+    worksheet.write_row(0, 0, list(df.columns), workbook.add_format({'bold': True}))
+    # NaN/NaT become empty cells
+    values = df.astype(object).where(df.notna(), None)
+    for row_number, row in enumerate(values.itertuples(index=False, name=None), start=1):
+        worksheet.write_row(row_number, 0, row)
+    workbook.close()
+    return output.getvalue()
+
+
+def to_csv(df):
+    return flatten_for_export(df).to_csv(index=False, date_format='%d.%m.%y').encode('utf-8')
+
+
+def to_parquet(df):
+    # Keeps the typed columns (datetime64, categories, keyword lists) as they are
+    output = BytesIO()
+    df.to_parquet(output, index=False)
+    return output.getvalue()
+
+
+# Label -> (serializer, file name, MIME type) for the dashboard's download button
+EXPORT_FORMATS = {
+    'Excel': (to_excel, 'filtered_tenders.xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+    'CSV': (to_csv, 'filtered_tenders.csv', 'text/csv'),
+    'Parquet': (to_parquet, 'filtered_tenders.parquet', 'application/vnd.apache.parquet'),
+}
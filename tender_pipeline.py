@@ -0,0 +1,155 @@
+import queue
+import threading
+import time
+
+import pandas as pd
+
+from date_utils import parse_date
+from location_resolver import get_state_from_location
+from tender_store import TENDER_COLUMNS
+
+# Records upserted per store transaction, or fewer once the oldest has waited FLUSH_SECONDS
+BATCH_SIZE = 50
+FLUSH_SECONDS = 5
+# Bounds the tenders parsed but not yet consumed; portal threads wait when it is full
+QUEUE_SIZE = 1000
+
+_DONE = object()
+
+
+def merge_streams(streams, on_done=None):
+    """
+    Iterates every {name: iterable} of `streams` in its own thread and yields (name, item) pairs in
+    the order items arrive. `on_done(name, count, error)` is called as each stream ends; an error
+    ends only its own stream, the items it yielded before are kept.
+    """
+    items = queue.Queue(maxsize=QUEUE_SIZE)
+    stop = threading.Event()
+
+    def put(entry):
+        # Gives up once the consumer has gone away, instead of blocking on a full queue forever
+        while not stop.is_set():
+            try:
+                items.put(entry, timeout=0.5)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce(name, stream):
+        count = 0
+        error = None
+        try:
+            for item in stream:
+                if not put((name, item)):
+                    return
+                count += 1
+        except Exception as exc:
+            error = exc
+        put((name, _DONE, count, error))
+
+    threads = [threading.Thread(target=produce, args=(name, stream), daemon=True) for name, stream in streams.items()]
+    for thread in threads:
+        thread.start()
+    try:
+        running = len(threads)
+        while running:
+            entry = items.get()
+            if entry[1] is not _DONE:
+                yield entry
+                continue
+            running -= 1
+            if on_done is not None:
+                name, _, count, error = entry
+                on_done(name, count, error)
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+
+def normalize_tenders(tenders, location_defaults):
+    """
+    Completes each tender the way the consolidated CSV rows used to be: state from the location or
+    else the portal's default, application_start_date falling back to date_published, missing
+    fields "not specified". Tenders without a usable application_start_date are dropped.
+    """
+    for tender in tenders:
+        if tender.get('state', "not specified") == "not specified":
+            tender['state'] = get_state_from_location(tender.get('tender_location', "not specified"))
+        if tender['state'] == "not specified":
+            tender['state'] = location_defaults.get(tender['source_url'], "not specified")
+        if tender.get('application_start_date', "not specified") == "not specified":
+            tender['application_start_date'] = tender.get('date_published', "not specified")
+        for column in TENDER_COLUMNS:
+            if pd.isna(tender.get(column)):
+                tender[column] = "not specified"
+        if parse_date(str(tender['application_start_date'])) is None:
+            continue
+        yield tender
+
+
+class TenderDeduplicator:
+    """
+    Consolidates tenders by name across portals while they stream past: the first record of a
+    name is kept, later ones only contribute their keywords to it (the store merges keywords on
+    upsert). Only the names seen so far are held in memory.
+    """
+
+    def __init__(self):
+        self.first_source = {}
+
+    def __call__(self, tenders):
+        for tender in tenders:
+            name = tender['tender_name']
+            if name not in self.first_source:
+                self.first_source[name] = tender['source_url']
+                yield tender
+            else:
+                # Every other field is "not specified", which the store's upsert never writes over
+                yield {'tender_name': name, 'source_url': self.first_source[name], 'found_keywords': tender['found_keywords']}
+
+    def __len__(self):
+        return len(self.first_source)
+
+
+def write_to_store(tenders, store, batch_size=BATCH_SIZE, on_batch=None):
+    """
+    Upserts the tenders into `store` in small batches, each in its own transaction, so everything
+    before a crash is kept. `on_batch(written)` is called after each batch with the running total.
+    Returns the number of records written.
+    """
+    written = 0
+    batch = []
+    batch_started = None
+
+    def flush():
+        nonlocal written
+        written += store.upsert_frame(pd.DataFrame(batch, columns=TENDER_COLUMNS).fillna("not specified"))
+        batch.clear()
+        if on_batch is not None:
+            on_batch(written)
+
+    for tender in tenders:
+        if not batch:
+            batch_started = time.monotonic()
+        batch.append(tender)
+        if len(batch) >= batch_size or time.monotonic() - batch_started >= FLUSH_SECONDS:
+            flush()
+    if batch:
+        flush()
+    return written
+
+
+def throttle(function, seconds):
+    """
+    Wraps `function` so that it runs at most once every `seconds`; skipped calls are dropped.
+    """
+    last_call = [float('-inf')]
+
+    def throttled(*args, **kwargs):
+        if time.monotonic() - last_call[0] >= seconds:
+            last_call[0] = time.monotonic()
+            function(*args, **kwargs)
+
+    return throttled
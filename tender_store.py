@@ -0,0 +1,406 @@
+import datetime
+import glob
+import os
+import re
+
+import pandas as pd
+
+from date_utils import normalize_dates
+from location_resolver import get_state_from_location
+from sqlite_utils import open_database
+
+# Columns of a tender as written by scrape_all, in display order
+TENDER_COLUMNS = [
+    'tender_name',
+    'tender_authority',
+    'application_start_date',
+    'tender_deadline',
+    'period',
+    'tender_location',
+    'date_published',
+    'tender_type',
+    'source_url',
+    'found_keywords',
+    'state',
+]
+DATE_COLUMNS = ['application_start_date', 'tender_deadline', 'date_published']
+# Low-cardinality text columns stored as categoricals in the typed snapshot
+CATEGORY_COLUMNS = ['state', 'source_url', 'tender_type']
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tenders (
+    tender_key TEXT PRIMARY KEY,
+    tender_name TEXT NOT NULL,
+    tender_authority TEXT,
+    application_start_date TEXT,
+    tender_deadline TEXT,
+    period TEXT,
+    tender_location TEXT,
+    date_published TEXT,
+    tender_type TEXT,
+    source_url TEXT,
+    found_keywords TEXT,
+    state TEXT,
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_tenders_state ON tenders (state);
+CREATE INDEX IF NOT EXISTS idx_tenders_source_url ON tenders (source_url);
+CREATE INDEX IF NOT EXISTS idx_tenders_date_published ON tenders (date_published);
+CREATE INDEX IF NOT EXISTS idx_tenders_tender_deadline ON tenders (tender_deadline);
+CREATE INDEX IF NOT EXISTS idx_tenders_application_start_date ON tenders (application_start_date);
+CREATE INDEX IF NOT EXISTS idx_tenders_last_seen ON tenders (last_seen);
+
+CREATE TABLE IF NOT EXISTS tender_keywords (
+    tender_key TEXT NOT NULL REFERENCES tenders (tender_key),
+    keyword TEXT NOT NULL,
+    PRIMARY KEY (tender_key, keyword)
+);
+CREATE INDEX IF NOT EXISTS idx_tender_keywords_keyword ON tender_keywords (keyword);
+
+CREATE TABLE IF NOT EXISTS imported_files (
+    path TEXT PRIMARY KEY,
+    imported_at TEXT NOT NULL
+);
+"""
+
+# Pre-aggregated statistics for the dashboard, kept up to date by triggers on every write. Like the
+# dashboard, they only count tenders with at least one known date. Published dates are summed as
+# Julian days so the average published period can be taken relative to any day.
+STATISTICS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS stats_state (
+    state TEXT PRIMARY KEY,
+    tenders INTEGER NOT NULL,
+    application_days REAL NOT NULL,
+    application_tenders INTEGER NOT NULL,
+    published_julian_days REAL NOT NULL,
+    published_tenders INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS stats_keyword_state (
+    keyword TEXT NOT NULL,
+    state TEXT NOT NULL,
+    tenders INTEGER NOT NULL,
+    PRIMARY KEY (keyword, state)
+);
+
+CREATE TABLE IF NOT EXISTS stats_published_day (
+    day TEXT PRIMARY KEY,
+    tenders INTEGER NOT NULL
+);
+
+CREATE TRIGGER IF NOT EXISTS stats_tender_insert AFTER INSERT ON tenders BEGIN
+{insert_new}
+END;
+
+CREATE TRIGGER IF NOT EXISTS stats_tender_update
+AFTER UPDATE OF state, application_start_date, tender_deadline, date_published ON tenders
+WHEN OLD.state IS NOT NEW.state
+    OR OLD.application_start_date IS NOT NEW.application_start_date
+    OR OLD.tender_deadline IS NOT NEW.tender_deadline
+    OR OLD.date_published IS NOT NEW.date_published
+BEGIN
+{delete_old}
+{insert_new}
+END;
+
+CREATE TRIGGER IF NOT EXISTS stats_tender_delete AFTER DELETE ON tenders BEGIN
+{delete_old}
+END;
+
+CREATE TRIGGER IF NOT EXISTS stats_keyword_insert AFTER INSERT ON tender_keywords BEGIN
+{keyword_insert}
+END;
+
+CREATE TRIGGER IF NOT EXISTS stats_keyword_delete AFTER DELETE ON tender_keywords BEGIN
+{keyword_delete}
+END;
+"""
+
+COUNTED_TENDER = "COALESCE({row}.application_start_date, {row}.tender_deadline, {row}.date_published) IS NOT NULL"
+
+TENDER_STATISTICS_DELTA = """
+INSERT INTO stats_state (state, tenders, application_days, application_tenders, published_julian_days, published_tenders)
+SELECT {row}.state,
+    {sign},
+    {sign} * COALESCE(julianday({row}.tender_deadline) - julianday({row}.application_start_date), 0),
+    {sign} * ({row}.tender_deadline IS NOT NULL AND {row}.application_start_date IS NOT NULL),
+    {sign} * COALESCE(julianday({row}.date_published), 0),
+    {sign} * ({row}.date_published IS NOT NULL)
+WHERE {row}.state IS NOT NULL AND {counted}
+ON CONFLICT (state) DO UPDATE SET
+    tenders = tenders + excluded.tenders,
+    application_days = application_days + excluded.application_days,
+    application_tenders = application_tenders + excluded.application_tenders,
+    published_julian_days = published_julian_days + excluded.published_julian_days,
+    published_tenders = published_tenders + excluded.published_tenders;
+INSERT INTO stats_published_day (day, tenders)
+SELECT {row}.date_published, {sign} WHERE {row}.date_published IS NOT NULL
+ON CONFLICT (day) DO UPDATE SET tenders = tenders + excluded.tenders;
+INSERT INTO stats_keyword_state (keyword, state, tenders)
+SELECT keyword, {row}.state, {sign} FROM tender_keywords
+WHERE tender_key = {row}.tender_key AND {row}.state IS NOT NULL AND {counted}
+ON CONFLICT (keyword, state) DO UPDATE SET tenders = tenders + excluded.tenders;
+"""
+
+KEYWORD_STATISTICS_DELTA = """
+INSERT INTO stats_keyword_state (keyword, state, tenders)
+SELECT {row}.keyword, state, {sign} FROM tenders
+WHERE tender_key = {row}.tender_key AND state IS NOT NULL AND {counted}
+ON CONFLICT (keyword, state) DO UPDATE SET tenders = tenders + excluded.tenders;
+"""
+
+
+def statistics_delta(template, row, sign, counted_row=None):
+    # Adds (sign 1) or removes (sign -1) the contribution of the trigger's NEW or OLD row
+    return template.format(row=row, sign=sign, counted=COUNTED_TENDER.format(row=counted_row or row))
+
+
+STATISTICS_SCHEMA = STATISTICS_SCHEMA.format(
+    insert_new=statistics_delta(TENDER_STATISTICS_DELTA, 'NEW', 1),
+    delete_old=statistics_delta(TENDER_STATISTICS_DELTA, 'OLD', -1),
+    keyword_insert=statistics_delta(KEYWORD_STATISTICS_DELTA, 'NEW', 1, counted_row='tenders'),
+    keyword_delete=statistics_delta(KEYWORD_STATISTICS_DELTA, 'OLD', -1, counted_row='tenders'),
+)
+
+# Recomputes the statistics tables from scratch, for stores created before they existed
+REBUILD_STATISTICS = f"""
+DELETE FROM stats_state;
+DELETE FROM stats_keyword_state;
+DELETE FROM stats_published_day;
+INSERT INTO stats_state (state, tenders, application_days, application_tenders, published_julian_days, published_tenders)
+SELECT state,
+    COUNT(*),
+    COALESCE(SUM(julianday(tender_deadline) - julianday(application_start_date)), 0),
+    COUNT(julianday(tender_deadline) - julianday(application_start_date)),
+    COALESCE(SUM(julianday(date_published)), 0),
+    COUNT(date_published)
+FROM tenders WHERE state IS NOT NULL AND {COUNTED_TENDER.format(row='tenders')}
+GROUP BY state;
+INSERT INTO stats_published_day (day, tenders)
+SELECT date_published, COUNT(*) FROM tenders WHERE date_published IS NOT NULL GROUP BY date_published;
+INSERT INTO stats_keyword_state (keyword, state, tenders)
+SELECT keyword, state, COUNT(*) FROM tender_keywords JOIN tenders USING (tender_key)
+WHERE state IS NOT NULL AND {COUNTED_TENDER.format(row='tenders')}
+GROUP BY keyword, state;
+"""
+
+UPSERT_TENDER = """
+INSERT INTO tenders (tender_key, {columns}, first_seen, last_seen)
+VALUES (:tender_key, {placeholders}, :seen_at, :seen_at)
+ON CONFLICT (tender_key) DO UPDATE SET
+    {updates},
+    first_seen = MIN(first_seen, excluded.first_seen),
+    last_seen = MAX(last_seen, excluded.last_seen)
+"""
+
+# Keep the stored value when a later scrape only knows "not specified" for a field
+UPSERT_TENDER = UPSERT_TENDER.format(
+    columns=', '.join(column for column in TENDER_COLUMNS if column != 'found_keywords'),
+    placeholders=', '.join(f":{column}" for column in TENDER_COLUMNS if column != 'found_keywords'),
+    updates=',\n    '.join(
+        f"{column} = CASE WHEN excluded.{column} IS NULL OR excluded.{column} = 'not specified' "
+        f"THEN {column} ELSE excluded.{column} END"
+        for column in TENDER_COLUMNS if column not in ('tender_name', 'source_url', 'found_keywords')
+    ),
+)
+
+REFRESH_FOUND_KEYWORDS = """
+UPDATE tenders SET found_keywords = (
+    SELECT group_concat(keyword, ', ') FROM tender_keywords WHERE tender_keywords.tender_key = tenders.tender_key
+)
+WHERE tender_key = ?
+"""
+
+
+def make_tender_key(source_url, tender_name):
+    # Tenders are consolidated by name within a portal, like in scrape_all
+    return f"{source_url}|{tender_name}"
+
+
+def to_iso_dates(series):
+    """
+    Converts dd.mm.yy strings, ISO strings and Timestamps to sortable YYYY-MM-DD strings (None if unknown).
+    """
+    dates = normalize_dates(series)
+    return dates.dt.strftime('%Y-%m-%d').astype(object).where(dates.notna(), None)
+
+
+def split_keywords(value):
+    if isinstance(value, list):
+        return value
+    if not isinstance(value, str) or value in ('', "not specified"):
+        return []
+    return value.split(', ')
+
+
+def to_typed_frame(df):
+    """
+    Returns a copy of a tender DataFrame with datetime64 date columns, categorical state/source_url/
+    tender_type and found_keywords as a list of keywords, ready to be written to Parquet.
+    """
+    df = df.copy()
+    for column in DATE_COLUMNS:
+        df[column] = normalize_dates(df[column])
+    text_columns = [column for column in TENDER_COLUMNS if column not in DATE_COLUMNS + ['found_keywords']]
+    df[text_columns] = df[text_columns].astype(object).fillna("not specified")
+    for column in CATEGORY_COLUMNS:
+        df[column] = df[column].astype('category')
+    df['found_keywords'] = df['found_keywords'].map(split_keywords)
+    return df
+
+
+def write_typed_snapshot(df, path):
+    """
+    Writes the tenders as a typed Parquet file that the dashboard loads without any parsing.
+    The file is replaced atomically so a running dashboard never reads half of it.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    temporary_path = f"{path}.tmp"
+    to_typed_frame(df).to_parquet(temporary_path, index=False)
+    os.replace(temporary_path, path)
+
+
+def read_typed_snapshot(path):
+    # Dtypes (datetime64, categories) come straight from the Parquet schema
+    df = pd.read_parquet(path)
+    # pyarrow returns list columns as numpy arrays, which are not JSON serializable (pydeck)
+    df['found_keywords'] = df['found_keywords'].map(list)
+    return df
+
+
+class TenderStore:
+    """
+    Persistent SQLite store of all tenders ever scraped.
+
+    Tenders are upserted by source_url + tender_name: fields are refreshed, keywords are merged and
+    first_seen/last_seen track when a tender appeared and when it was last listed. Dates are stored
+    as ISO strings so that the indexed date columns can be range-queried.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self.connect() as connection:
+            connection.executescript(SCHEMA)
+            has_statistics = connection.execute("SELECT 1 FROM sqlite_master WHERE name = 'stats_state'").fetchone()
+            connection.executescript(STATISTICS_SCHEMA)
+            if not has_statistics:
+                connection.executescript(REBUILD_STATISTICS)
+
+    def connect(self):
+        return open_database(self.path)
+
+    def upsert_frame(self, df, seen_at=None):
+        """
+        Inserts or updates every row of a scrape_all style DataFrame. Returns the number of rows written.
+        """
+        if df.empty:
+            return 0
+        seen_at = (seen_at or datetime.datetime.now()).strftime("%Y-%m-%d %H:%M:%S")
+        df = df.reindex(columns=TENDER_COLUMNS).copy()
+        df = df[df['tender_name'].notna()]
+        for column in DATE_COLUMNS:
+            df[column] = to_iso_dates(df[column])
+        text_columns = [column for column in TENDER_COLUMNS if column not in DATE_COLUMNS]
+        df[text_columns] = df[text_columns].astype(object).where(df[text_columns].notna(), None)
+
+        records = df.to_dict('records')
+        with self.connect() as connection:
+            for record in records:
+                record['tender_key'] = make_tender_key(record['source_url'], record['tender_name'])
+                record['seen_at'] = seen_at
+                connection.execute(UPSERT_TENDER, record)
+                keywords = [keyword for keyword in str(record['found_keywords'] or '').split(', ') if keyword and keyword != "not specified"]
+                connection.executemany(
+                    "INSERT OR IGNORE INTO tender_keywords (tender_key, keyword) VALUES (?, ?)",
+                    [(record['tender_key'], keyword) for keyword in keywords],
+                )
+                connection.execute(REFRESH_FOUND_KEYWORDS, (record['tender_key'],))
+        return len(records)
+
+    def import_csv_snapshots(self, directory, pattern="capstone_results_*.csv"):
+        """
+        Imports the legacy timestamped CSV snapshots once each, oldest first, so first_seen/last_seen
+        reflect the snapshot times. Returns the number of files imported.
+        """
+        with self.connect() as connection:
+            imported = {row[0] for row in connection.execute("SELECT path FROM imported_files")}
+        file_list = sorted(path for path in glob.glob(os.path.join(directory, pattern)) if os.path.basename(path) not in imported)
+        for path in file_list:
+            match = re.search(r"(\d{4}-\d{2}-\d{2}_\d{2}-\d{2}-\d{2})", os.path.basename(path))
+            seen_at = datetime.datetime.strptime(match.group(1), "%Y-%m-%d_%H-%M-%S") if match else None
+            df = pd.read_csv(path, dtype=str)
+            # Older snapshots gave tenders the portal's default state even when the location names another one
+            resolved = df['tender_location'].map(get_state_from_location)
+            df['state'] = resolved.where(resolved != "not specified", df['state'])
+            self.upsert_frame(df, seen_at=seen_at)
+            with self.connect() as connection:
+                connection.execute(
+                    "INSERT INTO imported_files (path, imported_at) VALUES (?, ?)",
+                    (os.path.basename(path), datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")),
+                )
+            print(f"Imported {path} into the tender store.")
+        return len(file_list)
+
+    def load_tenders(self, states=None, keywords=None, published_from=None, published_to=None, source_urls=None):
+        """
+        Returns the stored tenders as a DataFrame with datetime64 date columns, optionally filtered
+        with indexed queries by state, keyword, publication date range and source.
+        """
+        conditions = []
+        params = []
+        if states:
+            conditions.append(f"state IN ({', '.join('?' * len(states))})")
+            params.extend(states)
+        if source_urls:
+            conditions.append(f"source_url IN ({', '.join('?' * len(source_urls))})")
+            params.extend(source_urls)
+        if keywords:
+            conditions.append(
+                f"tender_key IN (SELECT tender_key FROM tender_keywords WHERE keyword IN ({', '.join('?' * len(keywords))}))"
+            )
+            params.extend(keywords)
+        if published_from is not None:
+            conditions.append("date_published >= ?")
+            params.append(pd.Timestamp(published_from).strftime('%Y-%m-%d'))
+        if published_to is not None:
+            conditions.append("date_published <= ?")
+            params.append(pd.Timestamp(published_to).strftime('%Y-%m-%d'))
+
+        query = f"SELECT {', '.join(TENDER_COLUMNS)}, first_seen, last_seen FROM tenders"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY date_published DESC"
+        with self.connect() as connection:
+            df = pd.read_sql_query(query, connection, params=params)
+        for column in DATE_COLUMNS:
+            df[column] = pd.to_datetime(df[column], format='%Y-%m-%d', errors='coerce')
+        for column in ('first_seen', 'last_seen'):
+            df[column] = pd.to_datetime(df[column], format='%Y-%m-%d %H:%M:%S', errors='coerce')
+        return df
+
+    def export_typed_snapshot(self, path):
+        """
+        Writes all stored tenders to the typed Parquet snapshot at `path`.
+        """
+        write_typed_snapshot(self.load_tenders(), path)
+
+    def load_statistics(self):
+        """
+        Returns the pre-aggregated statistics as DataFrames: 'states' (tender count, summed
+        application periods and published Julian days per state), 'keywords_by_state' (tender
+        count per keyword and state) and 'published_per_day' (tender count per publication day).
+        """
+        with self.connect() as connection:
+            states = pd.read_sql_query("SELECT * FROM stats_state WHERE tenders > 0 ORDER BY state", connection)
+            keywords_by_state = pd.read_sql_query(
+                "SELECT keyword, state, tenders FROM stats_keyword_state WHERE tenders > 0", connection)
+            published_per_day = pd.read_sql_query(
+                "SELECT day, tenders FROM stats_published_day WHERE tenders > 0 ORDER BY day", connection)
+        published_per_day['day'] = pd.to_datetime(published_per_day['day'], format='%Y-%m-%d')
+        return {'states': states, 'keywords_by_state': keywords_by_state, 'published_per_day': published_per_day}
+
+    def count(self):
+        with self.connect() as connection:
+            return connection.execute("SELECT COUNT(*) FROM tenders").fetchone()[0]
@@ -0,0 +1,159 @@
+import gzip
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+import vmp_http
+from async_fetch import fetch_listings
+from vmp_engine import get_portal
+from vmp_http import HttpFallback, scrape_vmp_portal_http, scrape_vmp_portal_http_first
+
+SEARCH_PAGE = """<html><head><meta name="_csrf" content="token-1"><meta name="_csrf_header" content="X-CSRF-TOKEN"></head>
+<body><form method="post" action="/search">
+<input type="hidden" name="session" value="abc">
+<select name="category"><option value="all" selected>Alle</option><option value="vob">VOB</option></select>
+<input type="checkbox" name="archived" value="1">
+<input type="text" id="searchText" name="searchText" value="">
+<button id="searchStart" name="searchStart" value="go">Suchen</button>
+</form></body></html>"""
+
+NO_RESULTS_ROW = "<tr><td>Es wurden keine passenden Bekanntmachungen gefunden.</td></tr>"
+
+
+def results_page(rows, next_href=None):
+    table_rows = ''.join(
+        f"<tr><td><abbr>0{i + 1}.02.2024</abbr></td><td><abbr>1{i}.03.2024</abbr></td>"
+        f"<td>{name}</td><td>Öffentliche Ausschreibung</td><td>Stadt {i}</td></tr>"
+        for i, name in enumerate(rows)) if isinstance(rows, list) else rows
+    next_link = f"<a title='Nächste Seite' href='{next_href}'>&gt;</a>" if next_href else ""
+    return (f"<html><body><div id='listTemplate'><table><tbody>{table_rows}</tbody></table></div>"
+            f"<div class='browsePages'>{next_link}</div></body></html>")
+
+
+class StubPortal(BaseHTTPRequestHandler):
+    """
+    Serves `routes` ({path: body, or a callable taking the handler}) and records every request.
+    """
+
+    def do_GET(self):
+        self.respond()
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        self.form = parse_qs(self.rfile.read(length).decode())
+        self.respond()
+
+    def respond(self):
+        self.server.requests.append((self.command, self.path, dict(self.headers), getattr(self, 'form', None)))
+        route = self.server.routes.get(urlparse(self.path).path)
+        if route is None:
+            self.send_error(404)
+            return
+        status, headers, body = route(self) if callable(route) else (200, {}, route)
+        body = body if isinstance(body, bytes) else body.encode()
+        self.send_response(status)
+        self.send_header('Content-Type', "text/html; charset=utf-8")
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubPortal)
+    server.routes = {}
+    server.requests = []
+    server.url = f"http://127.0.0.1:{server.server_port}"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def stub_portal(stub):
+    return dict(get_portal("https://vergabe.rlp.de"), url=f"{stub.url}/start", http_first=True)
+
+
+def test_form_replay_keeps_server_fields_and_follows_pagination(stub):
+    stub.routes['/start'] = SEARCH_PAGE
+    stub.routes['/search'] = lambda handler: (200, {}, results_page(["Museum Konzept"], next_href="/page2"))
+    stub.routes['/page2'] = results_page(["Museum Studie"])
+
+    tenders = list(scrape_vmp_portal_http(stub_portal(stub), ["Museum"]))
+
+    assert [tender['tender_name'] for tender in tenders] == ["Museum Konzept", "Museum Studie"]
+    assert tenders[0]['date_published'] == "01.02.24"
+    _, _, headers, form = stub.requests[1]
+    assert form == {'session': ['abc'], 'category': ['all'], 'searchStart': ['go'], 'searchText': ['Museum']}
+    assert headers['X-CSRF-TOKEN'] == "token-1"
+
+
+def test_explicit_no_results_message_is_an_empty_result(stub):
+    stub.routes['/start'] = SEARCH_PAGE
+    stub.routes['/search'] = results_page(NO_RESULTS_ROW)
+
+    assert list(scrape_vmp_portal_http(stub_portal(stub), ["Museum"])) == []
+
+
+def test_empty_results_container_is_not_trusted(stub):
+    stub.routes['/start'] = SEARCH_PAGE
+    stub.routes['/search'] = results_page([])
+
+    with pytest.raises(HttpFallback):
+        list(scrape_vmp_portal_http(stub_portal(stub), ["Museum"]))
+
+
+@pytest.mark.parametrize("search_page", [
+    results_page([]),
+    "<html><body><div id='app'>Loading...</div></body></html>",
+])
+def test_http_first_falls_back_to_the_browser(stub, monkeypatch, search_page):
+    stub.routes['/start'] = SEARCH_PAGE
+    stub.routes['/search'] = search_page
+    browser_tenders = [{'tender_name': "Museum Konzept"}]
+    monkeypatch.setattr(vmp_http, 'scrape_vmp_portal_planned', lambda pool, portal, keywords: browser_tenders)
+
+    assert list(scrape_vmp_portal_http_first(None, stub_portal(stub), ["Museum"])) == browser_tenders
+
+
+def test_missing_search_form_falls_back_to_the_browser(stub, monkeypatch):
+    stub.routes['/start'] = "<html><body>No form here</body></html>"
+    monkeypatch.setattr(vmp_http, 'scrape_vmp_portal_planned', lambda pool, portal, keywords: [])
+
+    assert list(scrape_vmp_portal_http_first(None, stub_portal(stub), ["Museum"])) == []
+    assert len(stub.requests) == 1
+
+
+def test_async_listing_follows_pagination_with_compression_and_retries(stub):
+    attempts = []
+
+    def flaky_second_page(handler):
+        attempts.append(handler.path)
+        if len(attempts) == 1:
+            return 503, {}, "busy"
+        return 200, {'Content-Encoding': "gzip"}, gzip.compress("<p>page 2</p>".encode())
+
+    stub.routes['/list'] = "<p>page 1</p><a title='Nächste Seite' href='/list2'>&gt;</a>"
+    stub.routes['/list2'] = flaky_second_page
+
+    pages = fetch_listings({f"{stub.url}/list": {'title': 'Nächste Seite'}}, backoff=0.01)
+
+    assert pages[f"{stub.url}/list"] == ["<p>page 1</p><a title='Nächste Seite' href='/list2'>&gt;</a>", "<p>page 2</p>"]
+    assert len(attempts) == 2
+    assert "gzip" in stub.requests[0][2]['Accept-Encoding']
+
+
+def test_async_listing_keeps_pages_before_a_failure(stub):
+    stub.routes['/list'] = "<p>page 1</p><a title='Nächste Seite' href='/missing'>&gt;</a>"
+
+    pages = fetch_listings({f"{stub.url}/list": {'title': 'Nächste Seite'}}, backoff=0.01)
+
+    assert len(pages[f"{stub.url}/list"]) == 1
@@ -0,0 +1,46 @@
+import pytest
+
+from location_resolver import STATE_COORDINATES, get_resolver
+
+
+@pytest.mark.parametrize("location, state", [
+    ("Sachsen-Anhalt", "Saxony-Anhalt"),
+    ("Baden-Württemberg", "Baden-Württemberg"),
+    ("Niedersachsen", "Lower Saxony"),
+    ("Hessen", "Hesse"),
+    ("Thüringen", "Thuringia"),
+    ("Freistaat Bayern", "Bavaria"),
+    ("North Rhine-Westphalia", "North Rhine-Westphalia"),
+    ("Sachsen", "Saxony"),
+    ("Brandenburg", "Brandenburg"),
+])
+def test_state_names_resolve_to_the_state_centre(location, state):
+    resolved = get_resolver().resolve(location)
+    assert resolved['state'] == state
+    assert resolved['place'] is None
+    assert (resolved['latitude'], resolved['longitude']) == (STATE_COORDINATES[state]['latitude'], STATE_COORDINATES[state]['longitude'])
+
+
+@pytest.mark.parametrize("location, state, place", [
+    ("Deutschland, Sachsen, Leipzig", "Saxony", "Leipzig"),
+    ("Kiel, Schleswig-Holstein", "Schleswig-Holstein", "Kiel"),
+    ("Neustadt, Niedersachsen", "Lower Saxony", "Neustadt am Rübenberge"),
+    ("Neustadt in Sachsen", "Saxony", "Neustadt in Sachsen"),
+    ("Brandenburg an der Havel", "Brandenburg", "Brandenburg an der Havel"),
+    ("Sachsen bei Ansbach", "Bavaria", "Sachsen bei Ansbach"),
+    ("Baden-Baden", "Baden-Württemberg", "Baden-Baden"),
+    ("Berlin", "Berlin", "Berlin"),
+    ("24103 Kiel", "Schleswig-Holstein", "Kiel"),
+])
+def test_places_are_resolved_within_the_named_state(location, state, place):
+    resolved = get_resolver().resolve(location)
+    assert (resolved['state'], resolved['place']) == (state, place)
+
+
+def test_postal_code_decides_the_state_without_a_place():
+    assert get_resolver().resolve("Postfach, 80331")['state'] == "Bavaria"
+
+
+def test_unknown_locations_are_unresolved():
+    assert get_resolver().resolve("not specified")['state'] == "not specified"
+    assert get_resolver().resolve("Irgendwo")['state'] == "not specified"
@@ -0,0 +1,33 @@
+import page_cache
+from page_cache import PageCache
+
+
+def counting_parser(calls):
+    def parse(html):
+        calls.append(html)
+        return [{'tender_name': html}]
+    return parse
+
+
+def test_unchanged_page_is_not_parsed_again(tmp_path):
+    cache, calls = PageCache(str(tmp_path / "pages.sqlite")), []
+    assert cache.parse("portal", "Museum", 1, "<html>a</html>", counting_parser(calls)) == [{'tender_name': "<html>a</html>"}]
+    assert cache.parse("portal", "Museum", 1, "<html>a</html>", counting_parser(calls)) == [{'tender_name': "<html>a</html>"}]
+    cache.parse("portal", "Museum", 1, "<html>b</html>", counting_parser(calls))
+    assert calls == ["<html>a</html>", "<html>b</html>"]
+
+
+def test_changed_keywords_are_parsed_again(tmp_path):
+    cache, calls = PageCache(str(tmp_path / "pages.sqlite")), []
+    cache.parse("portal", "", 1, "<html>a</html>", counting_parser(calls), ["Museum"])
+    cache.parse("portal", "", 1, "<html>a</html>", counting_parser(calls), ["Museum"])
+    cache.parse("portal", "", 1, "<html>a</html>", counting_parser(calls), ["Museum", "Studie"])
+    assert len(calls) == 2
+
+
+def test_new_parser_version_is_parsed_again(tmp_path, monkeypatch):
+    cache, calls = PageCache(str(tmp_path / "pages.sqlite")), []
+    cache.parse("portal", "Museum", 1, "<html>a</html>", counting_parser(calls))
+    monkeypatch.setattr(page_cache, 'PARSER_VERSION', page_cache.PARSER_VERSION + 1)
+    cache.parse("portal", "Museum", 1, "<html>a</html>", counting_parser(calls))
+    assert len(calls) == 2
@@ -0,0 +1,98 @@
+import pytest
+
+import query_planner
+from query_planner import estimate_page_count, plan_portal_queries
+from vmp_engine import get_portal
+
+KEYWORDS = ["Museum", "Tourismus", "Freizeit", "Besucher"]
+
+NO_RESULTS_ROW = "<tr><td>Es wurden keine passenden Bekanntmachungen gefunden.</td></tr>"
+
+
+def list_page(rows, next_href=None, count_text=""):
+    table_rows = ''.join(
+        f"<tr><td><abbr>0{i % 9 + 1}.02.2024</abbr></td><td><abbr>1{i % 9}.03.2024</abbr></td>"
+        f"<td>Tender {i}</td><td>Öffentliche Ausschreibung</td><td>Stadt {i}</td></tr>"
+        for i in range(rows)) if isinstance(rows, int) else rows
+    next_link = f"<a title='Nächste Seite' href='{next_href}'>&gt;</a>" if next_href else ""
+    return (f"<html><body><p>{count_text}</p><div id='listTemplate'><table><tbody>{table_rows}</tbody></table></div>"
+            f"<div class='browsePages'>{next_link}</div></body></html>")
+
+
+def blocks_page(rows, next_href=None, count_text=""):
+    blocks = ''.join(
+        "<tbody class='tableLeftHeaderBlock' tabindex='0'>"
+        f"<tr class='tableRowLeft'><td>Ausschreibung:</td><td>Tender {i}</td></tr>"
+        f"<tr class='tableRowLeft'><td>Erschienen am:</td><td>01.02.2024</td></tr></tbody>"
+        for i in range(rows))
+    next_link = f"<a title='Nächste Seite' href='{next_href}'>&gt;</a>" if next_href else ""
+    return f"<html><body><p>{count_text}</p><div class='border col-lg-12'><table>{blocks}</table>{next_link}</div></body></html>"
+
+
+@pytest.fixture
+def list_portal():
+    return get_portal("https://vergabe.rlp.de")
+
+
+def test_single_page_result_list_is_one_page(list_portal):
+    assert estimate_page_count(list_page(5), list_portal) == 1
+
+
+def test_several_pages_without_result_count_are_unknown(list_portal):
+    assert estimate_page_count(list_page(10, next_href="/results?page=2"), list_portal) is None
+
+
+def test_no_results_are_unknown(list_portal):
+    assert estimate_page_count(list_page(NO_RESULTS_ROW), list_portal) is None
+
+
+def test_result_count_decides_the_page_count():
+    portal = get_portal("https://saarvpsl.vmstart.de")
+    html = blocks_page(10, next_href="/results?page=2", count_text="95 gefundene Ausschreibungen")
+    assert estimate_page_count(html, portal) == 10
+
+
+def test_result_count_is_read_without_a_next_page_link():
+    portal = get_portal("https://saarvpsl.vmstart.de")
+    html = blocks_page(10, count_text="95 gefundene Ausschreibungen")
+    assert estimate_page_count(html, portal) == 10
+
+
+def test_zero_result_count_is_unknown():
+    portal = get_portal("https://saarvpsl.vmstart.de")
+    assert estimate_page_count(blocks_page(0, count_text="0 gefundene Ausschreibungen"), portal) is None
+
+
+def test_portals_without_pagination_are_unknown():
+    portal = get_portal("https://vergabe.vmstart.de")
+    assert estimate_page_count(blocks_page(10, count_text="10 gefundene Ausschreibungen"), portal) is None
+
+
+def plan_with_pages(monkeypatch, portal, pages):
+    # pages: query -> result page html the probe search returns
+    monkeypatch.setattr(query_planner, 'probe_query',
+                        lambda browser, portal, query: estimate_page_count(pages[query], portal))
+    return plan_portal_queries(None, portal, KEYWORDS)
+
+
+def test_empty_list_all_search_is_not_planned(monkeypatch, list_portal):
+    plan = plan_with_pages(monkeypatch, list_portal, {"": list_page(NO_RESULTS_ROW)})
+    assert plan['strategy'] == 'per_keyword'
+
+
+def test_short_list_all_search_is_planned(monkeypatch, list_portal):
+    plan = plan_with_pages(monkeypatch, list_portal, {"": list_page(3)})
+    assert (plan['strategy'], plan['queries'], plan['estimated_loads']) == ('list_all', [""], 1)
+
+
+def test_portal_without_pagination_searches_per_keyword(monkeypatch):
+    portal = get_portal("https://vergabe.vmstart.de")
+    plan = plan_with_pages(monkeypatch, portal, {"": blocks_page(10)})
+    assert plan['strategy'] == 'per_keyword'
+
+
+def test_or_queries_are_planned_when_cheaper(monkeypatch, list_portal):
+    portal = dict(list_portal, or_operator=" OR ")
+    pages = {" OR ".join(KEYWORDS): list_page(4), "": list_page(10, next_href="/results?page=2")}
+    plan = plan_with_pages(monkeypatch, portal, pages)
+    assert (plan['strategy'], plan['queries']) == ('or_query', [" OR ".join(KEYWORDS)])
@@ -0,0 +1,44 @@
+import threading
+from contextlib import contextmanager
+
+import vmp_engine
+from vmp_engine import get_portal, scrape_vmp_portal_parallel
+
+
+class StubPool:
+    @contextmanager
+    def browser(self):
+        yield None
+
+
+def test_shards_stream_tenders_before_the_portal_is_done(monkeypatch):
+    portal = get_portal("https://www.evergabe.nrw.de")
+    first_received = threading.Event()
+
+    def scrape_shard(browser, portal, keywords):
+        for keyword in keywords:
+            yield {'tender_name': f"{keyword} tender", 'found_keywords': keyword}
+            # Only goes on once the consumer has the first tender, i.e. before the shard returns
+            assert first_received.wait(5)
+
+    monkeypatch.setattr(vmp_engine, 'scrape_vmp_portal', scrape_shard)
+    tenders = scrape_vmp_portal_parallel(StubPool(), portal, ["Museum", "Studie", "Konzept", "Tourismus"])
+
+    received = [next(tenders)]
+    first_received.set()
+    received.extend(tenders)
+    assert sorted(tender['found_keywords'] for tender in received) == ["Konzept", "Museum", "Studie", "Tourismus"]
+
+
+def test_failing_shard_keeps_the_tenders_it_yielded(monkeypatch):
+    portal = get_portal("https://www.evergabe.nrw.de")
+
+    def scrape_shard(browser, portal, keywords):
+        yield {'tender_name': f"{keywords[0]} tender", 'found_keywords': keywords[0]}
+        if "Museum" in keywords:
+            raise RuntimeError("browser crashed")
+
+    monkeypatch.setattr(vmp_engine, 'scrape_vmp_portal', scrape_shard)
+    tenders = list(scrape_vmp_portal_parallel(StubPool(), portal, ["Museum", "Studie", "Konzept"]))
+
+    assert sorted(tender['tender_name'] for tender in tenders) == ["Konzept tender", "Museum tender", "Studie tender"]
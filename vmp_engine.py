@@ -0,0 +1,435 @@
+import threading
+from contextlib import contextmanager
+from urllib.parse import urljoin, urlparse
+
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, ElementNotInteractableException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+
+from adaptive_wait import find_optional_element, wait_until_stable
+from browser_pool import load_page
+from date_utils import format_date
+from html_parsing import css, find_link, has_class, has_class_name, parse_html, stripped_text, text, xpath
+from keyword_matcher import match_keywords
+from page_cache import parse_page
+from tender_pipeline import merge_streams
+
+# Fields that hold dates and are normalized to dd.mm.yy after extraction
+DATE_FIELDS = ('date_published', 'tender_deadline')
+
+# VMPCenter / VMPSatellite portals: results are rows of div#listTemplate with one column per field
+LIST_LAYOUT = {
+    'layout': 'list',
+    'timeout': 20,
+    'search_forms': [
+        {'input': (By.ID, "searchText"), 'submit': (By.ID, "searchStart")},
+    ],
+    'results_ready': "div#listTemplate",
+    'row_selector': "div#listTemplate tbody tr",
+    # Marker of the results subtree: parsing starts there instead of at the top of the page
+    'results_scope': 'id="listTemplate"',
+    # field -> (cell index, optional tag inside the cell that holds the value)
+    'columns': {
+        'date_published': (0, 'abbr'),
+        'tender_deadline': (1, 'abbr'),
+        'tender_name': (2, None),
+        'tender_type': (3, None),
+        'tender_authority': (4, None),
+    },
+    'no_results_texts': ["Es wurden keine passenden Bekanntmachungen gefunden."],
+    'next_page': {'title': 'Nächste Seite'},
+    'paginate': True,
+    'cookie_button': None,
+    # Number of browser sessions the keyword list is split across, and the cap on sessions per host
+    'keyword_shards': 2,
+    'max_sessions_per_host': 2,
+    # Replay the search form with plain HTTP and only use a browser if that does not work. Off
+    # until a portal's HTTP results have been checked against the browser's, then set per portal
+    'http_first': False,
+    # Query planning (see query_planner.py): boolean OR syntax if the search supports it, and the
+    # pattern of the total result count a result list's page count is estimated from (without
+    # one, combined and list-all searches are never planned when there is more than one page)
+    'query_planning': True,
+    'or_operator': None,
+    'max_query_length': 200,
+    'result_count_pattern': None,
+}
+
+# NetServer (vmstart) portals: every tender is a tbody of header/value rows
+BLOCKS_LAYOUT = {
+    'layout': 'blocks',
+    'timeout': 20,
+    # The landing page has a big search box, result pages a smaller one
+    'search_forms': [
+        {'input': (By.ID, "searchVisible"), 'submit': (By.CSS_SELECTOR, "button.btn-mainSearch")},
+        {'input': (By.ID, "inputSearchKey"), 'submit': (By.ID, "btnSearchSubmit")},
+    ],
+    'results_ready': "div.border.col-lg-12",
+    'row_selector': "tbody.tableLeftHeaderBlock[tabindex='0']",
+    'results_scope': None,
+    # header label -> field, checked in this order
+    'fields': {
+        'Ausschreibung': 'tender_name',
+        'Vergabestelle': 'tender_authority',
+        'Verfahrensart': 'tender_type',
+        'Rechtsrahmen': 'tender_law',
+        'Abgabefrist': 'tender_deadline',
+        'Erschienen am': 'date_published',
+    },
+    # No known "nothing found" message, so an empty result over HTTP always falls back to the browser
+    'no_results_texts': [],
+    'next_page': {'title': 'Nächste Seite'},
+    'paginate': True,
+    'cookie_button': None,
+    'keyword_shards': 1,
+    'max_sessions_per_host': 1,
+    'http_first': False,
+    'query_planning': True,
+    'or_operator': None,
+    'max_query_length': 200,
+    'result_count_pattern': r"(\d+)\s+gefundene Ausschreibung",
+}
+
+# One descriptor per portal, keyed by the source_url stored with every tender.
+# A new portal running on one of the layouts above only needs an entry here.
+VMP_PORTALS = {
+    "https://vergabe.rlp.de": dict(
+        LIST_LAYOUT,
+        name="Rheinland",
+        url="https://vergabe.rlp.de/VMPCenter/company/announcements/categoryOverview.do?method=show",
+        state="Rhineland-Palatinate",
+    ),
+    "https://www.evergabe.nrw.de": dict(
+        LIST_LAYOUT,
+        name="NRW",
+        url="https://www.evergabe.nrw.de/VMPCenter/company/announcements/categoryOverview.do?method=show",
+        state="North Rhine-Westphalia",
+        keyword_shards=3,
+        max_sessions_per_host=3,
+    ),
+    "https://www.vergabe.metropoleruhr.de": dict(
+        LIST_LAYOUT,
+        name="Metropoleruhr",
+        url="https://www.vergabe.metropoleruhr.de/VMPSatellite/company/announcements/categoryOverview.do?method=show",
+        state="North Rhine-Westphalia",
+    ),
+    "https://vergabe.niedersachsen.de": dict(
+        LIST_LAYOUT,
+        name="Niedersachsen",
+        url="https://vergabe.niedersachsen.de/Satellite/company/announcements/categoryOverview.do?method=show",
+        state="Lower Saxony",
+    ),
+    "https://vergabemarktplatz.brandenburg.de": dict(
+        LIST_LAYOUT,
+        name="Brandenburg",
+        url="https://vergabemarktplatz.brandenburg.de/VMPCenter/company/announcements/categoryOverview.do?method=show",
+        state="Brandenburg",
+        cookie_button=(By.XPATH, "//button[contains(text(), 'Accept')]"),
+        keyword_shards=1,
+    ),
+    "https://vergabe.vmstart.de": dict(
+        BLOCKS_LAYOUT,
+        name="vmstart",
+        url="https://vergabe.vmstart.de/NetServer/PublicationSearchControllerServlet?function=SearchPublications&Gesetzesgrundlage=All&Category=InvitationToTender&thContext=publications",
+        state="Rhineland-Palatinate",
+        timeout=30,
+        paginate=False,
+    ),
+    "https://saarvpsl.vmstart.de": dict(
+        BLOCKS_LAYOUT,
+        name="Saarvpsl",
+        url="https://saarvpsl.vmstart.de/NetServer/PublicationSearchControllerServlet?function=SearchPublications&Gesetzesgrundlage=All&Category=InvitationToTender&thContext=publications",
+        state="Saarland",
+    ),
+}
+
+
+_page_loads = {}
+_page_loads_lock = threading.Lock()
+
+
+def count_page_load(portal, loads=1):
+    with _page_loads_lock:
+        _page_loads[portal['source_url']] = _page_loads.get(portal['source_url'], 0) + loads
+
+
+def get_page_loads(source_url=None):
+    with _page_loads_lock:
+        if source_url is not None:
+            return _page_loads.get(source_url, 0)
+        return dict(_page_loads)
+
+
+def reset_page_loads():
+    with _page_loads_lock:
+        _page_loads.clear()
+
+
+def get_portal(source_url, seen_index=None, page_cache=None):
+    # The per-run copy of a descriptor also carries run state: the incremental seen-index and page cache
+    portal = VMP_PORTALS[source_url]
+    return dict(portal, source_url=source_url, seen_index=seen_index, page_cache=page_cache)
+
+
+def normalize_tender_dates(tender):
+    for field in DATE_FIELDS:
+        value = tender.get(field)
+        if value and value != "not specified":
+            # Drop a trailing time ("09.12.24 10:00") before parsing
+            tender[field] = format_date(value.split()[0])
+    return tender
+
+
+def parse_list_rows(document, portal):
+    tenders = []
+    min_cells = max(index for index, _ in portal['columns'].values()) + 1
+    for row in css(portal['row_selector'])(document):
+        try:
+            cells = row.findall('.//td')
+            cell_texts = [text(cell) for cell in cells]
+            if len(cells) < min_cells or any(text in cell_texts[0] for text in portal['no_results_texts']):
+                continue  # Skip rows without sufficient data or with no matching tenders
+
+            tender = {}
+            for field, (index, tag) in portal['columns'].items():
+                cell = cells[index]
+                if tag:
+                    value_tag = cell.find(f'.//{tag}')
+                    tender[field] = text(value_tag) if value_tag is not None else "not specified"
+                else:
+                    tender[field] = cell_texts[index] or "not specified"
+            tenders.append(normalize_tender_dates(tender))
+        except Exception as e:
+            print(f"An error occurred while parsing row: {e}")
+    return tenders
+
+
+def parse_block_rows(document, portal):
+    tenders = []
+    for tbody in css(portal['row_selector'])(document):
+        tender = {}
+        for row in xpath(f".//tr[{has_class('tableRowLeft')}]")(tbody):
+            try:
+                cells = row.findall('.//td')
+                if len(cells) < 2:
+                    continue  # Skip rows with insufficient data
+
+                header_text = stripped_text(cells[0])
+                data_text = stripped_text(cells[1])
+                for label, field in portal['fields'].items():
+                    if label in header_text:
+                        tender[field] = data_text or "not specified"
+                        break
+            except Exception as e:
+                print(f"An error occurred while parsing row: {e}")
+
+        if tender.get('tender_name', "not specified") != "not specified":
+            tenders.append(normalize_tender_dates(tender))
+    return tenders
+
+
+ROW_PARSERS = {
+    'list': parse_list_rows,
+    'blocks': parse_block_rows,
+}
+
+
+def parse_results_html(html, portal):
+    # Only the results subtree is parsed, as long as the next-page link lies within it
+    return parse_html(html, portal['results_scope'], required=portal['next_page'].values())
+
+
+def parse_results_document(document, portal):
+    """
+    Reads the tenders and the URL of the next page (None on the last page) from a parsed results page.
+    """
+    tenders = ROW_PARSERS[portal['layout']](document, portal)
+
+    next_url = None
+    if portal['paginate']:
+        next_page = find_link(document, portal['next_page'])
+        if next_page is not None and next_page.get('href') and not has_class_name(next_page, 'disabled'):
+            next_url = urljoin(portal['url'], next_page.get('href'))
+    return tenders, next_url
+
+
+def parse_results_page(html, portal):
+    """
+    Parses one results page of a portal.
+    Returns the tenders on it and the URL of the next page (None on the last page).
+    """
+    return parse_results_document(parse_results_html(html, portal), portal)
+
+
+_host_semaphores = {}
+_host_semaphores_lock = threading.Lock()
+
+
+def host_session_limit(host, portal):
+    # Whichever portal reaches the host first, no portal on it gets more sessions than it allows
+    limits = [other['max_sessions_per_host'] for other in VMP_PORTALS.values() if urlparse(other['url']).netloc == host]
+    return min([portal['max_sessions_per_host'], *limits])
+
+
+@contextmanager
+def host_session_slot(portal):
+    """
+    Limits the number of concurrent browser sessions against one host, across all portals on it.
+    The limit is the lowest max_sessions_per_host of the portals on that host.
+    """
+    host = urlparse(portal['url']).netloc
+    with _host_semaphores_lock:
+        if host not in _host_semaphores:
+            _host_semaphores[host] = threading.BoundedSemaphore(host_session_limit(host, portal))
+        semaphore = _host_semaphores[host]
+    with semaphore:
+        yield
+
+
+def shard_keywords(keywords, shards):
+    # Round-robin split, so expensive and cheap keywords are spread over all shards
+    shards = max(1, min(shards, len(keywords)))
+    return [keywords[index::shards] for index in range(shards)]
+
+
+def open_portal(browser, portal):
+    load_page(browser, portal['url'], portal['source_url'])
+    count_page_load(portal)
+    if portal['cookie_button']:
+        # Handle cookie pop-ups if present
+        try:
+            accept_cookies = WebDriverWait(browser, 10).until(EC.element_to_be_clickable(portal['cookie_button']))
+            accept_cookies.click()
+        except Exception as e:
+            print("No cookies banner found:", e)
+
+
+def submit_search(browser, portal, keyword):
+    # Use the first search form present on the current page, otherwise wait for the last one
+    search_form = portal['search_forms'][-1]
+    for form in portal['search_forms']:
+        if browser.find_elements(*form['input']):
+            search_form = form
+            break
+
+    search_input = WebDriverWait(browser, portal['timeout']).until(
+        EC.presence_of_element_located(search_form['input'])
+    )
+    search_input.clear()
+    search_input.send_keys(keyword)
+
+    search_submit = WebDriverWait(browser, 10).until(
+        EC.element_to_be_clickable(search_form['submit'])
+    )
+    previous_results = find_optional_element(browser, portal['results_ready'])
+    browser.execute_script("arguments[0].click();", search_submit)
+    count_page_load(portal)
+    return previous_results
+
+
+def wait_for_results(browser, portal, previous_results=None):
+    WebDriverWait(browser, portal['timeout']).until(
+        EC.presence_of_element_located((By.CSS_SELECTOR, portal['results_ready']))
+    )
+    wait_until_stable(browser, portal['row_selector'], portal['source_url'], previous=previous_results)
+
+
+def scrape_keyword(browser, portal, keyword):
+    """
+    Searches one keyword on a portal that is already open, walks all result pages and yields
+    their tenders page by page.
+    """
+    previous_results = submit_search(browser, portal, keyword)
+    page = 1
+    while True:
+        # Wait for results to load
+        try:
+            wait_for_results(browser, portal, previous_results)
+            previous_results = None
+        except TimeoutException:
+            print(f"Timeout while waiting for search results for keyword: {keyword}")
+            break
+
+        page_tenders, next_url = parse_page(portal['page_cache'], portal['source_url'], keyword, page,
+                                            browser.page_source, lambda html: parse_results_page(html, portal))
+        print(f"Found {len(page_tenders)} tenders on page {page} for keyword: {keyword}")
+        yield from page_tenders
+
+        if not page_tenders or next_url is None:
+            break
+        if portal['seen_index'] is not None and portal['seen_index'].should_stop(page_tenders, portal['source_url'], f"{portal['name']} '{keyword}'"):
+            break
+        print(f"Navigating to the next page: {next_url}")
+        load_page(browser, next_url, portal['source_url'])
+        count_page_load(portal)
+        page += 1
+
+
+def scrape_vmp_portal(browser, portal, keywords, queries=None):
+    """
+    Scrapes every keyword on one portal described in VMP_PORTALS and yields the tenders page by
+    page. A tender found by several keywords is yielded once per keyword; the pipeline downstream
+    consolidates them by name (tender_pipeline.TenderDeduplicator).
+
+    With `queries` the portal is searched for those instead (a combined OR query, or "" to list
+    everything) and keywords are attributed locally by matching them against the tender name.
+    """
+    print(f"Scraping dynamic content from {portal['url']}...")
+    tender_names = set()
+    try:
+        open_portal(browser, portal)
+    except Exception as e:
+        print(f"Failed to access {portal['url']}: {e}")
+        return
+
+    for keyword in (keywords if queries is None else queries):
+        try:
+            print(f"Searching for keyword: {keyword}")
+            for tender in scrape_keyword(browser, portal, keyword):
+                tender['source_url'] = portal['source_url']
+                found_keywords = [keyword] if queries is None else match_keywords(tender['tender_name'], keywords)
+                if not found_keywords:
+                    continue  # Listed by a combined query but matches none of the keywords
+                tender['found_keywords'] = ', '.join(found_keywords)
+                tender_names.add(tender['tender_name'])
+                yield tender
+        except TimeoutException:
+            print(f"Timeout while searching for keyword: {keyword}")
+        except NoSuchElementException:
+            print(f"No element found for keyword: {keyword}")
+        except ElementNotInteractableException:
+            print(f"Element not interactable for keyword: {keyword}")
+        except Exception as e:
+            print(f"An error occurred while searching for keyword: {keyword} - {str(e)}")
+
+    print(f"Total tenders found for {portal['name']}: {len(tender_names)}")
+
+
+def scrape_vmp_portal_parallel(pool, portal, keywords):
+    """
+    Splits the keywords of one portal across `keyword_shards` browser sessions from the pool and
+    runs them concurrently, never exceeding `max_sessions_per_host` sessions on the portal's host.
+    Yields the tenders of all shards as they are parsed; a failing shard keeps what it yielded.
+    """
+    shards = shard_keywords(keywords, portal['keyword_shards'])
+
+    def scrape_shard(shard_keywords):
+        with host_session_slot(portal):
+            with pool.browser() as browser:
+                yield from scrape_vmp_portal(browser, portal, shard_keywords)
+
+    if len(shards) == 1:
+        yield from scrape_shard(shards[0])
+        return
+
+    def shard_done(index, count, error):
+        if error is not None:
+            print(f"A keyword shard for {portal['name']} failed: {error}")
+
+    print(f"Scraping {portal['name']} with {len(shards)} parallel keyword shards...")
+    tender_names = set()
+    for _, tender in merge_streams({index: scrape_shard(shard) for index, shard in enumerate(shards)}, on_done=shard_done):
+        tender_names.add(tender['tender_name'])
+        yield tender
+    print(f"Total tenders found for {portal['name']} across all shards: {len(tender_names)}")
@@ -0,0 +1,230 @@
+import threading
+import time
+from urllib.parse import urljoin
+
+import requests
+from bs4 import BeautifulSoup
+from selenium.webdriver.common.by import By
+
+from page_cache import parse_page
+from html_parsing import css
+from vmp_engine import count_page_load, parse_results_document, parse_results_html
+from query_planner import scrape_vmp_portal_planned
+
+HTTP_HEADERS = {
+    'User-Agent': "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36",
+    'Accept': "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    'Accept-Language': "de-DE,de;q=0.9,en;q=0.8",
+}
+
+_request_latencies = {}
+_request_latencies_lock = threading.Lock()
+
+
+class HttpFallback(Exception):
+    """
+    Raised when a portal can't be scraped over plain HTTP (the search needs JavaScript),
+    so the caller should use the browser instead.
+    """
+
+
+def reset_http_stats():
+    with _request_latencies_lock:
+        _request_latencies.clear()
+
+
+def report_http_stats():
+    with _request_latencies_lock:
+        stats = {name: list(latencies) for name, latencies in _request_latencies.items()}
+    if not stats:
+        return
+    print("HTTP fetch latency per portal:")
+    for name, latencies in sorted(stats.items()):
+        print(f"  {name}: {len(latencies)} requests, mean {sum(latencies) / len(latencies) * 1000:.0f} ms, "
+              f"max {max(latencies) * 1000:.0f} ms")
+
+
+def find_search_field(soup, portal):
+    # The descriptor's Selenium locators double as locators for the raw HTML
+    for form in portal['search_forms']:
+        by, value = form['input']
+        field = soup.find(id=value) if by == By.ID else soup.select_one(value)
+        if field is not None:
+            return field, form
+    return None, None
+
+
+def build_search_request(html, page_url, portal, query):
+    """
+    Replays the portal's search form: every field keeps the value the server rendered (hidden
+    CSRF/session tokens included), only the search text is replaced. Returns (method, url, data).
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+    field, search_form = find_search_field(soup, portal)
+    form = field.find_parent('form') if field is not None else None
+    if form is None:
+        raise HttpFallback(f"No search form in the HTML of {page_url}")
+
+    data = []
+    for element in form.find_all(['input', 'select', 'textarea']):
+        name = element.get('name')
+        if not name or element.has_attr('disabled') or element is field:
+            continue
+        if element.name == 'select':
+            option = element.find('option', selected=True) or element.find('option')
+            if option is not None:
+                data.append((name, option.get('value', option.get_text(strip=True))))
+            continue
+        input_type = element.get('type', 'text').lower()
+        if input_type in ('submit', 'button', 'image', 'reset', 'file'):
+            continue
+        if input_type in ('checkbox', 'radio') and not element.has_attr('checked'):
+            continue
+        data.append((name, element.get('value', element.get_text() if element.name == 'textarea' else '')))
+
+    # The clicked submit button is part of the submission if it has a name
+    by, value = search_form['submit']
+    submit = form.find(id=value) if by == By.ID else form.select_one(value)
+    if submit is not None and submit.get('name'):
+        data.append((submit['name'], submit.get('value', '')))
+
+    if not field.get('name'):
+        raise HttpFallback(f"Search field on {page_url} has no name")
+    data.append((field['name'], query))
+
+    method = form.get('method', 'get').lower()
+    action = urljoin(page_url, form.get('action') or page_url)
+    return method, action, data
+
+
+class VmpHttpSession:
+    """
+    Drives a VMP portal's search with a requests.Session instead of a browser. Cookies are kept by
+    the session, Spring CSRF tokens published as <meta name="_csrf"> are sent back as headers.
+    """
+
+    def __init__(self, portal, timeout=20):
+        self.portal = portal
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update(HTTP_HEADERS)
+        self.current_url = None
+        self.current_html = None
+
+    def close(self):
+        self.session.close()
+
+    def _request(self, method, url, **kwargs):
+        start = time.perf_counter()
+        response = self.session.request(method, url, timeout=self.timeout, **kwargs)
+        response.raise_for_status()
+        elapsed = time.perf_counter() - start
+        with _request_latencies_lock:
+            _request_latencies.setdefault(self.portal['name'], []).append(elapsed)
+        count_page_load(self.portal)
+        self.current_url = response.url
+        self.current_html = response.text
+        self._update_csrf_header()
+        return response.text
+
+    def _update_csrf_header(self):
+        if '_csrf' not in self.current_html:
+            return
+        soup = BeautifulSoup(self.current_html, 'html.parser')
+        token = soup.find('meta', attrs={'name': '_csrf'})
+        header = soup.find('meta', attrs={'name': '_csrf_header'})
+        if token and token.get('content'):
+            self.session.headers[header.get('content') if header else 'X-CSRF-TOKEN'] = token['content']
+
+    def open(self):
+        return self._request('get', self.portal['url'])
+
+    def search(self, query):
+        method, action, data = build_search_request(self.current_html, self.current_url, self.portal, query)
+        if method == 'post':
+            return self._request('post', action, data=data)
+        return self._request('get', action, params=data)
+
+    def get(self, url):
+        return self._request('get', url)
+
+
+def parse_http_results_page(html, portal):
+    """
+    Returns (usable, tenders, next_url). A page is usable if it lists tenders or says that there
+    are none (one of the portal's no_results_texts). An empty results container is not: the search
+    may not have been accepted, or the rows are filled in by JavaScript.
+    """
+    document = parse_results_html(html, portal)
+    if not css(portal['results_ready'])(document):
+        return False, [], None
+    tenders, next_url = parse_results_document(document, portal)
+    if not tenders and not any(text in " ".join(document.itertext()) for text in portal['no_results_texts']):
+        return False, [], None
+    return True, tenders, next_url
+
+
+def scrape_query_http(http, portal, query):
+    """
+    Searches one query over HTTP, walks all result pages via the "Nächste Seite" links and yields
+    their tenders page by page.
+    """
+    html = http.search(query)
+    page = 1
+    while True:
+        # Cached apart from the browser's pages of the same search, which are parsed differently
+        usable, page_tenders, next_url = parse_page(portal['page_cache'], f"{portal['source_url']} (HTTP)", query, page,
+                                                    html, lambda html: parse_http_results_page(html, portal))
+        if not usable:
+            # Results are rendered client-side or the search was not accepted, the browser has to check
+            raise HttpFallback(f"No server-rendered results for '{query}' on {portal['name']}")
+
+        print(f"Found {len(page_tenders)} tenders on page {page} for keyword: {query} (HTTP)")
+        yield from page_tenders
+        if not page_tenders or next_url is None:
+            break
+        if portal['seen_index'] is not None and portal['seen_index'].should_stop(page_tenders, portal['source_url'], f"{portal['name']} '{query}'"):
+            break
+        if not next_url.startswith('http'):
+            raise HttpFallback(f"Pagination on {portal['name']} needs JavaScript: {next_url}")
+        html = http.get(next_url)
+        page += 1
+
+
+def scrape_vmp_portal_http(portal, keywords):
+    """
+    Scrapes a VMP portal without a browser and yields the tenders page by page. Raises
+    HttpFallback as soon as the portal turns out to need JavaScript; tenders yielded before are
+    found again by the browser and consolidated downstream.
+    """
+    print(f"Scraping {portal['url']} over HTTP...")
+    tender_names = set()
+    http = VmpHttpSession(portal)
+    try:
+        http.open()
+        for keyword in keywords:
+            for tender in scrape_query_http(http, portal, keyword):
+                tender['source_url'] = portal['source_url']
+                tender['found_keywords'] = keyword
+                tender_names.add(tender['tender_name'])
+                yield tender
+    except requests.RequestException as e:
+        raise HttpFallback(f"HTTP scraping of {portal['name']} failed: {e}")
+    finally:
+        http.close()
+
+    print(f"Total tenders found for {portal['name']} over HTTP: {len(tender_names)}")
+
+
+def scrape_vmp_portal_http_first(pool, portal, keywords):
+    """
+    Uses plain HTTP where the portal renders its results server-side and falls back to the
+    browser-based (planned, sharded) engine otherwise.
+    """
+    if portal['http_first']:
+        try:
+            yield from scrape_vmp_portal_http(portal, keywords)
+            return
+        except HttpFallback as e:
+            print(f"{e}. Falling back to the browser.")
+    yield from scrape_vmp_portal_planned(pool, portal, keywords)